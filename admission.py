@@ -0,0 +1,148 @@
+import asyncio
+import math
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+# ─────────────────────────── Kabul Kontrolü Ayarları ─────────────────
+# Birim: tek bir sitenin canlı taraması (hedge'leriyle birlikte). Önbellek/indeks cevapları slot tüketmez.
+ADMIT_MAX_ACTIVE   = int(os.environ.get("PP_ADMIT_MAX_ACTIVE", "128"))     # Aynı anda en fazla canlı site taraması (0 = sınırsız)
+ADMIT_PER_HOST     = int(os.environ.get("PP_ADMIT_PER_HOST", "32"))        # Aynı siteye aynı anda en fazla tarama
+ADMIT_MAX_QUEUE    = int(os.environ.get("PP_ADMIT_MAX_QUEUE", "256"))      # Slot bekleyen en fazla tarama; dolunca anında ret
+ADMIT_QUEUE_WAIT_S = float(os.environ.get("PP_ADMIT_QUEUE_WAIT_S", "4.0")) # Kuyrukta en fazla bekleme (arama deadline'ı daha erkense o)
+ADMIT_EWMA_ALPHA   = 0.2
+RETRY_AFTER_MIN_S  = 1
+RETRY_AFTER_MAX_S  = 30
+
+REJECT_QUEUE_FULL    = "queue_full"
+REJECT_QUEUE_TIMEOUT = "queue_timeout"
+
+class AdmissionRejected(Exception):
+    """Canlı tarama kabul edilmedi: kuyruk dolu ya da sırası kuyruk süresi içinde gelmedi."""
+
+    def __init__(self, reason: str, retry_after_s: int):
+        super().__init__(f"Kabul edilmedi ({reason}), {retry_after_s}s sonra tekrar deneyin")
+        self.reason        = reason
+        self.retry_after_s = retry_after_s
+
+# ─────────────────────────── Kabul Kontrolü ──────────────────────────
+class AdmissionController:
+    """Canlı site taramalarını global ve site bazlı semaforlarla sınırlar, fazlasını sınırlı bir kuyrukta bekletir.
+
+    Trafik patlamasında 6×N giden bağlantı açılıp her arama birlikte zaman aşımına düşmesin diye:
+    slot boşsa tarama hemen başlar; değilse en fazla `max_queue` tarama, en fazla `queue_wait_s`
+    (ya da arama deadline'ına kalan süre) kadar bekler. Kuyruk doluysa ya da süre dolarsa
+    AdmissionRejected: çağıran önbellekte/indekste olanla cevap verir ya da 503 + Retry-After döner.
+    """
+
+    def __init__(self, max_active: int = ADMIT_MAX_ACTIVE, per_host: int = ADMIT_PER_HOST,
+                 max_queue: int = ADMIT_MAX_QUEUE, queue_wait_s: float = ADMIT_QUEUE_WAIT_S):
+        self.max_active   = max_active
+        self.per_host     = per_host
+        self.max_queue    = max_queue
+        self.queue_wait_s = queue_wait_s
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.active = self.waiting = self.peak_waiting = 0
+        self.admitted = self.queued = 0
+        self.rejected: dict[str, int] = {REJECT_QUEUE_FULL: 0, REJECT_QUEUE_TIMEOUT: 0}
+        self.wait_ewma_s = 0.0    # Kuyrukta geçen süre (sadece bekleyenler)
+        self.hold_ewma_s = 1.0    # Slotun tutulduğu süre ≈ bir site taramasının süresi
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_active > 0
+
+    def _ensure(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semaphore'lar açıldıkları loop'a bağlı (test, benchmark turu): sayaçlarla birlikte yenile
+            self._global = asyncio.Semaphore(self.max_active)
+            self._hosts.clear()
+            self._loop = loop
+            self.active = self.waiting = 0
+
+    def saturated(self) -> bool:
+        """Kuyruk dolu mu? Doluysa yeni arama canlı taramaya hiç girmeden önbellekten cevaplanmalı."""
+        return self.enabled and self.waiting >= self.max_queue
+
+    def retry_after_s(self) -> int:
+        """Kuyruğun boşalma tahmini: (bekleyen + 1) tarama × ortalama tarama süresi / paralellik."""
+        if not self.enabled:
+            return RETRY_AFTER_MIN_S
+        estimate = (self.waiting + 1) * self.hold_ewma_s / self.max_active
+        return max(RETRY_AFTER_MIN_S, min(RETRY_AFTER_MAX_S, math.ceil(estimate)))
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(reason, self.retry_after_s())
+
+    @staticmethod
+    async def _acquire(host: asyncio.Semaphore, total: asyncio.Semaphore):
+        # Önce site kuyruğu: sıcak bir site global slotları boşuna tutmasın
+        await host.acquire()
+        try:
+            await total.acquire()
+        except BaseException:
+            host.release()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, host_key: str, deadline: Optional[float] = None):
+        """Canlı tarama için global + site slotu. `deadline` loop.time() cinsinden arama bitişidir."""
+        if not self.enabled:
+            yield
+            return
+        self._ensure()
+        loop, total = self._loop, self._global
+        host = self._hosts.setdefault(host_key, asyncio.Semaphore(self.per_host))
+
+        if host.locked() or total.locked():
+            if self.waiting >= self.max_queue:
+                self._reject(REJECT_QUEUE_FULL)
+            wait_s = self.queue_wait_s
+            if deadline is not None:
+                wait_s = min(wait_s, deadline - loop.time())
+            self.queued += 1
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            started = loop.time()
+            try:
+                await asyncio.wait_for(self._acquire(host, total), max(0.0, wait_s))
+            except asyncio.TimeoutError:
+                self._reject(REJECT_QUEUE_TIMEOUT)
+            finally:
+                self.waiting -= 1
+            self.wait_ewma_s += ADMIT_EWMA_ALPHA * (loop.time() - started - self.wait_ewma_s)
+        else:
+            await self._acquire(host, total)
+
+        self.admitted += 1
+        self.active += 1
+        held_from = loop.time()
+        try:
+            yield
+        finally:
+            if total is self._global:   # Eski loop'un slotu sayaçları bozmasın
+                self.active -= 1
+            self.hold_ewma_s += ADMIT_EWMA_ALPHA * (loop.time() - held_from - self.hold_ewma_s)
+            total.release()
+            host.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_active"   : self.max_active,
+            "per_host"     : self.per_host,
+            "max_queue"    : self.max_queue,
+            "queue_wait_s" : self.queue_wait_s,
+            "active"       : self.active,
+            "waiting"      : self.waiting,
+            "peak_waiting" : self.peak_waiting,
+            "admitted"     : self.admitted,
+            "queued"       : self.queued,
+            "rejected"     : dict(self.rejected),
+            "wait_ewma_ms" : round(self.wait_ewma_s * 1000, 1),
+            "hold_ewma_ms" : round(self.hold_ewma_s * 1000, 1),
+            "retry_after_s": self.retry_after_s(),
+        }
@@ -0,0 +1,192 @@
+import heapq
+import os
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from querynorm import fold_turkish, normalize_query
+
+if TYPE_CHECKING:
+    from scraper import SearchResult
+
+# ─────────────────────────── Birleştirme Ayarları ────────────────────
+AGG_TOP_K          = int(os.environ.get("PP_AGG_TOP_K", "30"))           # Yanıttaki en ucuz ürün grubu sayısı
+AGG_GROUP_OFFERS   = int(os.environ.get("PP_AGG_GROUP_OFFERS", "6"))     # Grup başına gönderilen en ucuz teklif
+AGG_MAX_NAME_WORDS = 8    # Parça no'su yoksa anahtar ilk bu kadar anlamlı kelimeden oluşur
+
+# Regex fallback satırlarının başlığı (scraper._regex_fallback). Ürün adı değil, sitelerin hepsinde aynı
+# yer tutucu: bu satırlar gruplanmaz, her biri kendi tekil grubudur.
+FALLBACK_TITLE = "Hassas Fiyat Yakalama"
+
+# Sitelerin arama sayfası adresleri (önek). Bu URL'ler ilan adresi değildir, teklif tekilleştirmede kullanılmaz.
+_SEARCH_URL_PREFIXES: tuple[str, ...] = ()
+
+def register_search_url(template: str):
+    """SiteConfig.base_search_url ('.../arama?q={query}') kaydı; scraper SITES tanımlanınca çağırır."""
+    global _SEARCH_URL_PREFIXES
+    prefix = template.split("{query}", 1)[0]
+    if prefix not in _SEARCH_URL_PREFIXES:
+        _SEARCH_URL_PREFIXES += (prefix,)
+
+def is_search_url(url: str) -> bool:
+    return bool(_SEARCH_URL_PREFIXES) and url.startswith(_SEARCH_URL_PREFIXES)
+
+# ─────────────────────────── Ürün Anahtarı ───────────────────────────
+# Satıcı başlıklarındaki pazarlama kelimeleri aynı ürünü ayırmasın
+_NOISE_WORDS = frozenset({
+    "yeni", "urun", "ucretsiz", "kargo", "kargolu", "indirim", "indirimli", "firsat", "kampanya",
+    "adet", "orjinal", "orijinal", "kaliteli", "garantili", "hizli", "teslimat", "stokta", "ve", "ile", "icin",
+})
+# Türkçe iyelik eki: "balatasi" / "balata", "filtresi" / "filtre", "motoru" / "motor"
+_SUFFIXES = ("si", "su", "i", "u")
+_NON_WORD = re.compile(r"[^\w]+")
+_PART_NO  = re.compile(r"(?=[a-z]*\d)(?=\d*[a-z])[a-z0-9]{8,}")
+# normalize_query model adını yanındaki yılla/koda birleştirebilir ('i20 2015' → 'i202015'): numara sayılmaz
+_MODEL_YEAR = re.compile(r"[a-z]{1,2}\d{1,3}(?:19|20)\d\d")
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 5 and word.isalpha():
+            return word[: -len(suffix)]
+    return word
+
+@lru_cache(maxsize=16384)
+def product_key(title: str) -> tuple[str, str]:
+    """Farklı sitelerdeki aynı ürün için ortak anahtar ve (varsa) parça numarası.
+
+    Başlık normalize_query ile katlanır (parça no'ları birleşik). Parça numarası varsa anahtar odur:
+    'BOSCH 0 986 494 524 Ön Balata' ve 'Bosch 0986494524 Fren Balatası Ön' → 'pn:0986494524'.
+    Yoksa gürültü kelimeleri atılmış, eki kırpılmış kelime kümesi: kelime sırası önemsizdir. Bu kümede
+    gruplar birleştirilmez; 'i20 2015' ile '2015 ... i20' aynı anahtara düşer.
+    """
+    words = normalize_query(title).split()
+    # Harf + rakam karışık en az 8 karakter ('1k0698151') ya da en az 9 hane ('0986494524'); model kodu, yıl değil
+    part_numbers = [w for w in words if (w.isdigit() and len(w) >= 9) or (_PART_NO.fullmatch(w) and not _MODEL_YEAR.fullmatch(w))]
+    if part_numbers:
+        # Birden fazla numara (OEM + muadil) varsa en uzunu; eşitse alfabetik ilki, sıra sitelere göre değişmesin
+        part_no = min(part_numbers, key=lambda w: (-len(w), w))
+        return "pn:" + part_no, part_no
+    words = _NON_WORD.sub(" ", fold_turkish(title)).split()
+    stems = sorted({_stem(w) for w in words if w not in _NOISE_WORDS})
+    return "t:" + " ".join(stems[:AGG_MAX_NAME_WORDS]), ""
+
+# ─────────────────────────── Ürün Grubu ──────────────────────────────
+class ProductGroup:
+    """Aynı ürünün sitelerdeki teklifleri. Teklifler URL'ye göre tekildir (URL arama sayfasıysa
+    site + başlık + fiyata göre); en ucuzu `best`.
+
+    Teklifler yanıttaki `data` listesinin sırasıyla (indeks, sonuç) olarak tutulur: gruplar sonuçları
+    tekrar göndermez, ön yüz `data[indeks]` ile çizer.
+    """
+
+    __slots__ = ("key", "part_no", "offers", "best")
+
+    def __init__(self, key: str, part_no: str):
+        self.key     = key
+        self.part_no = part_no
+        self.offers: dict[str, tuple[int, "SearchResult"]] = {}
+        self.best: Optional["SearchResult"] = None
+
+    @property
+    def price(self) -> float:
+        return self.best.price_numeric
+
+    def add(self, index: int, result: "SearchResult") -> bool:
+        """Teklifi ekler; grubun en ucuz fiyatı düştüyse True."""
+        if result.url and not is_search_url(result.url):
+            dedup = result.url
+        else:
+            dedup = f"{result.site_name}|{result.part_name}|{result.price_numeric}"
+        known = self.offers.get(dedup)
+        if known is not None and known[1].price_numeric <= result.price_numeric:
+            return False   # Aynı ilan (önbellek + canlı, iki strateji) ikinci kez geldi
+        self.offers[dedup] = (index, result)
+        if self.best is None or result.price_numeric < self.best.price_numeric:
+            self.best = result
+            return True
+        return False
+
+    def to_dict(self, max_offers: int = AGG_GROUP_OFFERS) -> dict:
+        """Çizime hazır grup: fiyat aralığı ve ucuzdan pahalıya en fazla `max_offers` teklifin `data` indeksi (ilki en ucuz)."""
+        offers = sorted(self.offers.values(), key=lambda o: (o[1].price_numeric, o[0]))
+        d = {
+            "key"          : self.key,
+            "price_numeric": self.best.price_numeric,
+            "price_max"    : offers[-1][1].price_numeric,
+            "site_count"   : len({r.site_name for _, r in offers}),
+            "offer_count"  : len(offers),
+            "offers"       : [i for i, _ in offers[:max_offers]],
+        }
+        if self.part_no:
+            d["part_no"] = self.part_no
+        return d
+
+# ─────────────────────────── Artımlı Top-k ───────────────────────────
+class Aggregator:
+    """Site sonuçlarını geldikçe ürün gruplarına ayırır ve en ucuz `top_k` grubu bir yığında tutar.
+
+    Yığın, fiyatı ters çevrilmiş bir max-heap'tir: kökte top-k'nın en pahalısı durur. Grup fiyatları
+    sadece düşebildiği için yeni/ucuzlayan grup kökle kıyaslanır ve gerekirse onun yerine geçer;
+    her site sonucu O(log k) ile işlenir, akışta her adımda tüm listeyi yeniden sıralamak gerekmez.
+    """
+
+    def __init__(self, top_k: int = AGG_TOP_K):
+        self.top_k = max(1, top_k)
+        self.groups: dict[str, ProductGroup] = {}
+        self._heap: list[tuple[float, int, str]] = []   # (-fiyat, -sıra, anahtar)
+        self._in_top: set[str] = set()
+        self._seq = 0
+        self.seen = 0   # Eklenen tüm sonuçlar (hatalılar dahil) = sıradaki `data` indeksi
+
+    def add(self, results: Iterable["SearchResult"]) -> bool:
+        """Bir sitenin (ya da herhangi bir parçanın) sonuçlarını `data`ya eklendikleri sırayla ekler; top-k değiştiyse True."""
+        changed = False
+        for r in results:
+            index = self.seen
+            self.seen += 1
+            if not r.success or not r.price_numeric:
+                continue
+            if r.part_name.startswith(FALLBACK_TITLE):
+                key, part_no = f"fb:{index}", ""   # Yer tutucu başlık: başka sonuçla birleşmez
+            else:
+                key, part_no = product_key(r.part_name or r.url)
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = ProductGroup(key, part_no)
+            if group.add(index, r):
+                changed |= self._offer(group)
+            elif key in self._in_top:
+                changed = True   # Fiyat aynı, teklif listesi büyüdü
+        return changed
+
+    def _offer(self, group: ProductGroup) -> bool:
+        self._seq += 1
+        entry = (-group.price, -self._seq, group.key)   # Eşit fiyatta önce gelen önde kalır
+        if group.key in self._in_top:
+            # Zaten listede, fiyatı düştü: girdiyi güncelle (k küçük, heapify O(k))
+            self._heap = [e for e in self._heap if e[2] != group.key]
+            self._heap.append(entry)
+            heapq.heapify(self._heap)
+            return True
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            _, _, evicted = heapq.heapreplace(self._heap, entry)
+            self._in_top.discard(evicted)
+        else:
+            return False
+        self._in_top.add(group.key)
+        return True
+
+    def top(self) -> list[ProductGroup]:
+        """En ucuzdan pahalıya top-k grup."""
+        return [self.groups[key] for _, _, key in sorted(self._heap, reverse=True)]
+
+    def to_list(self, max_offers: int = AGG_GROUP_OFFERS) -> list[dict]:
+        return [g.to_dict(max_offers) for g in self.top()]
+
+def aggregate(results: Iterable["SearchResult"], top_k: int = AGG_TOP_K) -> list[dict]:
+    """Tek seferlik: sonuç listesinden en ucuz top_k ürün grubu (çizime hazır)."""
+    agg = Aggregator(top_k)
+    agg.add(results)
+    return agg.to_list()
@@ -1,7 +1,11 @@
+import asyncio
 import sys
 import os
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, RedirectResponse, Response, StreamingResponse
 
 # Root dizinini path'e ekle (scraper.py'ye erişmek için)
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,9 +13,30 @@ root_dir = os.path.dirname(current_dir)
 if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
-from scraper import ScraperEngine
+from pydantic import BaseModel
 
-app = FastAPI(title="ParçaPusula API")
+from scraper import BATCH_MAX_QUERIES, COLD_START, OVERLOAD_ERROR, ScraperEngine
+from prewarm import PREWARM_ENABLED, PreWarmer
+from responses import dumps, etag_matches, json_response
+from aggregate import Aggregator, aggregate
+from imgproxy import IMG_DEFAULT_SIZE, IMG_MAX_AGE_S, PLACEHOLDER_IMAGE, ImageProxy, pick_size, verify
+from metrics import SEARCH_SECONDS, SERVER_TIMING_DEFAULT, register_gauges, render_prometheus, server_timing_header, start_request_timing
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Uzun ömürlü sunucuda ilk istek katman import'larını beklemesin (serverless'ta PP_COLD_START=1: tembel yükleme)
+    if not COLD_START:
+        engine.warm_up()
+    # Uzun ömürlü sunucuda popüler sorguları arkada sıcak tut (serverless'ta PP_PREWARM kapalı kalmalı)
+    if PREWARM_ENABLED:
+        warmer.start()
+    yield
+    await warmer.stop()
+    # Kapanışta havuzdaki keep-alive bağlantıları düzgünce kapat
+    await engine.close()
+    await images.close()
+
+app = FastAPI(title="ParçaPusula API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,17 +47,220 @@ app.add_middleware(
 )
 
 engine = ScraperEngine()
+warmer = PreWarmer(engine)
+images = ImageProxy()
+
+overload_responses = 0
+
+def _overloaded(results: list) -> bool:
+    """Hiçbir site cevap vermedi ve en az biri aşırı yük yüzünden canlı taramaya alınmadı mı?"""
+    return not any(r.success for r in results) and any(r.error_msg == OVERLOAD_ERROR for r in results)
+
+def _busy_response(request: Request):
+    global overload_responses
+    overload_responses += 1
+    retry_after = engine.admission.retry_after_s()
+    payload = {"status": "busy", "message": "Sunucu şu an çok yoğun, lütfen biraz sonra tekrar deneyin.", "retry_after_s": retry_after}
+    return json_response(request, payload, {"Retry-After": str(retry_after), "Cache-Control": "no-store"}, status_code=503)
+
+def _engine_gauges() -> list:
+    st = engine.stats()
+    out = [
+        ("parcapusula_cache_entries", "Önbellekteki (site, sorgu) kaydı.", {}, st["cache"]["entries"]),
+        ("parcapusula_singleflight_in_flight", "Şu an uçuştaki site taraması.", {}, st["singleflight"]["in_flight"]),
+        ("parcapusula_singleflight_coalesced_total", "Mevcut uçuşa eklemlenen istek.", {}, st["singleflight"]["coalesced"]),
+        ("parcapusula_hedges_total", "Başlatılan hedge istek.", {}, st["scheduler"]["hedges"]),
+        ("parcapusula_deadline_timeouts_total", "Deadline'a takılan site araması.", {}, st["scheduler"]["timeouts"]),
+        ("parcapusula_parse_pending", "Ayrıştırma havuzunda çalışan + bekleyen iş.", {}, st["parse_pool"]["pending"]),
+        ("parcapusula_parse_rejected_total", "Kuyruk dolu olduğu için reddedilen ayrıştırma.", {}, st["parse_pool"]["rejected"]),
+        ("parcapusula_admission_active", "Slot tutan canlı site taraması.", {}, st["admission"]["active"]),
+        ("parcapusula_admission_waiting", "Slot bekleyen canlı site taraması (kuyruk derinliği).", {}, st["admission"]["waiting"]),
+        ("parcapusula_admission_wait_seconds", "Kuyrukta bekleme süresi (EWMA).", {}, st["admission"]["wait_ewma_ms"] / 1000),
+        ("parcapusula_admission_degraded_total", "Aşırı yükte sadece önbellek/indeksle cevaplanan site araması.", {}, st["admission"]["degraded"]),
+        ("parcapusula_overload_responses_total", "Aşırı yük yüzünden 503 dönen istek.", {}, overload_responses),
+    ]
+    img = images.stats()
+    for kind in ("hits", "misses", "failures"):
+        out.append(("parcapusula_img_events_total", "Görsel vekili olayları.", {"kind": kind}, img[kind]))
+    for reason, n in st["admission"]["rejected"].items():
+        out.append(("parcapusula_admission_rejected_total", "Kabul edilmeyen canlı site taraması.", {"reason": reason}, n))
+    for kind in ("hits", "stale_hits", "misses", "evictions"):
+        out.append(("parcapusula_cache_events_total", "Önbellek olayları.", {"kind": kind}, st["cache"][kind]))
+    if st["shared"] is not None:
+        # İşçi bazında (her işçi kendi sayaçlarını verir); cross_hits = başka işçinin yazdığı kayıttan isabet
+        for kind in ("hits", "cross_hits", "misses", "writes", "evictions", "dropped", "errors"):
+            out.append(("parcapusula_shared_cache_events_total", "Paylaşımlı önbellek olayları (bu işçi).",
+                        {"kind": kind, "backend": st["shared"]["backend"]}, st["shared"][kind]))
+    if st["capture"] is not None:
+        for kind in ("captured", "deduped", "dropped", "evictions", "errors"):
+            out.append(("parcapusula_capture_events_total", "Ham yanıt kaydı olayları (bu işçi).", {"kind": kind}, st["capture"][kind]))
+    for layer, n in st["scheduler"]["wins"].items():
+        out.append(("parcapusula_layer_wins_total", "Katman bazında kazanılan site araması.", {"layer": layer}, n))
+    return out
+
+register_gauges(_engine_gauges)
 
 @app.get("/api/search")
-async def search_api(q: str):
-    """HTML ön yüzünden gelen aramaları karşılar, motoru çalıştırır ve sonuçları geri yollar."""
+async def search_api(q: str, request: Request, timing: bool = False):
+    """HTML ön yüzünden gelen aramaları karşılar, motoru çalıştırır ve sonuçları geri yollar.
+
+    Yanıt içerik özetli ETag taşır: sonuçlar değişmediyse Service Worker'ın If-None-Match'ine 304 döner.
+    """
+    # timing=1 (veya PP_SERVER_TIMING=1) ise aşama süreleri Server-Timing başlığında döner
+    stage_timing = start_request_timing()
+    started = time.perf_counter()
+    warmer.track(q)
+    # Tarama kuyruğu zaten doluysa bekletme: sadece önbellek/indeksteki sonuçlar, o da yoksa hızlı 503
+    cached_only = engine.admission.saturated()
+    headers = {}
     try:
-        results_raw = await engine.search_all(q)
-        results_json = [res.__dict__ for res in results_raw]
-        return {"status": "success", "data": results_json}
+        results_raw = await engine.search_all(q, cached_only=cached_only)
+        if _overloaded(results_raw):
+            return _busy_response(request)
+        payload = {"status": "success", "data": [res.to_dict() for res in results_raw], "groups": aggregate(results_raw)}
+        if cached_only or any(r.error_msg == OVERLOAD_ERROR for r in results_raw):
+            payload["degraded"] = True
+            headers["Retry-After"] = str(engine.admission.retry_after_s())
+    except Exception as e:
+        payload = {"status": "error", "message": str(e)}
+    elapsed = time.perf_counter() - started
+    SEARCH_SECONDS.observe(elapsed, "search")
+    if timing or SERVER_TIMING_DEFAULT:
+        headers["Server-Timing"] = server_timing_header(stage_timing, elapsed)
+    return json_response(request, payload, headers)
+
+@app.get("/api/search/stream")
+async def search_stream_api(q: str, request: Request):
+    """Aramayı NDJSON olarak akıtır: her site bitince bir "site" satırı, en ucuz ürün grupları değiştiyse
+    bir "groups" satırı, en sonda bir "done" özeti."""
+    warmer.track(q)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    cached = None
+    if engine.admission.saturated():
+        # Aşırı yük: akış başlamadan önbellekten cevaplanabiliyor mu bak; hiçbir şey yoksa hızlı 503
+        cached = await engine.search_all(q, cached_only=True)
+        if _overloaded(cached):
+            return _busy_response(request)
+        headers["Retry-After"] = str(engine.admission.retry_after_s())
+
+    async def _cached_sites():
+        by_site: dict[str, list] = {}
+        for r in cached:
+            by_site.setdefault(r.site_name, []).append(r)
+        for item in by_site.items():
+            yield item
+
+    async def ndjson():
+        started = time.monotonic()
+        start_request_timing()
+        total = ok_sites = 0
+        agg = Aggregator()
+        try:
+            async for site_name, results in (engine.search_stream(q) if cached is None else _cached_sites()):
+                total += len(results)
+                ok_sites += any(r.success for r in results)
+                line = {"event": "site", "site_name": site_name, "data": [res.to_dict() for res in results]}
+                yield dumps(line) + b"\n"
+                # Gruplar artımlı güncellenir; listeyi değiştirmeyen site için satır gönderilmez
+                if agg.add(results):
+                    yield dumps({"event": "groups", "data": agg.to_list()}) + b"\n"
+            summary = {
+                "event"     : "done",
+                "status"    : "success",
+                "total"     : total,
+                "sites"     : ok_sites,
+                "elapsed_ms": int((time.monotonic() - started) * 1000),
+            }
+            if cached is not None:
+                summary["degraded"] = True
+            SEARCH_SECONDS.observe(time.monotonic() - started, "stream")
+            yield dumps(summary) + b"\n"
+        except Exception as e:
+            yield dumps({"event": "done", "status": "error", "message": str(e)}) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson", headers=headers)
+
+class BatchRequest(BaseModel):
+    queries: list[str]
+
+@app.post("/api/search/batch")
+async def search_batch_api(body: BatchRequest, request: Request):
+    """Parça listesini tek istekte arar; her benzersiz sorgu bitince bir "query" satırı, en sonda "done" özeti (NDJSON)."""
+    if len(body.queries) > BATCH_MAX_QUERIES:
+        payload = {"status": "error", "message": f"En fazla {BATCH_MAX_QUERIES} sorgu gönderilebilir."}
+        return json_response(request, payload, status_code=413)
+    for q in body.queries:
+        warmer.track(q)
+
+    async def ndjson():
+        started = time.monotonic()
+        start_request_timing()
+        done = 0
+        try:
+            async for query, inputs, results in engine.search_batch(body.queries):
+                done += 1
+                line = {"event": "query", "query": query, "inputs": inputs, "data": [res.to_dict() for res in results], "groups": aggregate(results)}
+                yield dumps(line) + b"\n"
+            summary = {
+                "event"     : "done",
+                "status"    : "success",
+                "queries"   : len(body.queries),
+                "unique"    : done,
+                "elapsed_ms": int((time.monotonic() - started) * 1000),
+            }
+            SEARCH_SECONDS.observe(time.monotonic() - started, "batch")
+            yield dumps(summary) + b"\n"
+        except Exception as e:
+            yield dumps({"event": "done", "status": "error", "message": str(e)}) + b"\n"
+
+    return StreamingResponse(
+        ndjson(),
+        media_type = "application/x-ndjson",
+        headers    = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/img")
+async def image_api(u: str, request: Request, w: int = IMG_DEFAULT_SIZE, s: str = ""):
+    """Sonuç görselinin küçültülmüş kopyası (disk önbelleğinden). Alınamazsa yerel yer tutucuya yönlendirir."""
+    # İmzasız/geçersiz imza da yer tutucuya: JS'siz istemciler ve önbellekteki eski HTML aynı şekilde düşer
+    found = await images.get(u, pick_size(w)) if verify(u, s) else None
+    if found is None:
+        # Kısa süreli: kaynak düzelirse tarayıcı birkaç dakika sonra yeniden denesin
+        return RedirectResponse(PLACEHOLDER_IMAGE, status_code=302, headers={"Cache-Control": "public, max-age=300"})
+    body, media_type, digest = found
+    headers = {
+        "ETag"                  : f'"{digest}"',
+        "Cache-Control"         : f"public, max-age={IMG_MAX_AGE_S}, stale-while-revalidate=86400",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+@app.get("/api/history")
+async def history_api(url: str):
+    """Ürün URL'sinin indekslenmiş fiyat geçmişi (fiyat değişim noktaları, eskiden yeniye)."""
+    try:
+        points = await asyncio.to_thread(engine.price_history, url)
+        return {"status": "success", "url": url, "data": points}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics_api():
+    """Prometheus metin formatında aşama histogramları ve motor sayaçları."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/health")
+async def health_api():
+    """Site/katman bazında başarı oranı, gecikme ve devre kesici durumunu döner."""
+    return {"status": "success", "data": engine.health_stats()}
+
+@app.get("/api/stats")
+async def stats_api():
+    """Önbellek ve singleflight sayaçlarını döner (kapasite/isabet takibi için)."""
+    return {"status": "success", "data": {**engine.stats(), "prewarm": warmer.stats(), "images": images.stats()}}
+
 from fastapi.responses import FileResponse
 
 PUBLIC_DIR = os.path.join(root_dir, "public")
@@ -0,0 +1,186 @@
+"""Sonuç birleştirme benchmark'ı: büyük sentetik sonuç kümelerinde ürün gruplama doğruluğu ve
+artımlı top-k (Aggregator) ile her site geldiğinde baştan gruplayıp sıralamanın maliyeti.
+
+    python -m bench.aggregate
+    python -m bench.aggregate --sizes 1000,10000,100000 --chunks 6 --top-k 30
+"""
+import argparse
+import random
+import sys
+import time
+
+from aggregate import AGG_TOP_K, Aggregator, product_key
+from querynorm import normalize_query
+from scraper import SITES, SearchResult
+
+_PARTS = ("Fren Balatası", "Fren Diski", "Yağ Filtresi", "Hava Filtresi", "Amortisör", "Debriyaj Seti",
+          "Triger Seti", "Su Pompası", "Buji", "Rot Başı", "Salıncak", "Termostat")
+_BRANDS = ("Bosch", "Valeo", "Mann", "Sachs", "TRW", "Febi", "Mahle", "NGK")
+_CARS = ("Fiat Egea", "Renault Clio", "VW Golf", "Ford Focus", "Toyota Corolla", "Hyundai i20")
+_SIDES = ("Ön", "Arka", "")
+_NOISE = ("Orijinal", "Ücretsiz Kargo", "Yeni", "Fırsat", "")
+
+def _ascii(text: str) -> str:
+    return text.translate(str.maketrans("ıİşŞğĞüÜöÖçÇ", "iIsSgGuUoOcC"))
+
+def _spaced(part_no: str, rng: random.Random) -> str:
+    """Sitelerin parça numarasını farklı yazması: '0986494524', '0 986 494 524', '0986-494-524'."""
+    style = rng.randrange(3)
+    if style == 0:
+        return part_no
+    groups = [part_no[:1], part_no[1:4], part_no[4:7], part_no[7:]] if part_no.isdigit() else [part_no[:3], part_no[3:6], part_no[6:]]
+    return (" " if style == 1 else "-").join(g for g in groups if g)
+
+def build_products(n: int, rng: random.Random) -> list[dict]:
+    products = []
+    for i in range(n):
+        has_no = rng.random() < 0.7
+        part_no = ""
+        if has_no:
+            part_no = str(rng.randrange(10**9, 10**10)) if rng.random() < 0.6 else f"{rng.randrange(1, 9)}k{rng.randrange(10**6, 10**7)}"
+        products.append({
+            "id"     : i,
+            "brand"  : rng.choice(_BRANDS),
+            "part"   : rng.choice(_PARTS),
+            "car"    : rng.choice(_CARS),
+            "side"   : rng.choice(_SIDES),
+            "part_no": part_no,
+            "model"  : f"{rng.randrange(1000, 9999)}" if not has_no else "",   # Numarasızları ayıran model kodu
+            "price"  : rng.randint(200, 20000),
+        })
+    return products
+
+def title_of(p: dict, rng: random.Random) -> str:
+    """Aynı ürün, satıcıya göre farklı başlık: büyük/küçük harf, ASCII yazım, kelime sırası, pazarlama eki."""
+    words = [p["brand"], p["part"], p["car"], p["side"]]
+    if p["model"]:
+        words.append(p["model"])
+    rng.shuffle(words)
+    if p["part_no"]:
+        words.insert(rng.randrange(len(words) + 1), _spaced(p["part_no"], rng))
+    words.append(rng.choice(_NOISE))
+    title = " ".join(w for w in words if w)
+    style = rng.randrange(4)
+    if style == 1:
+        title = title.upper()
+    elif style == 2:
+        title = _ascii(title)
+    elif style == 3:
+        title = _ascii(title).lower()
+    return title
+
+def build_results(size: int, seed: int) -> tuple[list[list[SearchResult]], dict[int, int]]:
+    """Site başına sonuç listeleri (akıştaki sıra) ve her sonucun gerçek ürün kimliği (data indeksiyle)."""
+    rng = random.Random(seed)
+    products = build_products(max(1, size // 4), rng)   # Ürün başına ~4 teklif
+    per_site: list[list[SearchResult]] = [[] for _ in SITES]
+    truth_by_obj: dict[int, int] = {}
+    for n in range(size):
+        p = rng.choice(products)
+        site_i = rng.randrange(len(SITES))
+        if rng.random() < 0.05:
+            per_site[site_i].append(SearchResult(site_name=SITES[site_i].name, success=False, error_msg="Ürün Bulunamadı"))
+            continue
+        price = round(p["price"] * rng.uniform(0.85, 1.25), 2)
+        r = SearchResult(
+            site_name     = SITES[site_i].name,
+            success       = True,
+            part_name     = title_of(p, rng),
+            price_str     = f"{price:,.2f} TL",
+            price_numeric = price,
+            url           = f"https://site{site_i}.example/urun/{p['id']}-{n}",
+        )
+        per_site[site_i].append(r)
+        truth_by_obj[id(r)] = p["id"]
+        if rng.random() < 0.03:
+            per_site[site_i].append(r)   # Aynı ilan iki kez (önbellek + canlı)
+    return per_site, truth_by_obj
+
+def chunked(per_site: list[list[SearchResult]], chunks: int) -> list[list[SearchResult]]:
+    """Akış: siteler sırayla, her site en fazla `chunks` parça halinde gelir."""
+    out = []
+    for rl in per_site:
+        step = max(1, -(-len(rl) // max(1, chunks // len(per_site) or 1)))
+        out.extend(rl[i:i + step] for i in range(0, len(rl), step))
+    return [c for c in out if c]
+
+# ─────────────────────────── Karşılaştırılan Yollar ──────────────────
+def incremental(stream: list[list[SearchResult]], top_k: int) -> tuple[float, list[dict]]:
+    t0 = time.perf_counter()
+    agg = Aggregator(top_k)
+    groups: list[dict] = []
+    for part in stream:
+        if agg.add(part):
+            groups = agg.to_list()
+    return time.perf_counter() - t0, groups
+
+def regroup_each_time(stream: list[list[SearchResult]], top_k: int) -> tuple[float, list[tuple[float, str]]]:
+    """Artımsız yol: her parça geldiğinde tüm sonuçları baştan gruplar, bütün grupları sıralar."""
+    t0 = time.perf_counter()
+    collected: list[SearchResult] = []
+    top: list[tuple[float, str]] = []
+    for part in stream:
+        collected.extend(part)
+        best: dict[str, float] = {}
+        for r in collected:
+            if r.success and r.price_numeric:
+                key = product_key(r.part_name)[0]
+                if key not in best or r.price_numeric < best[key]:
+                    best[key] = r.price_numeric
+        top = sorted((price, key) for key, price in best.items())[:top_k]
+    return time.perf_counter() - t0, top
+
+def grouping_quality(per_site: list[list[SearchResult]], truth: dict[int, int]) -> dict:
+    """Bölünme: gerçek ürün başına grup sayısı (ideal 1). Karışma: birden fazla ürün içeren grup oranı (ideal 0)."""
+    agg = Aggregator(top_k=1)
+    for rl in per_site:
+        agg.add(rl)
+    groups_of: dict[int, set[str]] = {}
+    products_of: dict[str, set[int]] = {}
+    for g in agg.groups.values():
+        for _, r in g.offers.values():
+            pid = truth[id(r)]
+            groups_of.setdefault(pid, set()).add(g.key)
+            products_of.setdefault(g.key, set()).add(pid)
+    naive_keys = {(r.site_name, r.part_name) for rl in per_site for r in rl if r.success}
+    return {
+        "groups"          : len(agg.groups),
+        "products"        : len(groups_of),
+        "naive_rows"      : len(naive_keys),
+        "split"           : round(sum(len(s) for s in groups_of.values()) / len(groups_of), 3),
+        "mixed_pct"       : round(100 * sum(len(s) > 1 for s in products_of.values()) / len(products_of), 2),
+    }
+
+def cold_keys():
+    product_key.cache_clear()
+    normalize_query.cache_clear()
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ParçaPusula sonuç birleştirme (gruplama + top-k) benchmark'ı")
+    ap.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[1000, 10000, 50000])
+    ap.add_argument("--chunks", type=int, default=24, help="Akıştaki toplam parça sayısı (siteler arasında bölünür)")
+    ap.add_argument("--top-k", type=int, default=AGG_TOP_K)
+    ap.add_argument("--seed", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    print(f"top_k={args.top_k}, akış ~{args.chunks} parça")
+    print(f"{'sonuç':>8} {'grup':>7} {'ürün':>7} {'bölünme':>8} {'karışık%':>9} {'artımlı ms':>11} {'baştan ms':>10} {'hız':>6} {'µs/sonuç':>9}")
+    for size in args.sizes:
+        per_site, truth = build_results(size, args.seed)
+        stream = chunked(per_site, args.chunks)
+        # Her yol anahtarları soğuk önbellekle hesaplar
+        cold_keys()
+        t_inc, groups = incremental(stream, args.top_k)
+        cold_keys()
+        t_naive, top = regroup_each_time(stream, args.top_k)
+        # İki yol aynı en ucuz fiyatları bulmalı
+        if [g["price_numeric"] for g in groups] != [price for price, _ in top]:
+            print("[BENCH] HATA: artımlı top-k ile baştan sıralama farklı")
+            return 1
+        q = grouping_quality(per_site, truth)
+        print(f"{size:>8} {q['groups']:>7} {q['products']:>7} {q['split']:>8} {q['mixed_pct']:>9} "
+              f"{t_inc * 1000:>11.1f} {t_naive * 1000:>10.1f} {t_naive / t_inc:>5.1f}x {t_inc / size * 1e6:>9.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
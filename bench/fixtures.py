@@ -0,0 +1,127 @@
+import json
+import os
+import random
+
+# ─────────────────────────── Fixture Sayfaları ───────────────────────
+# bench/fixtures/<SiteAdı>.html (veya .json) varsa kayıtlı sayfa olduğu gibi servis edilir.
+# Yoksa her sitenin SiteConfig seçicilerine uyan sentetik bir sayfa üretilir.
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_PARTS = ["Fren Balatası", "Triger Seti", "Amortisör", "Debriyaj Seti", "Yağ Filtresi", "Buji Takımı", "Radyatör", "Rot Başı"]
+_CARS  = ["Fiat Egea", "Renault Clio", "VW Passat", "Ford Focus", "Toyota Corolla", "Opel Astra"]
+
+def _products(n: int, seed: int) -> list[dict]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        price = round(rnd.uniform(120, 9500), 2)
+        out.append({
+            "name" : f"{rnd.choice(_CARS)} {rnd.choice(_PARTS)} {rnd.randint(1000, 9999)}",
+            "price": price,
+            "tr"   : f"{price:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),   # 1.234,56
+            "slug" : f"urun-{seed}-{i}",
+            "img"  : f"https://cdn.example.com/img/{seed}/{i}.jpg",
+        })
+    return out
+
+def _pad(html_parts: list[str], size_kb: int) -> str:
+    """Sayfayı gerçekçi boyuta şişirir (menü/footer/öneri blokları gibi alakasız markup)."""
+    body = "".join(html_parts)
+    filler = '<div class="recommendation"><span class="label">Önerilen ürünler</span><a href="/kampanya">Kampanyalar</a></div>\n'
+    need = size_kb * 1024 - len(body.encode("utf-8"))
+    return body + filler * max(0, need // len(filler))
+
+def _onlineyedekparca(p: list[dict]) -> list[str]:
+    return [
+        f'<div class="showcase"><img class="object-fit-contain" data-src="{x["img"]}">'
+        f'<div class="showcase-title"><a href="/urun/{x["slug"]}">{x["name"]}</a></div>'
+        f'<div class="showcase-price"><span>₺{x["tr"]}</span></div></div>\n'
+        for x in p
+    ]
+
+def _alloyedekparca(p: list[dict]) -> list[str]:
+    return [
+        f'<div class="product-item"><img class="product-image" src="{x["img"]}">'
+        f'<a class="product-name" href="/urun/{x["slug"]}">{x["name"]}</a>'
+        f'<div class="product-price">{x["tr"]} TL</div></div>\n'
+        for x in p
+    ]
+
+def _parcadeposu(p: list[dict]) -> list[str]:
+    return [
+        f'<div class="showcase"><div class="showcase-image"><img class="lazy" data-src="{x["img"]}"></div>'
+        f'<div class="showcase-title"><a href="/{x["slug"]}">{x["name"]}</a></div>'
+        f'<div class="showcase-price-new">{x["tr"]} TL</div></div>\n'
+        for x in p
+    ]
+
+def _n11(p: list[dict]) -> tuple[list[str], str]:
+    cards = [
+        f'<li class="column"><div class="imgBox"><img class="lazy" data-original="{x["img"]}"></div>'
+        f'<h3 class="productName">{x["name"]}</h3><ins>{x["tr"]} TL</ins></li>\n'
+        for x in p
+    ]
+    ld = {
+        "@type": "ItemList",
+        "itemListElement": [
+            {"@type": "ListItem", "position": i + 1, "url": f"https://www.n11.com/urun/{x['slug']}",
+             "item": {"name": x["name"], "url": f"https://www.n11.com/urun/{x['slug']}",
+                      "offers": {"price": str(x["price"])}, "image": [x["img"]]}}
+            for i, x in enumerate(p[:20])
+        ],
+    }
+    return cards, f'<script type="application/ld+json">{json.dumps(ld, ensure_ascii=False)}</script>'
+
+def _hepsiburada(p: list[dict]) -> tuple[list[str], str]:
+    cards = [
+        f'<li class="productListContent-item"><img data-test-id="product-image" src="{x["img"]}">'
+        f'<h3 data-test-id="product-card-name">{x["name"]}</h3>'
+        f'<div data-test-id="price-current-price">{x["tr"]} TL</div></li>\n'
+        for x in p
+    ]
+    next_data = {
+        "props": {"pageProps": {"productModel": {"productList": [
+            {"name": x["name"], "price": {"value": x["price"]}, "url": f"/{x['slug']}-p-HB{i}",
+             "imageUrls": [{"url": x["img"]}]}
+            for i, x in enumerate(p[:24])
+        ]}}},
+    }
+    # Gerçek sayfadaki gibi __NEXT_DATA__ gövdenin en sonunda
+    return cards, f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data, ensure_ascii=False)}</script>'
+
+def _sahibinden_json(p: list[dict]) -> str:
+    return json.dumps({"classifieds": [
+        {"title": x["name"], "price": f"{x['tr']} TL", "url": f"/ilan/{x['slug']}", "thumbnailUrl": x["img"]}
+        for x in p[:20]
+    ]}, ensure_ascii=False)
+
+def build_page(site: str, size_kb: int = 300, n_products: int = 40, seed: int = 1) -> tuple[bytes, str]:
+    """(gövde, content-type) döner."""
+    for ext, ctype in ((".html", "text/html; charset=utf-8"), (".json", "application/json; charset=utf-8")):
+        path = os.path.join(FIXTURE_DIR, site + ext)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                return f.read(), ctype
+
+    p = _products(n_products, seed)
+    if site == "Sahibinden":
+        return _sahibinden_json(p).encode("utf-8"), "application/json; charset=utf-8"
+
+    tail = ""
+    if site == "OnlineYedekParca":
+        cards = _onlineyedekparca(p)
+    elif site == "AlloYedekParca":
+        cards = _alloyedekparca(p)
+    elif site == "ParcaDeposu":
+        cards = _parcadeposu(p)
+    elif site == "n11":
+        cards, tail = _n11(p)
+    elif site == "Hepsiburada":
+        cards, tail = _hepsiburada(p)
+    else:
+        # Bilinmeyen site: sadece regex fallback'in yakalayacağı düz fiyatlar
+        cards = [f'<p><img src="{x["img"]}"> {x["name"]} {x["tr"]} TL</p>\n' for x in p]
+
+    head = f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{site}</title></head><body>\n'
+    html = head + _pad(cards, max(1, size_kb - len(tail) // 1024)) + tail + "</body></html>"
+    return html.encode("utf-8"), "text/html; charset=utf-8"
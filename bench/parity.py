@@ -0,0 +1,104 @@
+"""Ayrıştırıcı arka uç eşitliği: kayıtlı sayfalarda her kurulu arka ucun (selectolax / lxml / bs4)
+aynı SearchResult'ları çıkardığını doğrular.
+
+Sayfalar: her site için bench.fixtures.build_page (bench/fixtures/ altında kayıtlı sayfa varsa o) ve
+bench/parity/<Site>.<durum>.html altındaki uç durumlar (bozuk markup, entity, ld+json, widget, fallback).
+Her sayfada sitenin her stratejisi tek başına ve tanımlı sırayla çalıştırılır.
+
+    python -m bench.parity
+    python -m bench.parity --backends selectolax,bs4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+from typing import Iterator
+
+import parsing
+from bench.fixtures import build_page
+from scraper import SITES, SearchResult, _extract_job
+from sessions import base_domain
+
+PARITY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parity")
+ALL_BACKENDS = ("selectolax", "lxml", "bs4")
+
+def available_backends() -> list[str]:
+    out = []
+    for name in ALL_BACKENDS:
+        try:
+            parsing.parse_html("<html></html>", name)
+        except ImportError:
+            continue
+        out.append(name)
+    return out
+
+def iter_pages() -> Iterator[tuple[str, str, bytes, str]]:
+    """(site, sayfa adı, gövde, content-type)."""
+    for cfg in SITES:
+        body, ctype = build_page(cfg.name, size_kb=60)
+        yield cfg.name, f"{cfg.name}/fixture", body, ctype
+    for fname in sorted(os.listdir(PARITY_DIR)):
+        site, _, rest = fname.partition(".")
+        if not rest.endswith(".html"):
+            continue
+        with open(os.path.join(PARITY_DIR, fname), "rb") as f:
+            yield site, fname, f.read(), "text/html; charset=utf-8"
+
+@contextlib.contextmanager
+def use_backend(name: str):
+    """_extract_job'ın parse_html çağrıları bu arka uçla yapılsın."""
+    previous, parsing.BACKEND = parsing.BACKEND, name
+    try:
+        yield
+    finally:
+        parsing.BACKEND = previous
+
+def extract(backend: str, site: str, body: bytes, ctype: str, order: list[str]) -> tuple[list[SearchResult], str]:
+    cfg = next(c for c in SITES if c.name == site)
+    url = cfg.base_search_url.replace("{query}", "fren+balatasi")
+    with use_backend(backend), contextlib.redirect_stdout(io.StringIO()):
+        found, winner, _missed, _laps = _extract_job((site, url, base_domain(cfg.base_search_url), ctype, body, "utf-8", order))
+    return found, winner
+
+def check_page(site: str, body: bytes, ctype: str, backends: list[str]) -> list[str]:
+    """Arka uçlar arasındaki farklar (boşsa eşit). İlk arka uç referanstır."""
+    cfg = next(c for c in SITES if c.name == site)
+    problems = []
+    for order in [list(cfg.extractors)] + [[name] for name in cfg.extractors]:
+        ref_found, ref_winner = extract(backends[0], site, body, ctype, order)
+        for backend in backends[1:]:
+            found, winner = extract(backend, site, body, ctype, order)
+            if (found, winner) != (ref_found, ref_winner):
+                problems.append(f"{'+'.join(order)}: {backends[0]}={ref_winner}/{_brief(ref_found)} "
+                                f"≠ {backend}={winner}/{_brief(found)}")
+    return problems
+
+def _brief(results: list[SearchResult]) -> list:
+    return [(r.part_name, r.price_numeric, r.url, r.image_url) if r.success else r.error_msg for r in results]
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ParçaPusula ayrıştırıcı arka uç eşitliği")
+    ap.add_argument("--backends", type=lambda s: s.split(","), help="Virgülle; verilmezse kurulu olanların hepsi")
+    args = ap.parse_args(argv)
+
+    backends = args.backends or available_backends()
+    if len(backends) < 2:
+        print(f"[BENCH] Karşılaştırılacak en az iki arka uç gerekli (kurulu: {', '.join(backends) or '-'})")
+        return 2
+    print(f"Arka uçlar: {', '.join(backends)} (referans: {backends[0]})")
+    failed = 0
+    for site, page, body, ctype in iter_pages():
+        problems = check_page(site, body, ctype, backends)
+        print(f"  {'FARK' if problems else 'ok':<5} {page}")
+        for p in problems:
+            print("        - " + p)
+        failed += bool(problems)
+    if failed:
+        print(f"[BENCH] HATA: {failed} sayfada arka uçlar farklı sonuç çıkardı.")
+        return 1
+    print("[BENCH] Tüm sayfalarda arka uçlar aynı sonuçları çıkardı.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Sorgu normalizasyonu benchmark'ı: gerçek sorgu varyantı korpusunda anahtar birleşmesi ve hız.
+
+    python -m bench.querynorm                     # bench/queries.txt
+    python -m bench.querynorm --corpus benim.txt --repeat 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+from querynorm import normalize_query
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "queries.txt")
+
+def legacy_normalize(query: str) -> str:
+    """Önceki anahtar: sadece boşluk + küçük harf."""
+    return " ".join(query.split()).lower()
+
+def load_corpus(path: str) -> tuple[list[list[str]], list[list[str]]]:
+    same, different = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            if line.startswith("!= "):
+                different.append([v.strip() for v in line[3:].split(" | ")])
+            else:
+                same.append([v.strip() for v in line.split(" | ")])
+    return same, different
+
+def hit_rate(groups: list[list[str]], key) -> float:
+    """Her varyant bir kez aransa önbellekten dönecek oran: (istek - benzersiz anahtar) / istek."""
+    requests = sum(len(g) for g in groups)
+    keys = {key(v) for g in groups for v in g}
+    return (requests - len(keys)) / requests if requests else 0.0
+
+def time_per_call(queries: list[str], fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    return (time.perf_counter() - t0) / (repeat * len(queries))
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Sorgu normalizasyonu korpus benchmark'ı")
+    ap.add_argument("--corpus", default=CORPUS_PATH)
+    ap.add_argument("--repeat", type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    same, different = load_corpus(args.corpus)
+    raw = normalize_query.__wrapped__   # lru_cache'siz ham maliyet
+    problems = []
+    for g in same:
+        keys = {raw(v) for v in g}
+        if len(keys) > 1:
+            problems.append(f"birleşmedi: {g} → {sorted(keys)}")
+    for g in different:
+        keys = [raw(v) for v in g]
+        if len(set(keys)) < len(keys):
+            problems.append(f"yanlış birleşti: {g} → {keys}")
+
+    queries = [v for g in same + different for v in g]
+    print(f"Korpus: {len(same)} grup, {sum(len(g) for g in same)} varyant, {len(different)} ayrı kalması gereken grup")
+    print(f"Önbellek isabeti (her varyant bir kez):  eski %{hit_rate(same, legacy_normalize) * 100:.1f}  →  yeni %{hit_rate(same, raw) * 100:.1f}")
+    print(f"Benzersiz anahtar:                       eski {len({legacy_normalize(v) for g in same for v in g})}  →  yeni {len({raw(v) for g in same for v in g})}")
+    print(f"Süre/çağrı:  eski {time_per_call(queries, legacy_normalize, args.repeat) * 1e6:.2f} µs  |  "
+          f"yeni (ham) {time_per_call(queries, raw, args.repeat) * 1e6:.2f} µs  |  "
+          f"yeni (lru) {time_per_call(queries, normalize_query, args.repeat) * 1e6:.2f} µs")
+    if problems:
+        print("[BENCH] HATA:")
+        for p in problems:
+            print("   - " + p)
+        return 1
+    print("[BENCH] Tüm varyant grupları doğru anahtara indi.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""ParçaPusula offline benchmark: search_all'ı yerel taklit sitelere karşı farklı eşzamanlılıklarda koşturur.
+
+    python -m bench.run                                  # varsayılan senaryo + baseline kontrolü
+    python -m bench.run --concurrency 1,8,32 --block-rate 0.1 --size-kb 800
+    python -m bench.run --save-baseline                  # mevcut sonuçları bench/baseline.json'a yaz
+    python -m bench.run --concurrency 64 --no-rate-limit --parse-pool inline   # ayrıştırma event loop'ta (karşılaştırma için)
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Optional
+
+from bench.standin import StandIn, StandInConfig
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Regresyon kontrolünde karşılaştırılan metrikler (hepsi "küçük daha iyi")
+GATED_METRICS = ("p50_ms", "p95_ms", "parse_cpu_ms", "peak_mb")
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+class ParseTimer:
+    """scraper.parse_html'i sarar; sadece event loop thread'inin CPU süresini ölçer (taklit sunucu thread'leri hariç)."""
+
+    def __init__(self, scraper_mod):
+        self.mod = scraper_mod
+        self.original = scraper_mod.parse_html
+        self.samples: list[float] = []
+
+    def __enter__(self):
+        original = self.original
+
+        def timed(*args, **kwargs):
+            t0 = time.thread_time()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.samples.append(time.thread_time() - t0)
+
+        self.mod.parse_html = timed
+        return self
+
+    def __exit__(self, *exc):
+        self.mod.parse_html = self.original
+
+LAG_PROBE_S = 0.01
+
+async def _probe_loop_lag(samples: list[float]):
+    """Event loop gecikmesi: kısa bir uykunun ne kadar geç uyandığı (parse loop'u bloklarsa büyür)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(LAG_PROBE_S)
+        samples.append(max(0.0, loop.time() - t0 - LAG_PROBE_S))
+
+async def _run_level(scraper_mod, concurrency: int, searches: int, tag: str,
+                     lag: Optional[list[float]] = None, rate_limit: bool = True) -> tuple[list[float], int, int]:
+    engine = scraper_mod.ScraperEngine()
+    engine.warm_up()   # Uzun ömürlü sunucu gibi: katmanlar ve ayrıştırma işçileri ölçümden önce hazır
+    if not rate_limit:
+        # Taklit sitelerde nezaket sınırı kapalı: yüksek eşzamanlılıkta darboğaz token bucket değil CPU/loop olsun
+        for cfg in scraper_mod.SITES:
+            engine.pool.limiter.configure(scraper_mod.base_domain(cfg.base_search_url), 1e6, 1e6)
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(searches):
+        # Her arama benzersiz: önbellek/singleflight ölçümü gölgelemesin
+        queue.put_nowait(f"bench {tag} {i}")
+    latencies: list[float] = []
+    ok = total = 0
+
+    async def worker():
+        nonlocal ok, total
+        while not queue.empty():
+            q = queue.get_nowait()
+            t0 = time.perf_counter()
+            results = await engine.search_all(q)
+            latencies.append(time.perf_counter() - t0)
+            total += 1
+            ok += sum(1 for r in results if r.success)
+
+    probe = asyncio.create_task(_probe_loop_lag(lag)) if lag is not None else None
+    try:
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    finally:
+        if probe is not None:
+            probe.cancel()
+        await engine.close()
+    return latencies, ok, total
+
+def run_benchmark(args) -> dict:
+    conf = StandInConfig(
+        latency_ms = args.latency_ms,
+        jitter_ms  = args.jitter_ms,
+        block_rate = args.block_rate,
+        size_kb    = args.size_kb,
+    )
+
+    # Ölçülen şey canlı tarama: kalıcı fiyat indeksi ve paylaşımlı önbellek önceki turların sonuçlarını servis etmesin
+    os.environ.setdefault("PP_INDEX", "0")
+    os.environ.setdefault("PP_SHARED_CACHE", "off")
+    if args.parse_pool:
+        os.environ["PP_PARSE_POOL"] = args.parse_pool
+    # Katman 3 de taklide gitsin: scraper import edilmeden önce ayarlanmalı
+    import scraper
+    standin = StandIn(scraper.SITES, conf).start()
+    scraper.SCRAPERAPI_URL = standin.url("__scraperapi__")
+    standin.patch_sites()
+
+    report = {"config": vars(args).copy(), "parser": scraper_parser_name(), "parse_pool": scraper.ParsePool().mode, "levels": {}}
+    try:
+        for level in args.concurrency:
+            searches = max(level, args.searches)
+            before = dict(standin.requests)
+            lag: list[float] = []
+            with ParseTimer(scraper) as timer, contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                latencies, ok, total = asyncio.run(_run_level(scraper, level, searches, f"c{level}", lag, not args.no_rate_limit))
+                wall = time.perf_counter() - t0
+
+            # Bellek ayrı turda: tracemalloc gecikme ölçümünü bozmasın
+            peak_mb = 0.0
+            if not args.no_memory:
+                tracemalloc.start()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    asyncio.run(_run_level(scraper, level, level, f"m{level}"))
+                peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                tracemalloc.stop()
+
+            outbound = sum(standin.requests.values()) - sum(before.values())
+            report["levels"][str(level)] = {
+                "searches"     : total,
+                "p50_ms"       : round(percentile(latencies, 0.50) * 1000, 1),
+                "p95_ms"       : round(percentile(latencies, 0.95) * 1000, 1),
+                "p99_ms"       : round(percentile(latencies, 0.99) * 1000, 1),
+                "throughput_s" : round(total / wall, 2) if wall else 0.0,
+                "parses"       : len(timer.samples),
+                "parse_cpu_ms" : round(sum(timer.samples) / len(timer.samples) * 1000, 2) if timer.samples else 0.0,
+                "parse_cpu_p95_ms": round(percentile(timer.samples, 0.95) * 1000, 2),
+                "loop_lag_p99_ms": round(percentile(lag, 0.99) * 1000, 1),
+                "peak_mb"      : round(peak_mb, 2),
+                "results_ok"   : ok,
+                "outbound_req" : outbound,
+            }
+        report["blocked"] = dict(standin.blocked)
+    finally:
+        standin.stop()
+    return report
+
+def scraper_parser_name() -> str:
+    import parsing
+    return parsing.BACKEND
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    problems = []
+    for level, cur in report["levels"].items():
+        base = baseline.get("levels", {}).get(level)
+        if not base:
+            continue
+        for metric in GATED_METRICS:
+            b, c = base.get(metric), cur.get(metric)
+            if not b or c is None:
+                continue
+            if c > b * (1 + tolerance):
+                problems.append(f"c={level} {metric}: {c} > {b} (+%{tolerance * 100:.0f} tolerans)")
+    return problems
+
+def print_report(report: dict):
+    print(f"Parser: {report['parser']} ({report.get('parse_pool', 'inline')})  |  gecikme={report['config']['latency_ms']}ms  "
+          f"blok=%{report['config']['block_rate'] * 100:.0f}  sayfa={report['config']['size_kb']}KB")
+    cols = ("searches", "p50_ms", "p95_ms", "p99_ms", "throughput_s", "parse_cpu_ms", "parse_cpu_p95_ms", "loop_lag_p99_ms", "peak_mb", "results_ok", "outbound_req")
+    print("conc  " + "  ".join(f"{c:>16}" for c in cols))
+    for level, row in report["levels"].items():
+        print(f"{level:>4}  " + "  ".join(f"{row[c]:>16}" for c in cols))
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ParçaPusula offline benchmark (yerel taklit sitelerle)")
+    ap.add_argument("--concurrency", type=lambda s: [int(x) for x in s.split(",")], default=[1, 8, 32])
+    ap.add_argument("--searches", type=int, default=16, help="Her eşzamanlılık seviyesinde en az bu kadar arama")
+    ap.add_argument("--latency-ms", type=float, default=150.0)
+    ap.add_argument("--jitter-ms", type=float, default=50.0)
+    ap.add_argument("--block-rate", type=float, default=0.0)
+    ap.add_argument("--size-kb", type=int, default=300)
+    ap.add_argument("--parse-pool", choices=("auto", "thread", "process", "inline"), help="PP_PARSE_POOL (verilmezse ortamdaki/varsayılan)")
+    ap.add_argument("--no-rate-limit", action="store_true", help="Domain hız sınırını kapat (ayrıştırma/loop darboğazını ölçmek için)")
+    ap.add_argument("--no-memory", action="store_true", help="tracemalloc turunu atla")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--json", action="store_true", help="Raporu JSON olarak bas")
+    args = ap.parse_args(argv)
+
+    report = run_benchmark(args)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"[BENCH] Baseline yazıldı: {args.baseline}")
+        return 0
+
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        if problems:
+            print("[BENCH] REGRESYON:")
+            for p in problems:
+                print("   - " + p)
+            return 1
+        print("[BENCH] Baseline ile uyumlu.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Yanıt serileştirme benchmark'ı: eski yol (tam __dict__ + FastAPI jsonable_encoder + json) ile
+yeni yol (SearchResult.to_dict + responses.dumps) arasında CPU süresi ve gövde boyutu.
+
+    python -m bench.serialize
+    python -m bench.serialize --results 60 --repeat 5000
+"""
+import argparse
+import dataclasses
+import gzip
+import json
+import random
+import sys
+import time
+from urllib.parse import urlparse
+
+from fastapi.encoders import jsonable_encoder
+
+from responses import BROTLI_QUALITY, GZIP_LEVEL, JSON_BACKEND, brotli, dumps
+from scraper import PLACEHOLDER_IMAGE, SITES, SearchResult, generate_affiliate_url
+
+def build_results(n: int, seed: int = 1) -> list[SearchResult]:
+    """Gerçekçi karışım: çoğu başarılı, bir kısmı görselsiz, site başına bir iki hata."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        site = SITES[i % len(SITES)]
+        domain = urlparse(site.base_search_url).netloc
+        if rng.random() < 0.15:
+            out.append(SearchResult(site_name=site.name, success=False, error_msg="Ürün Bulunamadı", engine="HTTPX"))
+            continue
+        url = f"https://{domain}/urun/fren-balatasi-{rng.randint(10000, 99999)}"
+        out.append(SearchResult(
+            site_name     = site.name,
+            success       = True,
+            part_name     = f"Bosch Ön Fren Balatası Fiat Egea 1.3 Multijet {rng.randint(100, 999)}",
+            price_str     = f"{rng.randint(300, 3000)},{rng.randint(0, 99):02d} TL",
+            price_numeric = rng.randint(30000, 300000) / 100,
+            url           = url,
+            affiliate_url = generate_affiliate_url(url),
+            engine        = rng.choice(("Stealth", "HTTPX", "ScraperAPI")),
+            image_url     = f"https://cdn.{domain}/img/{rng.randint(1, 10**6)}.jpg" if rng.random() < 0.7 else PLACEHOLDER_IMAGE,
+            budget_left_ms= rng.randint(1000, 9000),
+        ))
+    return out
+
+def legacy_body(results: list[SearchResult]) -> bytes:
+    """Önceki /api/search: her alan (res.__dict__) + FastAPI'nin varsayılan JSONResponse kodlaması."""
+    payload = {"status": "success", "data": [{f.name: getattr(r, f.name) for f in dataclasses.fields(r)} for r in results]}
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def compact_body(results: list[SearchResult]) -> bytes:
+    return dumps({"status": "success", "data": [r.to_dict() for r in results]})
+
+def time_per_call(fn, results, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(results)
+    return (time.perf_counter() - t0) / repeat
+
+def sizes(body: bytes) -> str:
+    gz = len(gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0))
+    br = f"{len(brotli.compress(body, quality=BROTLI_QUALITY))} B" if brotli is not None else "-"
+    return f"ham {len(body)} B  |  gzip {gz} B  |  br {br}"
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Arama yanıtı serileştirme benchmark'ı")
+    ap.add_argument("--results", type=int, default=18, help="Yanıttaki sonuç sayısı (6 site x 3 ürün)")
+    ap.add_argument("--repeat", type=int, default=3000)
+    args = ap.parse_args(argv)
+
+    results = build_results(args.results)
+    old, new = legacy_body(results), compact_body(results)
+    if json.loads(new)["data"][0]["part_name"] != json.loads(old)["data"][0]["part_name"]:
+        print("[BENCH] HATA: iki yol farklı içerik üretti")
+        return 1
+
+    t_old = time_per_call(legacy_body, results, args.repeat)
+    t_new = time_per_call(compact_body, results, args.repeat)
+    print(f"{len(results)} sonuç, JSON: {JSON_BACKEND}, brotli: {'var' if brotli is not None else 'yok'}")
+    print(f"eski: {t_old * 1e6:8.1f} µs/yanıt   {sizes(old)}")
+    print(f"yeni: {t_new * 1e6:8.1f} µs/yanıt   {sizes(new)}")
+    print(f"CPU x{t_old / t_new:.1f} daha hızlı, ham gövde %{(1 - len(new) / len(old)) * 100:.0f} daha küçük")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""İşçiler arası önbellek benchmark'ı: N ayrı süreç (uvicorn işçileri gibi) aynı popüler sorgu kümesini
+arar. Paylaşımlı katman kapalıyken ve açıkken taklit sitelere giden istek sayısı, işçiler arası isabet
+oranı ve arama gecikmesi karşılaştırılır.
+
+    python -m bench.shared
+    python -m bench.shared --workers 4 --searches 80 --queries 30 --backends off,sqlite
+    python -m bench.shared --backends sqlite,redis     # redis: PP_SHARED_REDIS_URL'deki yerel sunucu
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.run import percentile
+
+ROOT_DIR   = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_TAG = "[SHARED] "
+
+def zipf_queries(n_queries: int, searches: int, seed: int, s: float = 1.1) -> list[str]:
+    """Gerçek trafiğe benzer dağılım: az sayıda sorgu aramaların çoğunu oluşturur."""
+    rng = random.Random(seed)
+    weights = [1 / (rank ** s) for rank in range(1, n_queries + 1)]
+    return [f"paylasim sorgu {i}" for i in rng.choices(range(n_queries), weights, k=searches)]
+
+# ─────────────────────────── Çocuk Süreç (bir işçi) ──────────────────
+async def _child_run(scraper, queries: list[str], concurrency: int) -> tuple[list[float], dict]:
+    engine = scraper.ScraperEngine()
+    engine.warm_up()
+    pending = list(reversed(queries))
+    latencies: list[float] = []
+
+    async def worker():
+        while pending:
+            q = pending.pop()
+            t0 = time.perf_counter()
+            await engine.search_all(q)
+            latencies.append(time.perf_counter() - t0)
+
+    try:
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        stats = engine.stats()
+    finally:
+        await engine.close()   # Paylaşımlı yazma kuyruğu boşalsın
+    return latencies, stats
+
+def child(args) -> int:
+    sys.path.insert(0, ROOT_DIR)
+    import scraper
+    from bench.standin import StandIn, StandInConfig
+
+    standin = StandIn(scraper.SITES, StandInConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 5)).start()
+    scraper.SCRAPERAPI_URL = standin.url("__scraperapi__")
+    standin.patch_sites()
+    queries = zipf_queries(args.queries, args.searches, seed=args.seed)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, stats = asyncio.run(_child_run(scraper, queries, args.concurrency))
+    finally:
+        standin.stop()
+    shared = stats["shared"] or {}
+    print(RESULT_TAG + json.dumps({
+        "latencies" : latencies,
+        "upstream"  : sum(standin.requests.values()),
+        "local_hits": stats["cache"]["hits"] + stats["cache"]["stale_hits"],
+        "shared"    : {k: shared.get(k, 0) for k in ("hits", "cross_hits", "misses", "writes", "evictions")},
+    }))
+    return 0
+
+# ─────────────────────────── Ana Süreç ───────────────────────────────
+def run_backend(backend: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "PP_SHARED_CACHE"     : backend,
+            "PP_SHARED_CACHE_PATH": os.path.join(tmp, "shared.db"),
+            "PP_INDEX"            : "0",   # İndeks de süreçler arası bir katman; ölçülen şey sadece paylaşımlı önbellek
+            "PP_PREWARM"          : "0",
+        }
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-m", "bench.shared", "--child", "--seed", str(args.seed + i),
+                 "--searches", str(args.searches), "--queries", str(args.queries),
+                 "--concurrency", str(args.concurrency), "--latency-ms", str(args.latency_ms)],
+                cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            )
+            for i in range(args.workers)
+        ]
+        reports = []
+        for proc in procs:
+            out, err = proc.communicate(timeout=600)
+            line = next((l for l in out.splitlines() if l.startswith(RESULT_TAG)), None)
+            if line is None:
+                raise RuntimeError(f"İşçi sonuç vermedi (kod {proc.returncode}):\n{err[-2000:]}")
+            reports.append(json.loads(line[len(RESULT_TAG):]))
+
+    latencies = [lat for r in reports for lat in r["latencies"]]
+    shared = {k: sum(r["shared"][k] for r in reports) for k in reports[0]["shared"]}
+    lookups = shared["hits"] + shared["misses"]
+    return {
+        "searches"        : len(latencies),
+        "upstream"        : sum(r["upstream"] for r in reports),
+        "local_hits"      : sum(r["local_hits"] for r in reports),
+        "shared_hits"     : shared["hits"],
+        "cross_hits"      : shared["cross_hits"],
+        "shared_hit_rate" : round(shared["hits"] / lookups, 3) if lookups else None,
+        "evictions"       : shared["evictions"],
+        "p50_ms"          : round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms"          : round(percentile(latencies, 0.95) * 1000, 1),
+    }
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ParçaPusula işçiler arası paylaşımlı önbellek benchmark'ı")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--searches", type=int, default=60, help="İşçi başına arama")
+    ap.add_argument("--queries", type=int, default=25, help="Farklı sorgu sayısı (Zipf dağılımı)")
+    ap.add_argument("--concurrency", type=int, default=4, help="İşçi içinde aynı anda arama")
+    ap.add_argument("--latency-ms", type=float, default=80.0)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--backends", type=lambda s: s.split(","), default=["off", "sqlite"])
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        return child(args)
+
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("child", "json")}, "backends": {}}
+    for backend in args.backends:
+        report["backends"][backend] = run_backend(backend, args)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    cfg = report["config"]
+    print(f"{cfg['workers']} işçi x {cfg['searches']} arama, {cfg['queries']} farklı sorgu, taklit gecikme {cfg['latency_ms']}ms")
+    cols = ("upstream", "local_hits", "shared_hits", "cross_hits", "shared_hit_rate", "evictions", "p50_ms", "p95_ms")
+    print("arka uç " + "  ".join(f"{c:>15}" for c in cols))
+    for backend, row in report["backends"].items():
+        print(f"{backend:<7} " + "  ".join(f"{str(row[c]):>15}" for c in cols))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import http.server
+import random
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Optional
+
+from bench.fixtures import build_page
+
+# ─────────────────────────── Taklit Sunucu Ayarları ──────────────────
+@dataclass
+class StandInConfig:
+    latency_ms : float = 150.0    # Her yanıt öncesi bekleme (sunucu + ağ gecikmesi taklidi)
+    jitter_ms  : float = 50.0
+    block_rate : float = 0.0      # 0-1 arası: bu oranda istek 403/429 ile reddedilir
+    size_kb    : int   = 300      # Sentetik sayfa boyutu
+    n_products : int   = 40
+    chunk_kb   : int   = 16       # Gövde bu büyüklükte parçalar halinde yazılır (akış okuma için)
+
+class _SiteServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, site: str, conf: StandInConfig, standin: "StandIn"):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.site    = site
+        self.conf    = conf
+        self.standin = standin
+        self.page: Optional[tuple[bytes, str]] = None
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"     # keep-alive: gerçek sitelerdeki gibi bağlantı havuzu işe yarasın
+    server: _SiteServer
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        conf, st = self.server.conf, self.server.standin
+        st.count(self.server.site)
+        time.sleep(max(0.0, conf.latency_ms + random.uniform(-conf.jitter_ms, conf.jitter_ms)) / 1000)
+
+        if self.path == "/":
+            # Pre-flight: sadece çerez ver
+            self._send(200, b"<html></html>", "text/html; charset=utf-8", cookie=True)
+            return
+        if self.server.site != "__scraperapi__" and random.random() < conf.block_rate:
+            st.count(self.server.site, blocked=True)
+            self._send(random.choice((403, 429)), b"blocked", "text/plain")
+            return
+
+        site = self.server.site
+        if site == "__scraperapi__":
+            # ScraperAPI taklidi: hedef URL'nin hangi taklit siteye ait olduğunu bul ve onun sayfasını ver
+            target = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query).get("url", [""])[0]
+            site = st.site_for_url(target) or "__unknown__"
+        body, ctype = st.page(site)
+        self._send(200, body, ctype)
+
+    def _send(self, status: int, body: bytes, ctype: str, cookie: bool = False):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            if cookie:
+                self.send_header("Set-Cookie", "session_id=bench; Max-Age=1200; Path=/")
+            self.end_headers()
+            step = self.server.conf.chunk_kb * 1024
+            for i in range(0, len(body), step):
+                self.wfile.write(body[i:i + step])
+        except (BrokenPipeError, ConnectionResetError):
+            # İstemci yeterli kartı okuyup bağlantıyı erken kapattı
+            self.close_connection = True
+
+# ─────────────────────────── Taklit Site Kümesi ──────────────────────
+class StandIn:
+    """Her SiteConfig için ayrı portta (ayrı domain gibi) bir yerel sunucu + ScraperAPI taklidi."""
+
+    def __init__(self, sites: list, conf: Optional[StandInConfig] = None):
+        self.conf     = conf or StandInConfig()
+        self.sites    = sites
+        self.servers: dict[str, _SiteServer] = {}
+        self.requests: dict[str, int] = {}
+        self.blocked : dict[str, int] = {}
+        self._pages  : dict[str, tuple[bytes, str]] = {}
+        self._lock   = threading.Lock()
+        self._original_urls: dict[str, str] = {}
+
+    def page(self, site: str) -> tuple[bytes, str]:
+        if site not in self._pages:
+            self._pages[site] = build_page(site, self.conf.size_kb, self.conf.n_products)
+        return self._pages[site]
+
+    def count(self, site: str, blocked: bool = False):
+        with self._lock:
+            target = self.blocked if blocked else self.requests
+            target[site] = target.get(site, 0) + 1
+
+    def site_for_url(self, url: str) -> Optional[str]:
+        port = urllib.parse.urlparse(url).port
+        for name, srv in self.servers.items():
+            if srv.server_address[1] == port:
+                return name
+        return None
+
+    def start(self) -> "StandIn":
+        for name in [cfg.name for cfg in self.sites] + ["__scraperapi__"]:
+            srv = _SiteServer(name, self.conf, self)
+            threading.Thread(target=srv.serve_forever, daemon=True).start()
+            self.servers[name] = srv
+        return self
+
+    def url(self, site: str) -> str:
+        return f"http://127.0.0.1:{self.servers[site].server_address[1]}"
+
+    def patch_sites(self):
+        """SITES içindeki URL'leri taklit sunuculara yönlendirir (yol ve sorgu kalıbı korunur)."""
+        for cfg in self.sites:
+            self._original_urls[cfg.name] = cfg.base_search_url
+            parsed = urllib.parse.urlparse(cfg.base_search_url)
+            rest = cfg.base_search_url[len(f"{parsed.scheme}://{parsed.netloc}"):]
+            cfg.base_search_url = self.url(cfg.name) + rest
+
+    def restore_sites(self):
+        for cfg in self.sites:
+            if cfg.name in self._original_urls:
+                cfg.base_search_url = self._original_urls[cfg.name]
+
+    def stop(self):
+        self.restore_sites()
+        for srv in self.servers.values():
+            srv.shutdown()
+            srv.server_close()
@@ -0,0 +1,206 @@
+"""Soğuk başlangıç benchmark'ı: her turda taze bir Python süreci api/index.py'yi import eder, uygulamayı
+açar (ASGI lifespan) ve yerel taklit sitelere karşı ilk /api/search isteğini ölçer.
+
+    python -m bench.startup                       # PP_COLD_START=1 ve 0, bench/startup_budget.json kontrolü
+    python -m bench.startup --runs 9 --modes cold
+    python -m bench.startup --save-budget         # Ölçülen medyanlar + pay → bütçe dosyası
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+ROOT_DIR    = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_TAG  = "[STARTUP] "
+
+# Bütçe kontrolündeki metrikler (hepsi "küçük daha iyi")
+GATED_METRICS = ("import_ms", "startup_ms", "first_request_ms")
+MODES = {"cold": "1", "warm": "0"}   # mod adı → PP_COLD_START
+BUDGET_FLOOR_MS = 25                 # --save-budget: çok küçük metriklerde (startup_ms ≈ 1) gürültü payı
+
+# ─────────────────────────── Çocuk Süreç ─────────────────────────────
+async def _lifespan_startup(app) -> tuple[asyncio.Task, asyncio.Queue]:
+    events: asyncio.Queue = asyncio.Queue()
+    events.put_nowait({"type": "lifespan.startup"})
+    started = asyncio.Event()
+
+    async def send(message):
+        if message["type"].startswith("lifespan.startup."):
+            started.set()
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, events.get, send))
+    await started.wait()
+    return task, events
+
+async def _get(app, path: str, query: str) -> tuple[int, int]:
+    """Sunucusuz tek bir GET (uvicorn/TestClient yok: onların import'ları ölçümü kirletmesin)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80), "state": {},
+    }
+    sent_request = False
+    status, size = 0, 0
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()   # İstemci bağlantıyı kesmez
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, size
+
+async def _child_requests(app, engine) -> dict:
+    t0 = time.perf_counter()
+    lifespan, events = await _lifespan_startup(app)
+    startup = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    status, _ = await _get(app, "/api/search", "q=startup+ilk")
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    await _get(app, "/api/search", "q=startup+ikinci")
+    second = time.perf_counter() - t0
+    layers = engine.pool.stats().get("layers_loaded", {})
+
+    events.put_nowait({"type": "lifespan.shutdown"})
+    await lifespan
+    return {
+        "startup_ms"      : round(startup * 1000, 1),
+        "first_request_ms": round(first * 1000, 1),
+        "second_request_ms": round(second * 1000, 1),
+        "status"          : status,
+        "layers_loaded"   : sorted(name for name, loaded in layers.items() if loaded),
+    }
+
+def child(latency_ms: float) -> int:
+    sys.path.insert(0, ROOT_DIR)
+    before = len(sys.modules)
+    t0 = time.perf_counter()
+    import api.index as app_module
+    import_s = time.perf_counter() - t0
+    report = {
+        "import_ms": round(import_s * 1000, 1),
+        "modules"  : len(sys.modules) - before,
+        "imported_layers": sorted(name for name in ("curl_cffi", "httpx") if name in sys.modules),
+    }
+
+    # Taklit siteler ölçülen import'tan sonra kurulur; sayfalar önceden üretilir
+    import scraper
+    from bench.standin import StandIn, StandInConfig
+    standin = StandIn(scraper.SITES, StandInConfig(latency_ms=latency_ms, jitter_ms=0.0)).start()
+    for cfg in scraper.SITES:
+        standin.page(cfg.name)
+    scraper.SCRAPERAPI_URL = standin.url("__scraperapi__")
+    standin.patch_sites()
+    try:
+        report.update(asyncio.run(_child_requests(app_module.app, app_module.engine)))
+    finally:
+        standin.stop()
+    print(RESULT_TAG + json.dumps(report))
+    return 0
+
+# ─────────────────────────── Ana Süreç ───────────────────────────────
+def run_once(mode: str, latency_ms: float) -> dict:
+    env = {
+        **os.environ,
+        "PP_COLD_START": MODES[mode],
+        "PP_INDEX"     : "0",     # Ölçülen şey canlı tarama; önceki turların indeksi cevap vermesin
+        "PP_SHARED_CACHE": "off",
+        "PP_PREWARM"   : "0",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-m", "bench.startup", "--child", "--latency-ms", str(latency_ms)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_TAG):
+            return json.loads(line[len(RESULT_TAG):])
+    raise RuntimeError(f"Çocuk süreç sonuç vermedi (kod {proc.returncode}):\n{proc.stderr[-2000:]}")
+
+def run_benchmark(args) -> dict:
+    report = {"config": {"runs": args.runs, "latency_ms": args.latency_ms}, "modes": {}}
+    for mode in args.modes:
+        runs = [run_once(mode, args.latency_ms) for _ in range(args.runs)]
+        row = {m: round(statistics.median(r[m] for r in runs), 1)
+               for m in ("import_ms", "startup_ms", "first_request_ms", "second_request_ms", "modules")}
+        row["imported_layers"] = runs[-1]["imported_layers"]
+        row["layers_loaded"]   = runs[-1]["layers_loaded"]
+        row["status"]          = runs[-1]["status"]
+        report["modes"][mode] = row
+    return report
+
+def print_report(report: dict):
+    print(f"Medyan ({report['config']['runs']} taze süreç), taklit site gecikmesi {report['config']['latency_ms']}ms")
+    cols = ("import_ms", "startup_ms", "first_request_ms", "second_request_ms", "modules")
+    print("mod   " + "  ".join(f"{c:>17}" for c in cols) + "  import'ta yüklenen / ilk istekten sonra")
+    for mode, row in report["modes"].items():
+        print(f"{mode:<5} " + "  ".join(f"{row[c]:>17}" for c in cols)
+              + f"  {','.join(row['imported_layers']) or '-'} / {','.join(row['layers_loaded']) or '-'}")
+
+def check_budget(report: dict, budget: dict) -> list[str]:
+    problems = []
+    for mode, row in report["modes"].items():
+        if row["status"] != 200:
+            problems.append(f"{mode}: ilk istek HTTP {row['status']}")
+        if mode == "cold" and row["imported_layers"]:
+            problems.append(f"cold: import sırasında katman kütüphanesi yüklendi: {row['imported_layers']}")
+        for metric in GATED_METRICS:
+            limit = budget.get(mode, {}).get(metric)
+            if limit and row[metric] > limit:
+                problems.append(f"{mode} {metric}: {row[metric]} > {limit} ms")
+    return problems
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ParçaPusula soğuk başlangıç benchmark'ı")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--modes", type=lambda s: s.split(","), default=list(MODES))
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--budget", default=BUDGET_PATH)
+    ap.add_argument("--headroom", type=float, default=0.5, help="--save-budget: ölçülen medyanın üstüne eklenecek pay")
+    ap.add_argument("--save-budget", action="store_true")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        return child(args.latency_ms)
+
+    report = run_benchmark(args)
+    print_report(report)
+
+    if args.save_budget:
+        budget = {mode: {m: round(row[m] * (1 + args.headroom) + BUDGET_FLOOR_MS) for m in GATED_METRICS}
+                  for mode, row in report["modes"].items()}
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+        print(f"[BENCH] Bütçe yazıldı: {args.budget}")
+        return 0
+
+    if os.path.isfile(args.budget):
+        with open(args.budget, encoding="utf-8") as f:
+            problems = check_budget(report, json.load(f))
+        if problems:
+            print("[BENCH] BÜTÇE AŞILDI:")
+            for p in problems:
+                print("   - " + p)
+            return 1
+        print("[BENCH] Soğuk başlangıç bütçesi içinde.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+# ─────────────────────────── Önbellek Durumları ──────────────────────
+CACHE_FRESH = "fresh"   # TTL içinde, direkt servis et
+CACHE_STALE = "stale"   # TTL geçmiş ama stale penceresinde: servis et + arkada tazele
+CACHE_MISS  = "miss"    # Yok ya da tamamen bayat: canlı tarama gerekli
+
+@dataclass
+class CacheEntry:
+    value    : Any
+    stored_at: float
+    ttl_s    : float
+    stale_s  : float
+
+    def state(self, now: float) -> str:
+        age = now - self.stored_at
+        if age <= self.ttl_s:
+            return CACHE_FRESH
+        if age <= self.ttl_s + self.stale_s:
+            return CACHE_STALE
+        return CACHE_MISS
+
+# ─────────────────────────── LRU + TTL Önbellek ──────────────────────
+class ResultCache:
+    """Boyut sınırlı LRU önbellek. Her kayıt kendi TTL ve stale penceresini taşır (site bazlı TTL için)."""
+
+    def __init__(self, max_entries: int = 2048, default_ttl_s: float = 300.0, stale_s: float = 600.0):
+        self.max_entries   = max_entries
+        self.default_ttl_s = default_ttl_s
+        self.stale_s       = stale_s
+        self._data: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.hits = self.stale_hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable) -> tuple[Optional[Any], str]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, CACHE_MISS
+
+        state = entry.state(time.monotonic())
+        if state == CACHE_MISS:
+            # Stale penceresi de dolmuş, kaydı at
+            del self._data[key]
+            self.misses += 1
+            return None, CACHE_MISS
+
+        self._data.move_to_end(key)
+        if state == CACHE_FRESH:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry.value, state
+
+    def set(self, key: Hashable, value: Any, ttl_s: Optional[float] = None, stale_s: Optional[float] = None):
+        self._data[key] = CacheEntry(
+            value     = value,
+            stored_at = time.monotonic(),
+            ttl_s     = self.default_ttl_s if ttl_s is None else ttl_s,
+            stale_s   = self.stale_s if stale_s is None else stale_s,
+        )
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def ttl_left(self, key: Hashable) -> float:
+        """Kaydın taze kalacağı süre (sn); yoksa ya da bayatsa 0. İsabet sayaçlarını ve LRU sırasını etkilemez."""
+        entry = self._data.get(key)
+        if entry is None:
+            return 0.0
+        return max(0.0, entry.ttl_s - (time.monotonic() - entry.stored_at))
+
+    def invalidate(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "entries"   : len(self._data),
+            "max"       : self.max_entries,
+            "hits"      : self.hits,
+            "stale_hits": self.stale_hits,
+            "misses"    : self.misses,
+            "evictions" : self.evictions,
+        }
@@ -0,0 +1,309 @@
+import gzip
+import hashlib
+import json
+import os
+import queue
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+# ─────────────────────────── Ham Yanıt Kaydı Ayarları ────────────────
+# PP_CAPTURE=1 ile açılır: sitelerden gelen ham gövde + başlıklar sıkıştırılıp diske yazılır,
+# `python replay.py` aynı sayfaları ağa çıkmadan yeniden ayrıştırır (seçici/strateji değişikliği denemesi).
+CAPTURE_ENABLED   = os.environ.get("PP_CAPTURE", "0") == "1"
+CAPTURE_DIR       = os.environ.get("PP_CAPTURE_DIR", os.path.join(tempfile.gettempdir(), "parcapusula_capture"))
+CAPTURE_MAX_BYTES = int(float(os.environ.get("PP_CAPTURE_MAX_MB", "512")) * 1024 * 1024)   # Sıkıştırılmış gövdelerin toplamı
+CAPTURE_SAMPLE    = float(os.environ.get("PP_CAPTURE_SAMPLE", "1.0"))   # Kaydedilen yanıt oranı (0-1)
+CAPTURE_CODEC     = os.environ.get("PP_CAPTURE_CODEC", "auto").lower()  # auto|zstd|gzip (auto: zstandard kuruluysa zstd)
+CAPTURE_QUEUE_MAX = 1_000     # Yazıcı yetişemezse fazlası düşer (tarama yolu hiç beklemez)
+ZSTD_LEVEL        = 10
+GZIP_LEVEL        = 6
+
+# Kayda girmeyen yanıt başlıkları (oturum çerezleri diske yazılmasın)
+_SKIP_HEADERS = frozenset({"set-cookie", "cookie", "authorization"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest      TEXT PRIMARY KEY,          -- sha256(ham gövde); dosya: blobs/<ilk 2>/<digest>.<codec>
+    codec       TEXT NOT NULL,
+    raw_size    INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    refs        INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS captures (
+    id          INTEGER PRIMARY KEY,
+    site        TEXT NOT NULL,
+    query       TEXT NOT NULL,
+    query_key   TEXT NOT NULL,             -- normalize_query(query)
+    url         TEXT NOT NULL,             -- sitenin arama URL'i (ScraperAPI'de de hedef URL, anahtar yok)
+    layer       TEXT NOT NULL,
+    status      INTEGER NOT NULL,
+    headers     TEXT NOT NULL,             -- JSON, küçük harf anahtarlar
+    charset     TEXT NOT NULL,
+    truncated   INTEGER NOT NULL,          -- Gövde erken kesildi (stream_items / max_bytes)
+    digest      TEXT NOT NULL,
+    first_seen  REAL NOT NULL,
+    last_seen   REAL NOT NULL,
+    seen        INTEGER NOT NULL,
+    UNIQUE (site, query_key, digest)
+);
+CREATE INDEX IF NOT EXISTS captures_site ON captures(site, last_seen);
+"""
+
+# ─────────────────────────── Sıkıştırma ──────────────────────────────
+_zstd: Any = None   # İlk kullanımda yüklenir; None: henüz bakılmadı, False: kurulu değil
+
+def _load_zstd():
+    global _zstd
+    if _zstd is None:
+        try:
+            import zstandard
+
+            _zstd = zstandard
+        except ImportError:
+            _zstd = False
+    return _zstd
+
+def pick_codec(preferred: str = CAPTURE_CODEC) -> str:
+    if preferred == "gzip":
+        return "gz"
+    if _load_zstd():
+        return "zst"
+    if preferred == "zstd":
+        print("[CAPTURE] UYARI: zstandard kurulu değil, gzip kullanılıyor.")
+    return "gz"
+
+def compress(codec: str, data: bytes) -> bytes:
+    if codec == "zst":
+        return _load_zstd().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zst":
+        zstd = _load_zstd()
+        if not zstd:
+            raise RuntimeError("Kayıt zstd ile sıkıştırılmış ama zstandard kurulu değil")
+        return zstd.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def blob_path(root: str, digest: str, codec: str) -> str:
+    return os.path.join(root, "blobs", digest[:2], f"{digest}.{codec}")
+
+# ─────────────────────────── Kayıt Deposu ────────────────────────────
+class CaptureStore:
+    """Ham site yanıtlarının içerik adresli, sıkıştırılmış deposu.
+
+    Gövdeler sha256 ile adreslenir: aynı sayfa (aynı sorgunun tekrar taranması, katmanlar arası aynı
+    yanıt) diskte bir kez durur. Meta veri (site, sorgu, URL, katman, durum kodu, başlıklar) SQLite'ta;
+    aynı (site, sorgu, gövde) tekrar gelirse yeni satır açılmaz, `seen` / `last_seen` güncellenir.
+    `record` bloklamaz: sıkıştırma ve yazma tek bir arka plan thread'inde yapılır. Sıkıştırılmış
+    toplam `max_bytes`'ı aşınca en eski kayıtlar ve artık referansı kalmayan gövdeler silinir.
+    """
+
+    def __init__(self, root: str = CAPTURE_DIR, max_bytes: int = CAPTURE_MAX_BYTES,
+                 sample: float = CAPTURE_SAMPLE, codec: str = CAPTURE_CODEC):
+        self.root      = root
+        self.max_bytes = max_bytes
+        self.sample    = sample
+        self.codec     = pick_codec(codec)
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self.pid = os.getpid()
+        self.captured = self.deduped = self.skipped = self.dropped = self.errors = self.evictions = 0
+        self._start_writer()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.root, "captures.db"), timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _start_writer(self):
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=CAPTURE_QUEUE_MAX)
+        self._writer = threading.Thread(target=self._write_loop, name="pp-capture", daemon=True)
+        self._writer.start()
+
+    # ── Kayıt (bloklamaz) ──
+    def record(self, site: str, query: str, query_key: str, url: str, layer: str, response) -> None:
+        """_scrape_one'ın aldığı yanıtı (StreamedResponse) kuyruğa atar."""
+        if os.getpid() != self.pid:
+            # fork ile çoğaltılan işçide yazıcı thread ebeveynde kaldı
+            self.pid = os.getpid()
+            self._local = threading.local()
+            self._start_writer()
+        if self.sample < 1.0 and random.random() >= self.sample:
+            self.skipped += 1
+            return
+        headers = {k.lower(): v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS}
+        meta = (site, query, query_key, url, layer, response.status_code, json.dumps(headers, ensure_ascii=False),
+                response.charset, int(response.truncated))
+        try:
+            self._queue.put_nowait((meta, response.body))
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            items = [item]
+            stop = False
+            while len(items) < 64:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                    break
+                items.append(more)
+            try:
+                self._apply(items, time.time())
+            except Exception as e:
+                self.errors += 1
+                print(f"[CAPTURE] UYARI: Yazma hatası: {e}")
+            if stop:
+                return
+
+    def _apply(self, items: list[tuple], now: float):
+        conn = self._connect()
+        with conn:
+            for meta, body in items:
+                digest = hashlib.sha256(body).hexdigest()
+                known = conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                if known is None:
+                    stored = compress(self.codec, body)
+                    self._write_blob(blob_path(self.root, digest, self.codec), stored)
+                    conn.execute("INSERT INTO blobs (digest, codec, raw_size, stored_size, refs) VALUES (?, ?, ?, ?, 0)",
+                                 (digest, self.codec, len(body), len(stored)))
+                site, query, query_key = meta[:3]
+                updated = conn.execute(
+                    "UPDATE captures SET last_seen = ?, seen = seen + 1 WHERE site = ? AND query_key = ? AND digest = ?",
+                    (now, site, query_key, digest),
+                ).rowcount
+                if updated:
+                    self.deduped += 1
+                    continue
+                conn.execute(
+                    "INSERT INTO captures (site, query, query_key, url, layer, status, headers, charset, truncated, digest, first_seen, last_seen, seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)",
+                    (*meta, digest, now, now),
+                )
+                conn.execute("UPDATE blobs SET refs = refs + 1 WHERE digest = ?", (digest,))
+                self.captured += 1
+            self._evict(conn)
+
+    @staticmethod
+    def _write_blob(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        # En eski kayıtlardan başla; gövdesi başka kayıtta da kullanılıyorsa sadece kayıt gider
+        for capture_id, digest in conn.execute("SELECT id, digest FROM captures ORDER BY last_seen").fetchall():
+            conn.execute("DELETE FROM captures WHERE id = ?", (capture_id,))
+            conn.execute("UPDATE blobs SET refs = refs - 1 WHERE digest = ?", (digest,))
+            self.evictions += 1
+            row = conn.execute("SELECT codec, stored_size FROM blobs WHERE digest = ? AND refs <= 0", (digest,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                try:
+                    os.remove(blob_path(self.root, digest, row[0]))
+                except OSError:
+                    pass
+                total -= row[1]
+                if total <= target:
+                    break
+
+    # ── Okuma (replay) ──
+    def iter_captures(self, sites: Optional[list[str]] = None, since: float = 0.0, limit: int = 0) -> Iterator[dict]:
+        """Kayıtların meta verisi, en yeniden eskiye. Gövde `load_body(digest, codec)` ile okunur."""
+        sql = ("SELECT c.id, c.site, c.query, c.url, c.layer, c.status, c.headers, c.charset, c.truncated, c.digest, b.codec, b.raw_size, c.last_seen "
+               "FROM captures c JOIN blobs b ON b.digest = c.digest WHERE c.last_seen >= ?")
+        args: list = [since]
+        if sites:
+            sql += f" AND c.site IN ({','.join('?' * len(sites))})"
+            args.extend(sites)
+        sql += " ORDER BY c.last_seen DESC"
+        if limit > 0:
+            sql += " LIMIT ?"
+            args.append(limit)
+        keys = ("id", "site", "query", "url", "layer", "status", "headers", "charset", "truncated", "digest", "codec", "raw_size", "captured_at")
+        for row in self._connect().execute(sql, args):
+            item = dict(zip(keys, row))
+            item["headers"] = json.loads(item["headers"])
+            item["truncated"] = bool(item["truncated"])
+            yield item
+
+    def load_body(self, digest: str, codec: str) -> bytes:
+        return load_body(self.root, digest, codec)
+
+    def close(self):
+        """Kuyruktaki kayıtları yazıp yazıcıyı durdurur."""
+        if os.getpid() != self.pid:
+            return
+        self._queue.put(None)
+        self._writer.join(timeout=10.0)
+
+    def stats(self) -> dict:
+        try:
+            pages, blobs, raw, stored = self._connect().execute(
+                "SELECT (SELECT COUNT(*) FROM captures), COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+        except sqlite3.Error:
+            pages = blobs = raw = stored = 0
+        return {
+            "dir"         : self.root,
+            "codec"       : self.codec,
+            "pages"       : pages,
+            "blobs"       : blobs,
+            "raw_mb"      : round(raw / 1024 / 1024, 2),
+            "stored_mb"   : round(stored / 1024 / 1024, 2),
+            "ratio"       : round(raw / stored, 2) if stored else None,
+            "max_mb"      : round(self.max_bytes / 1024 / 1024, 1),
+            "captured"    : self.captured,
+            "deduped"     : self.deduped,
+            "skipped"     : self.skipped,
+            "dropped"     : self.dropped,
+            "evictions"   : self.evictions,
+            "errors"      : self.errors,
+            "pending"     : self._queue.qsize(),
+        }
+
+def load_body(root: str, digest: str, codec: str) -> bytes:
+    """Kayıtlı gövdeyi açar (replay işçilerinde de çağrılır: sadece dosya okur, SQLite bağlantısı gerekmez)."""
+    with open(blob_path(root, digest, codec), "rb") as f:
+        return decompress(codec, f.read())
+
+def open_capture_store() -> Optional[CaptureStore]:
+    """PP_CAPTURE kapalıysa ya da depo açılamazsa None (motor kayıtsız çalışır)."""
+    if not CAPTURE_ENABLED:
+        return None
+    try:
+        return CaptureStore()
+    except (OSError, sqlite3.Error) as e:
+        print(f"[SYSTEM] UYARI: Ham yanıt kaydı açılamadı ({e}). Kayıt devre dışı.")
+        return None
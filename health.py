@@ -0,0 +1,177 @@
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sharedcache import NS_HEALTH, SharedCache
+
+# ─────────────────────────── Sağlık Ayarları ─────────────────────────
+HEALTH_WINDOW       = 100                                                   # (site, katman) başına son N deneme
+BREAKER_THRESHOLD   = int(os.environ.get("PP_BREAKER_THRESHOLD", "5"))      # Art arda bu kadar engel → devre açılır
+BREAKER_COOLDOWN_S  = float(os.environ.get("PP_BREAKER_COOLDOWN_S", "30"))
+BREAKER_MAX_COOLDOWN_S = float(os.environ.get("PP_BREAKER_MAX_COOLDOWN_S", "600"))
+DEFAULT_LATENCY_S   = 2.0                                                   # Hiç başarı yokken tahmini gecikme
+SHARED_REFRESH_S    = 1.0                                                   # Diğer işçilerin açık devreleri en fazla bu sıklıkla okunur
+
+BREAKER_CLOSED    = "closed"
+BREAKER_OPEN      = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+@dataclass
+class LayerHealth:
+    outcomes      : deque = field(default_factory=lambda: deque(maxlen=HEALTH_WINDOW))   # (başarılı mı, süre)
+    state         : str   = BREAKER_CLOSED
+    consecutive_fail: int = 0
+    opened_at     : float = 0.0
+    cooldown_s    : float = BREAKER_COOLDOWN_S
+    probe_in_flight: bool = False
+
+    def success_rate(self) -> float:
+        # Laplace düzeltmesi: az örnekle 0/1 uçlarına savrulmasın
+        ok = sum(1 for s, _ in self.outcomes if s)
+        return (ok + 1) / (len(self.outcomes) + 2)
+
+    def latencies(self) -> list[float]:
+        return [lat for s, lat in self.outcomes if s]
+
+    def mean_latency(self) -> float:
+        lats = self.latencies()
+        return sum(lats) / len(lats) if lats else DEFAULT_LATENCY_S
+
+    def expected_time(self) -> float:
+        """Başarıya kadar beklenen süre ≈ ortalama gecikme / başarı oranı."""
+        return self.mean_latency() / self.success_rate()
+
+# ─────────────────────────── Site Sağlık Takibi ──────────────────────
+class HealthTracker:
+    """(site, katman) bazında başarı oranı, gecikme ve devre kesici (circuit breaker) durumu.
+
+    Art arda 403/429/503 veya zaman aşımı alan katmanın devresi açılır; bekleme süresi dolunca
+    tek bir yoklama (half-open probe) isteğine izin verilir. Yoklama başarılıysa devre kapanır,
+    değilse bekleme süresi ikiye katlanır. Bir sitenin tüm katmanları açıksa site tamamen atlanır.
+
+    Paylaşımlı katman varsa açılan devre oraya bekleme süresi TTL'iyle yazılır; diğer işçiler o
+    katmanı süre dolana kadar kendi denemeleri olmadan atlar (engeli her işçi ayrı ayrı öğrenmez).
+    """
+
+    def __init__(self, shared: Optional[SharedCache] = None):
+        self._layers: dict[tuple[str, str], LayerHealth] = {}
+        self.shared = shared
+        self._remote: dict[tuple[str, str], float] = {}   # Diğer işçilerde açık: (site, katman) -> bitiş [epoch]
+        self._remote_read_at = 0.0
+
+    def _get(self, site: str, layer: str) -> LayerHealth:
+        return self._layers.setdefault((site, layer), LayerHealth())
+
+    def _allow(self, h: LayerHealth, now: float) -> bool:
+        if h.state == BREAKER_CLOSED:
+            return True
+        if h.state == BREAKER_OPEN and now - h.opened_at >= h.cooldown_s:
+            h.state = BREAKER_HALF_OPEN
+        return h.state == BREAKER_HALF_OPEN and not h.probe_in_flight
+
+    async def refresh_remote(self):
+        """Diğer işçilerin açık devrelerini paylaşımlı katmandan thread'de okur (en fazla SHARED_REFRESH_S'de bir).
+
+        Tek sorguyla tüm açık devreler; plan() her site için çağrılır ama okuma burada, event loop dışında yapılır.
+        """
+        if self.shared is None:
+            return
+        now = time.time()
+        if now - self._remote_read_at < SHARED_REFRESH_S:
+            return
+        self._remote_read_at = now   # Eşzamanlı site aramaları aynı anda tekrar okumasın
+        found = await asyncio.to_thread(self.shared.scan, NS_HEALTH)
+        self._remote = {tuple(k.split("\t", 1)): v["until"] for k, v in found.items()}
+
+    def _remote_open(self, site: str, layer: str) -> bool:
+        """Başka bir işçi bu katmanın devresini açtı ve bekleme süresi dolmadı mı? (sadece bellek)"""
+        return self._remote.get((site, layer), 0.0) > time.time()
+
+    def _publish(self, site: str, layer: str, h: LayerHealth):
+        if self.shared is None:
+            return
+        key = f"{site}\t{layer}"
+        if h.state == BREAKER_OPEN:
+            self.shared.set(NS_HEALTH, key, {"until": time.time() + h.cooldown_s}, h.cooldown_s)
+        else:
+            self._remote.pop((site, layer), None)
+            self.shared.delete(NS_HEALTH, key)
+
+    def plan(self, site: str, layers: list[str], costly: tuple = ()) -> list[str]:
+        """Devresi izin veren katmanları beklenen başarı süresine göre sıralar. Boş liste = site şu an çökük.
+
+        `costly` katmanlar (ör. ScraperAPI kredisi) ne kadar hızlı olursa olsun sonda kalır.
+        """
+        now = time.monotonic()
+        allowed = [name for name in layers if not self._remote_open(site, name) and self._allow(self._get(site, name), now)]
+        for name in allowed:
+            h = self._get(site, name)
+            if h.state == BREAKER_HALF_OPEN:
+                h.probe_in_flight = True
+        # sorted() kararlı: hiç veri yoksa tanımlı sıra korunur
+        return sorted(allowed, key=lambda n: (n in costly, self._get(site, n).expected_time()))
+
+    def record(self, site: str, layer: str, ok: bool, latency_s: float):
+        h = self._get(site, layer)
+        h.outcomes.append((ok, latency_s))
+        h.probe_in_flight = False
+        if ok:
+            reopened = h.state != BREAKER_CLOSED or (site, layer) in self._remote
+            h.consecutive_fail = 0
+            h.state = BREAKER_CLOSED
+            h.cooldown_s = BREAKER_COOLDOWN_S
+            if reopened:
+                self._publish(site, layer, h)
+            return
+
+        h.consecutive_fail += 1
+        if h.state == BREAKER_HALF_OPEN:
+            # Yoklama da düştü: bekleme süresini katla
+            h.state = BREAKER_OPEN
+            h.opened_at = time.monotonic()
+            h.cooldown_s = min(h.cooldown_s * 2, BREAKER_MAX_COOLDOWN_S)
+            self._publish(site, layer, h)
+        elif h.consecutive_fail >= BREAKER_THRESHOLD:
+            h.state = BREAKER_OPEN
+            h.opened_at = time.monotonic()
+            self._publish(site, layer, h)
+            print(f"[{site}] UYARI: '{layer}' katmanı art arda {h.consecutive_fail} kez engellendi, devre açıldı ({h.cooldown_s:.0f}s).")
+
+    def release(self, site: str, layer: str):
+        """Sonucu beklenmeden iptal edilen (hedge kaybeden) denemenin yoklama hakkını geri verir."""
+        self._get(site, layer).probe_in_flight = False
+
+    def latencies(self, site: str, layer: str) -> list[float]:
+        h = self._layers.get((site, layer))
+        return h.latencies() if h else []
+
+    def site_down(self, site: str, layers: list[str]) -> bool:
+        now = time.monotonic()
+        return all(
+            self._remote_open(site, n) or (
+                (site, n) in self._layers and self._layers[(site, n)].state == BREAKER_OPEN
+                and now - self._layers[(site, n)].opened_at < self._layers[(site, n)].cooldown_s)
+            for n in layers
+        )
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        out: dict[str, dict] = {}
+        for (site, layer), h in self._layers.items():
+            retry_in: Optional[float] = None
+            if h.state == BREAKER_OPEN:
+                retry_in = round(max(0.0, h.cooldown_s - (now - h.opened_at)), 1)
+            out.setdefault(site, {})[layer] = {
+                "state"          : h.state,
+                "samples"        : len(h.outcomes),
+                "success_rate"   : round(h.success_rate(), 3),
+                "mean_latency_s" : round(h.mean_latency(), 3),
+                "expected_time_s": round(h.expected_time(), 3),
+                "consecutive_fail": h.consecutive_fail,
+                "retry_in_s"     : retry_in,
+                "remote_open"    : self._remote_open(site, layer),
+            }
+        return out
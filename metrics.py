@@ -0,0 +1,184 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+# ─────────────────────────── Metrik Ayarları ─────────────────────────
+SERVER_TIMING_DEFAULT = os.environ.get("PP_SERVER_TIMING", "0") == "1"
+
+# Saniye cinsinden kova sınırları (rate_limit/parse gibi ms'lik işler ile 8s'lik fetch'ler arası)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ─────────────────────────── Histogram ───────────────────────────────
+class Histogram:
+    """Etiketli Prometheus histogramı. Kova sayaçları kümülatif değil tutulur, yazarken toplanır."""
+
+    def __init__(self, name: str, help_text: str, labels: tuple, buckets: tuple = DEFAULT_BUCKETS):
+        self.name    = name
+        self.help    = help_text
+        self.labels  = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}   # etiket değerleri -> [kova sayaçları..., +Inf, toplam]
+        self._lock   = threading.Lock()        # Parse işçi thread'lerinden de gözlem gelebilir
+
+    def observe(self, value: float, *label_values: str):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[idx] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            count = cumulative + series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# ─────────────────────────── Kayıt Defteri ───────────────────────────
+STAGE_SECONDS = Histogram(
+    "parcapusula_stage_seconds",
+    "Site araması aşamalarının süresi (rate_limit, preflight, fetch, parse_queue, parse, ldjson, next_data, json_api, cards, regex_fallback).",
+    ("site", "layer", "stage"),
+)
+SEARCH_SECONDS = Histogram(
+    "parcapusula_search_seconds",
+    "Uç nokta bazında toplam arama süresi.",
+    ("endpoint",),
+)
+
+HISTOGRAMS = [STAGE_SECONDS, SEARCH_SECONDS]
+
+# Anlık değerler (önbellek, singleflight vb.) isteğe bağlı olarak dışarıdan sağlanır
+_GAUGE_PROVIDERS: list[Callable[[], list[tuple[str, str, dict, float]]]] = []
+
+def register_gauges(provider: Callable[[], list[tuple[str, str, dict, float]]]):
+    """provider() -> [(metrik adı, açıklama, etiketler, değer), ...]  (`_total` ile biten adlar counter yazılır)"""
+    _GAUGE_PROVIDERS.append(provider)
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    for h in HISTOGRAMS:
+        lines.extend(h.render())
+    seen = set()
+    for provider in _GAUGE_PROVIDERS:
+        try:
+            samples = provider()
+        except Exception as e:
+            print(f"[METRICS] UYARI: gauge sağlayıcı hatası: {e}")
+            continue
+        for name, help_text, labels, value in samples:
+            if name not in seen:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+                seen.add(name)
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{base}}} {value}" if base else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+# ─────────────────────────── İstek Bazlı Server-Timing ───────────────
+# search_all içindeki görevler context'i kopyalar; dict paylaşıldığı için tüm site aşamaları aynı yere toplanır
+_request_timing: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("pp_request_timing", default=None)
+
+def start_request_timing() -> dict:
+    timing: dict[str, list] = {}
+    _request_timing.set(timing)
+    return timing
+
+def server_timing_header(timing: dict, total_s: Optional[float] = None) -> str:
+    """{aşama: [toplam sn, adet]} → 'fetch;dur=812.3;desc="6x", parse;dur=...'"""
+    parts = [f'{stage};dur={sec * 1000:.1f};desc="{n}x"' for stage, (sec, n) in sorted(timing.items())]
+    if total_s is not None:
+        parts.append(f"total;dur={total_s * 1000:.1f}")
+    return ", ".join(parts)
+
+# ─────────────────────────── Aşama Zamanlayıcı ───────────────────────
+class StageTimer:
+    """Tur (lap) mantığıyla aşama süresi ölçer: stage() bir öncekini kapatıp yenisini başlatır.
+
+    Gövdeyi with-blokları ile girintilemeden erken return'lü uzun fonksiyonlara eklenebilsin diye.
+    """
+    __slots__ = ("site", "layer", "_stage", "_t0", "_timing")
+
+    def __init__(self, site: str, layer: str):
+        self.site    = site
+        self.layer   = layer
+        self._stage: Optional[str] = None
+        self._t0     = 0.0
+        self._timing = _request_timing.get()
+
+    @property
+    def current(self) -> Optional[str]:
+        return self._stage
+
+    def stage(self, name: str):
+        now = time.perf_counter()
+        if self._stage is not None:
+            self._record(self._stage, now - self._t0)
+        self._stage, self._t0 = name, now
+
+    def close(self):
+        if self._stage is not None:
+            self._record(self._stage, time.perf_counter() - self._t0)
+            self._stage = None
+
+    def add(self, stage: str, seconds: float):
+        """Başka yerde (ayrıştırma işçisinde) ölçülmüş bir aşama süresini kaydeder."""
+        self._record(stage, seconds)
+
+    def _record(self, stage: str, seconds: float):
+        STAGE_SECONDS.observe(seconds, self.site, self.layer, stage)
+        if self._timing is not None:
+            acc = self._timing.setdefault(stage, [0.0, 0])
+            acc[0] += seconds
+            acc[1] += 1
+
+class StageLaps:
+    """StageTimer ile aynı arayüz; metriğe yazmak yerine süreleri biriktirir (işçi thread/süreçte ölçüp geri taşımak için)."""
+    __slots__ = ("laps", "_stage", "_t0")
+
+    def __init__(self):
+        self.laps: dict[str, float] = {}
+        self._stage: Optional[str] = None
+        self._t0 = 0.0
+
+    @property
+    def current(self) -> Optional[str]:
+        return self._stage
+
+    def stage(self, name: str):
+        now = time.perf_counter()
+        if self._stage is not None:
+            self.laps[self._stage] = self.laps.get(self._stage, 0.0) + now - self._t0
+        self._stage, self._t0 = name, now
+
+    def close(self) -> dict[str, float]:
+        if self._stage is not None:
+            self.laps[self._stage] = self.laps.get(self._stage, 0.0) + time.perf_counter() - self._t0
+            self._stage = None
+        return self.laps
+
+def observe_stage(site: str, layer: str, stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, site, layer, stage)
+    timing = _request_timing.get()
+    if timing is not None:
+        acc = timing.setdefault(stage, [0.0, 0])
+        acc[0] += seconds
+        acc[1] += 1
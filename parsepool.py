@@ -0,0 +1,127 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# ─────────────────────────── Ayrıştırma Havuzu Ayarları ──────────────
+# PP_PARSE_POOL=auto|thread|process|inline
+#   thread : event loop ayrıştırma boyunca donmaz; selectolax/lxml parse sırasında GIL'i bırakır (çok çekirdekte paralel)
+#   process: saf Python işler (bs4, regex) için de paralellik; ham gövde işçi sürece kopyalanır (serverless'ta önerilmez)
+#   inline : eski davranış, event loop üzerinde
+#   auto   : birden fazla çekirdek varsa thread, yoksa inline (tek çekirdekte işçiye aktarmak CPU eklemez,
+#            GIL el değiştirmesi yük altında throughput'u düşürür)
+PARSE_POOL_MODE    = os.environ.get("PP_PARSE_POOL", "auto").lower()
+PARSE_WORKERS      = int(os.environ.get("PP_PARSE_WORKERS", "4"))
+PARSE_MAX_PENDING  = int(os.environ.get("PP_PARSE_MAX_PENDING", str(PARSE_WORKERS * 4)))   # Çalışan + kuyrukta bekleyen iş
+PARSE_ADMIT_WAIT_S = float(os.environ.get("PP_PARSE_ADMIT_WAIT_S", "2.0"))   # Kuyruk doluyken yer için en fazla bekleme
+
+class ParseBacklogError(Exception):
+    """Ayrıştırma kuyruğu dolu ve beklenen sürede yer açılmadı."""
+
+# ─────────────────────────── Ayrıştırma Havuzu ───────────────────────
+class ParsePool:
+    """CPU ağırlıklı çıkarımı (HTML parse, ld+json, regex) event loop dışındaki işçilere taşır.
+
+    İşe ham gövde (bytes) girer, kompakt sonuç çıkar. Aynı anda en fazla `max_pending` iş kabul
+    edilir; fazlası `admit_wait_s` kadar yer bekler, açılmazsa ParseBacklogError. Yer, iptal edilen
+    bir aramanın işi işçide gerçekten bitince boşalır (iptal backlog'u gizlemesin).
+    """
+
+    def __init__(self, mode: str = PARSE_POOL_MODE, workers: int = PARSE_WORKERS,
+                 max_pending: int = PARSE_MAX_PENDING, admit_wait_s: float = PARSE_ADMIT_WAIT_S):
+        if mode == "auto":
+            mode = "thread" if (os.cpu_count() or 1) > 1 else "inline"
+        if mode not in ("thread", "process", "inline"):
+            raise ValueError(f"Geçersiz PP_PARSE_POOL: {mode}")
+        self.mode         = mode
+        self.workers      = max(1, workers)
+        self.max_pending  = max(1, max_pending)
+        self.admit_wait_s = admit_wait_s
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pending = self.peak = 0
+        self.completed = self.rejected = 0
+
+    def _ensure(self) -> tuple[Executor, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semaphore açıldığı loop'a bağlı; loop değişirse (test, benchmark turu) sayaçlarla birlikte yenile
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+            self.pending = 0
+        return self._get_executor(), self._slots
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                # fork yerine spawn: ana süreçteki thread'ler (indeks yazıcı, havuzlar) işçiye kopyalanmasın
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="pp-parse")
+        return self._executor
+
+    def start(self):
+        """İşçileri şimdi açar. Process modunda her işçinin açılışı (spawn + import) saniyeler sürebilir;
+        ilk aramalar bunu kuyrukta beklemesin diye uzun ömürlü sunucuda açılışta çağrılır."""
+        if self.mode == "inline":
+            return
+        executor = self._get_executor()
+        if self.mode == "process":
+            for future in [executor.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+
+    async def run(self, fn: Callable[[Any], Any], job: Any) -> Any:
+        """fn(job)'u bir işçide çalıştırır. fn ve job process modunda pickle edilebilir olmalı."""
+        if self.mode == "inline":
+            self.completed += 1
+            return fn(job)
+
+        executor, slots = self._ensure()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.admit_wait_s)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ParseBacklogError(f"Ayrıştırma kuyruğu dolu ({self.max_pending} iş)") from None
+
+        loop = self._loop
+        self.pending += 1
+        self.peak = max(self.peak, self.pending)
+
+        def _done(_):
+            try:
+                loop.call_soon_threadsafe(self._release, slots)
+            except RuntimeError:
+                pass   # Loop kapanmış (benchmark turu bitti)
+
+        try:
+            future = executor.submit(fn, job)
+        except BaseException:
+            self._release(slots)
+            raise
+        future.add_done_callback(_done)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, slots: asyncio.Semaphore):
+        if slots is not self._slots:
+            return   # Eski loop'un işi
+        self.pending -= 1
+        self.completed += 1
+        slots.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "mode"       : self.mode,
+            "workers"    : self.workers,
+            "max_pending": self.max_pending,
+            "pending"    : self.pending,
+            "peak"       : self.peak,
+            "completed"  : self.completed,
+            "rejected"   : self.rejected,
+        }
@@ -0,0 +1,235 @@
+import os
+from functools import lru_cache
+from typing import Iterator, Optional
+
+# ─────────────────────────── Ayrıştırıcı (Parser) Seçimi ─────────────
+# PP_PARSER=auto|selectolax|lxml|bs4  (auto: kurulu olan en hızlısı)
+# selectolax (lexbor, C) > lxml (libxml2, C) > BeautifulSoup html.parser (saf Python)
+PARSER_PREF = os.environ.get("PP_PARSER", "auto").lower()
+
+def _detect_backend() -> str:
+    order = ["selectolax", "lxml", "bs4"] if PARSER_PREF == "auto" else [PARSER_PREF, "bs4"]
+    for name in order:
+        try:
+            if name == "selectolax":
+                from selectolax.lexbor import LexborHTMLParser  # noqa: F401
+            elif name == "lxml":
+                import lxml.html  # noqa: F401
+                import cssselect  # noqa: F401
+            elif name == "bs4":
+                import bs4  # noqa: F401
+            else:
+                continue
+            return name
+        except ImportError:
+            continue
+    raise ImportError("Hiçbir HTML ayrıştırıcı bulunamadı (selectolax / lxml / beautifulsoup4)")
+
+BACKEND = _detect_backend()
+
+# ─────────────────────────── Derlenmiş Seçiciler ─────────────────────
+class CompiledSelector:
+    """Virgülle ayrılmış fallback seçici zinciri; her parça bir kez ayrıştırılır/derlenir.
+
+    Parçalar sırayla denenir, ilk eşleşen parça kazanır (eski safe_select mantığı).
+    """
+    __slots__ = ("source", "parts", "_compiled")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts  = tuple(p.strip() for p in source.split(",") if p.strip())
+        self._compiled: dict[str, tuple] = {}
+
+    def compiled(self, backend: str) -> tuple:
+        c = self._compiled.get(backend)
+        if c is None:
+            c = self._compiled[backend] = _compile_parts(backend, self.parts)
+        return c
+
+    def __repr__(self) -> str:
+        return f"CompiledSelector({self.source!r})"
+
+def _compile_parts(backend: str, parts: tuple) -> tuple:
+    out = []
+    for p in parts:
+        try:
+            if backend == "bs4":
+                import soupsieve
+                out.append(soupsieve.compile(p))
+            elif backend == "lxml":
+                from lxml.cssselect import CSSSelector
+                out.append(CSSSelector(p))
+            else:
+                out.append(p)   # selectolax seçiciyi kendi içinde derler
+        except Exception as e:
+            print(f"[PARSER] UYARI: '{p}' seçicisi {backend} için derlenemedi: {e}")
+    return tuple(out)
+
+@lru_cache(maxsize=512)
+def compile_selector(source: str) -> CompiledSelector:
+    return CompiledSelector(source)
+
+# ─────────────────────────── Düğüm Sarmalayıcıları ───────────────────
+# Tüm arka uçlar aynı küçük arayüzü sunar: select_first/select_all/text/attr/tag/parent
+
+class _SoupNode:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    @property
+    def tag(self) -> str:
+        return self.el.name or ""
+
+    @property
+    def parent(self) -> Optional["_SoupNode"]:
+        return _SoupNode(self.el.parent) if self.el.parent is not None else None
+
+    def text(self) -> str:
+        return self.el.get_text(strip=True)
+
+    def attr(self, name: str, default: str = "") -> str:
+        v = self.el.get(name)
+        if isinstance(v, list):   # bs4 class gibi çok değerli öznitelikleri liste döner
+            v = " ".join(v)
+        return v if v is not None else default
+
+    def select_first(self, sel: CompiledSelector) -> Optional["_SoupNode"]:
+        for c in sel.compiled("bs4"):
+            found = c.select_one(self.el)
+            if found is not None:
+                return _SoupNode(found)
+        return None
+
+    def select_all(self, sel: CompiledSelector) -> list:
+        for c in sel.compiled("bs4"):
+            founds = c.select(self.el)
+            if founds:
+                return [_SoupNode(f) for f in founds]
+        return []
+
+class _LxmlNode:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    @property
+    def tag(self) -> str:
+        return self.el.tag if isinstance(self.el.tag, str) else ""
+
+    @property
+    def parent(self) -> Optional["_LxmlNode"]:
+        p = self.el.getparent()
+        return _LxmlNode(p) if p is not None else None
+
+    def text(self) -> str:
+        # bs4 get_text(strip=True) ile aynı: her metin parçası kırpılıp birleştirilir
+        return "".join(t.strip() for t in self.el.itertext())
+
+    def attr(self, name: str, default: str = "") -> str:
+        return self.el.get(name, default)
+
+    def select_first(self, sel: CompiledSelector) -> Optional["_LxmlNode"]:
+        for c in sel.compiled("lxml"):
+            founds = c(self.el)
+            if founds:
+                return _LxmlNode(founds[0])
+        return None
+
+    def select_all(self, sel: CompiledSelector) -> list:
+        for c in sel.compiled("lxml"):
+            founds = c(self.el)
+            if founds:
+                return [_LxmlNode(f) for f in founds]
+        return []
+
+class _LexborNode:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    @property
+    def tag(self) -> str:
+        return self.el.tag or ""
+
+    @property
+    def parent(self) -> Optional["_LexborNode"]:
+        p = self.el.parent
+        return _LexborNode(p) if p is not None else None
+
+    def text(self) -> str:
+        return self.el.text(strip=True)
+
+    def attr(self, name: str, default: str = "") -> str:
+        v = self.el.attributes.get(name)
+        return v if v is not None else default
+
+    def select_first(self, sel: CompiledSelector) -> Optional["_LexborNode"]:
+        for c in sel.compiled("selectolax"):
+            found = self.el.css_first(c)
+            if found is not None:
+                return _LexborNode(found)
+        return None
+
+    def select_all(self, sel: CompiledSelector) -> list:
+        for c in sel.compiled("selectolax"):
+            founds = self.el.css(c)
+            if founds:
+                return [_LexborNode(f) for f in founds]
+        return []
+
+# ─────────────────────────── Doküman ─────────────────────────────────
+class Document:
+    """Ayrıştırılmış sayfa. Kök düğüm arayüzüne ek olarak script içeriklerini verir."""
+    __slots__ = ("backend", "root")
+
+    def __init__(self, backend: str, root):
+        self.backend = backend
+        self.root    = root
+
+    def select_first(self, sel: CompiledSelector):
+        return self.root.select_first(sel)
+
+    def select_all(self, sel: CompiledSelector) -> list:
+        return self.root.select_all(sel)
+
+    def scripts(self, script_type: str) -> Iterator[str]:
+        """Verilen type'taki <script> etiketlerinin ham içeriği (ör. application/ld+json)."""
+        el = self.root.el
+        if self.backend == "bs4":
+            for s in el.find_all("script", type=script_type):
+                if s.string:
+                    yield s.string
+        elif self.backend == "lxml":
+            for s in el.xpath("//script[@type=$t]", t=script_type):
+                if s.text:
+                    yield s.text
+        else:
+            for s in el.css(f'script[type="{script_type}"]'):
+                txt = s.text(deep=True)
+                if txt:
+                    yield txt
+
+def parse_html(html: str, backend: Optional[str] = None) -> Document:
+    backend = backend or BACKEND
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        tree = LexborHTMLParser(html)
+        root = tree.root if tree.root is not None else tree.body
+        return Document(backend, _LexborNode(root))
+    if backend == "lxml":
+        import lxml.html
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # "<?xml encoding=...?>" bildirimi olan str girdi: bayt olarak ver
+            root = lxml.html.document_fromstring(html.encode("utf-8"))
+        except Exception:
+            # Boş / tamamen bozuk gövde
+            root = lxml.html.document_fromstring("<html></html>")
+        return Document(backend, _LxmlNode(root))
+    from bs4 import BeautifulSoup
+    return Document("bs4", _SoupNode(BeautifulSoup(html, "html.parser")))
@@ -0,0 +1,246 @@
+"""ParçaPusula ön ısıtma: popüler/yükselen sorguları önbellek süreleri dolmadan yeniden tarar.
+
+Uygulama içinde (PP_PREWARM=1 ile api/index.py lifespan'ında) ya da ayrı bir süreç olarak çalışır:
+
+    python -m prewarm --once                          # Kayıtlı sorgu istatistiklerinden bir tur
+    python -m prewarm --queries liste.txt --top 30    # Dosyadaki sorguları sürekli sıcak tut
+
+Ayrı süreçte ısıtılan sonuçlar uygulamaya kalıcı fiyat indeksi (PP_INDEX_PATH) üzerinden ulaşır.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from scraper import ScraperEngine, normalize_query
+
+# ─────────────────────────── Ön Isıtma Ayarları ──────────────────────
+PREWARM_ENABLED      = os.environ.get("PP_PREWARM", "0") == "1"           # Uygulama içi döngü (serverless'ta kapalı kalmalı)
+PREWARM_TOP_N        = int(os.environ.get("PP_PREWARM_TOP_N", "50"))
+PREWARM_INTERVAL_S   = float(os.environ.get("PP_PREWARM_INTERVAL_S", "60"))
+PREWARM_LEAD_S       = float(os.environ.get("PP_PREWARM_LEAD_S", "120"))  # Tazeliği bu kadar kalan sonuçlar yeniden taranır
+PREWARM_BUDGET_PER_H = int(os.environ.get("PP_PREWARM_BUDGET_PER_H", "600"))   # Saatlik en fazla giden (site) isteği
+PREWARM_WINDOWS      = os.environ.get("PP_PREWARM_WINDOWS", "")           # "2-7,14-16" (yerel saat); boş = her zaman
+PREWARM_HALF_LIFE_S  = float(os.environ.get("PP_PREWARM_HALF_LIFE_S", str(6 * 3600)))  # Sorgu skorunun yarılanma süresi
+PREWARM_STATE_PATH   = os.environ.get("PP_PREWARM_STATE", os.path.join(tempfile.gettempdir(), "parcapusula_queries.json"))
+TRACKER_MAX_QUERIES  = 5000
+
+# ─────────────────────────── Sorgu Sıklığı ───────────────────────────
+class QueryTracker:
+    """Üstel sönümlü sorgu sayacı: sık aranan ve son zamanda yükselen sorgular üstte kalır.
+
+    Sayım normalize_query anahtarıyla yapılır ('Fren Balatası' = 'fren balatasi'); ısıtma ise o anahtar
+    için ilk görülen ham sorguyla yapılır, sitelere kullanıcıların gönderdiği metin gider.
+    """
+
+    def __init__(self, half_life_s: float = PREWARM_HALF_LIFE_S, max_queries: int = TRACKER_MAX_QUERIES):
+        self.half_life_s = half_life_s
+        self.max_queries = max_queries
+        self._scores: dict[str, tuple[float, float]] = {}   # anahtar -> (skor, son güncelleme)
+        self._raw: dict[str, str] = {}                       # anahtar -> ilk görülen ham sorgu
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * math.pow(0.5, (now - updated) / self.half_life_s)
+
+    def hit(self, query: str, weight: float = 1.0):
+        q = normalize_query(query)
+        if not q:
+            return
+        now = time.time()
+        score, updated = self._scores.get(q, (0.0, now))
+        self._scores[q] = (self._decayed(score, updated, now) + weight, now)
+        self._raw.setdefault(q, " ".join(query.split()))
+        if len(self._scores) > self.max_queries:
+            # En düşük skorlu onda biri at
+            ranked = sorted(self._scores, key=lambda k: self._decayed(*self._scores[k], now))
+            for k in ranked[: self.max_queries // 10]:
+                del self._scores[k]
+                self._raw.pop(k, None)
+
+    def top(self, n: int) -> list[tuple[str, float]]:
+        """En yüksek skorlu n sorgu; her biri anahtarının ham (sitelere gönderilecek) haliyle."""
+        now = time.time()
+        ranked = sorted(((self._raw.get(q, q), self._decayed(s, u, now)) for q, (s, u) in self._scores.items()), key=lambda x: -x[1])
+        return ranked[:n]
+
+    def save(self, path: str = PREWARM_STATE_PATH):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({q: [*v, self._raw.get(q, q)] for q, v in self._scores.items()}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def load(self, path: str = PREWARM_STATE_PATH) -> bool:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        for q, (score, updated, *raw) in data.items():
+            self._scores[q] = (float(score), float(updated))
+            self._raw[q] = raw[0] if raw else q   # Eski kayıtlarda ham sorgu yok
+        return True
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+# ─────────────────────────── Pencere ve Bütçe ────────────────────────
+def parse_windows(spec: str) -> list[tuple[int, int]]:
+    """'2-7,14-16' → [(2, 7), (14, 16)]  (başlangıç dahil, bitiş hariç; '22-6' gece yarısını aşar)."""
+    windows = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        start, _, end = part.partition("-")
+        windows.append((int(start) % 24, int(end or start) % 24))
+    return windows
+
+def in_window(windows: list[tuple[int, int]], hour: Optional[int] = None) -> bool:
+    if not windows:
+        return True
+    hour = datetime.now().hour if hour is None else hour
+    for start, end in windows:
+        if (start <= hour < end) if start < end else (hour >= start or hour < end):
+            return True
+    return False
+
+class OutboundBudget:
+    """Son bir saatte harcanan giden istek sayısını tutar (kayan pencere)."""
+
+    def __init__(self, per_hour: int = PREWARM_BUDGET_PER_H):
+        self.per_hour = per_hour
+        self._spent: deque = deque()   # (zaman, istek)
+
+    def left(self) -> int:
+        cutoff = time.monotonic() - 3600
+        while self._spent and self._spent[0][0] < cutoff:
+            self._spent.popleft()
+        return self.per_hour - sum(n for _, n in self._spent)
+
+    def spend(self, n: int):
+        self._spent.append((time.monotonic(), n))
+
+# ─────────────────────────── Ön Isıtıcı ──────────────────────────────
+class PreWarmer:
+    """En popüler N sorguyu, önbellekteki sonuçları dolmadan ScraperEngine.search_all ile yeniden tarar.
+
+    Giden istekler motorun domain bazlı hız sınırlayıcısından geçer; ayrıca saatlik bir bütçe
+    ve yoğun olmayan saat pencereleri (PP_PREWARM_WINDOWS) dışında hiç istek atılmaz.
+    """
+
+    def __init__(self, engine: ScraperEngine, tracker: Optional[QueryTracker] = None, top_n: int = PREWARM_TOP_N,
+                 lead_s: float = PREWARM_LEAD_S, budget: Optional[OutboundBudget] = None, windows: str = PREWARM_WINDOWS):
+        self.engine  = engine
+        self.tracker = tracker or QueryTracker()
+        self.top_n   = top_n
+        self.lead_s  = lead_s
+        self.budget  = budget or OutboundBudget()
+        self.windows = parse_windows(windows)
+        self.warmed  = self.skipped_budget = self.rounds = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def track(self, query: str):
+        """Kullanıcı aramalarından çağrılır (ön ısıtmanın kendi aramaları sayılmaz)."""
+        self.tracker.hit(query)
+
+    async def run_once(self) -> int:
+        """Bir tur: süresi dolmak üzere olan popüler sorguları bütçe yettiğince tazeler. Isıtılan sorgu sayısını döner."""
+        self.rounds += 1
+        if not in_window(self.windows):
+            return 0
+        warmed = 0
+        for query, _score in self.tracker.top(self.top_n):
+            cost = self.engine.due_sites(query, self.lead_s)
+            if cost == 0:
+                continue
+            if cost > self.budget.left():
+                self.skipped_budget += 1
+                break
+            self.budget.spend(cost)
+            try:
+                await self.engine.search_all(query, refresh_within_s=self.lead_s)
+                warmed += 1
+            except Exception as e:
+                print(f"[PREWARM] UYARI: '{query}' ısıtılamadı: {e}")
+        self.warmed += warmed
+        return warmed
+
+    async def run_forever(self, interval_s: float = PREWARM_INTERVAL_S, state_path: Optional[str] = PREWARM_STATE_PATH):
+        while True:
+            try:
+                await self.run_once()
+                if state_path:
+                    await asyncio.to_thread(self.tracker.save, state_path)
+            except Exception as e:
+                print(f"[PREWARM] UYARI: Tur hatası: {e}")
+            await asyncio.sleep(interval_s)
+
+    def start(self, interval_s: float = PREWARM_INTERVAL_S):
+        if self._task is None or self._task.done():
+            self.tracker.load()
+            self._task = asyncio.create_task(self.run_forever(interval_s))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running"       : self._task is not None and not self._task.done(),
+            "tracked"       : len(self.tracker),
+            "top"           : [[q, round(s, 2)] for q, s in self.tracker.top(10)],
+            "rounds"        : self.rounds,
+            "warmed"        : self.warmed,
+            "skipped_budget": self.skipped_budget,
+            "budget_left"   : self.budget.left(),
+            "in_window"     : in_window(self.windows),
+        }
+
+# ─────────────────────────── CLI ─────────────────────────────────────
+async def _main(args) -> int:
+    tracker = QueryTracker()
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    tracker.hit(line.strip())
+    elif not tracker.load(args.state):
+        print(f"[PREWARM] Sorgu istatistiği yok: {args.state} (--queries ile liste verin)")
+        return 1
+
+    engine = ScraperEngine()
+    warmer = PreWarmer(engine, tracker, top_n=args.top, lead_s=args.lead_s,
+                       budget=OutboundBudget(args.budget), windows=args.windows)
+    try:
+        if args.once:
+            n = await warmer.run_once()
+            print(f"[PREWARM] {n} sorgu ısıtıldı, kalan bütçe: {warmer.budget.left()}")
+        else:
+            await warmer.run_forever(args.interval_s, state_path=None)
+    finally:
+        await engine.close()
+    return 0
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ParçaPusula popüler sorgu ön ısıtıcısı")
+    ap.add_argument("--queries", help="Satır başına bir sorgu (verilmezse --state dosyası okunur)")
+    ap.add_argument("--state", default=PREWARM_STATE_PATH)
+    ap.add_argument("--top", type=int, default=PREWARM_TOP_N)
+    ap.add_argument("--lead-s", type=float, default=PREWARM_LEAD_S)
+    ap.add_argument("--budget", type=int, default=PREWARM_BUDGET_PER_H, help="Saatlik giden (site) istek bütçesi")
+    ap.add_argument("--windows", default=PREWARM_WINDOWS, help="Yoğun olmayan saatler, ör. '2-7,14-16'")
+    ap.add_argument("--interval-s", type=float, default=PREWARM_INTERVAL_S)
+    ap.add_argument("--once", action="store_true", help="Tek tur çalış ve çık")
+    return asyncio.run(_main(ap.parse_args(argv)))
+
+if __name__ == "__main__":
+    sys.exit(main())
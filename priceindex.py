@@ -0,0 +1,198 @@
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from querynorm import normalize_query
+
+# ─────────────────────────── Fiyat İndeksi Ayarları ──────────────────
+INDEX_ENABLED     = os.environ.get("PP_INDEX", "1") == "1"
+# Vercel'de sadece /tmp yazılabilir; yerelde de aynı yer kullanılır
+INDEX_PATH        = os.environ.get("PP_INDEX_PATH", os.path.join(tempfile.gettempdir(), "parcapusula_prices.db"))
+INDEX_FRESH_S     = float(os.environ.get("PP_INDEX_FRESH_S", "1800"))            # Bu süreden yeni kayıtlar anında cevap sayılır
+INDEX_RETENTION_S = float(os.environ.get("PP_INDEX_RETENTION_S", str(90 * 86400)))  # Fiyat geçmişi bu kadar tutulur
+INDEX_PER_SITE    = 3                                                              # Arama sonucundaki gibi site başına en fazla ürün
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id            INTEGER PRIMARY KEY,
+    site          TEXT NOT NULL,
+    query         TEXT NOT NULL,
+    part_name     TEXT NOT NULL,
+    name_key      TEXT NOT NULL,           -- normalize_query(part_name): Türkçe katlanmış, parça no'ları birleşik
+    price_numeric REAL,
+    price_str     TEXT,
+    url           TEXT,
+    affiliate_url TEXT,
+    image_url     TEXT,
+    engine        TEXT,
+    seen_at       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS obs_url  ON observations(url, seen_at);
+CREATE INDEX IF NOT EXISTS obs_seen ON observations(seen_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts USING fts5(
+    name_key, content='observations', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS obs_ai AFTER INSERT ON observations BEGIN
+    INSERT INTO parts_fts(rowid, name_key) VALUES (new.id, new.name_key);
+END;
+CREATE TRIGGER IF NOT EXISTS obs_ad AFTER DELETE ON observations BEGIN
+    INSERT INTO parts_fts(parts_fts, rowid, name_key) VALUES ('delete', old.id, old.name_key);
+END;
+"""
+SCHEMA_VERSION = 2   # 1: FTS doğrudan part_name üzerindeydi
+
+def _migrate(conn: sqlite3.Connection):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    has_table = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'observations'").fetchone()
+    if has_table and version < 2:
+        # FTS'i kanonik ad anahtarı üzerinde yeniden kur, fiyat geçmişi korunur
+        conn.execute("ALTER TABLE observations ADD COLUMN name_key TEXT NOT NULL DEFAULT ''")
+        rows = conn.execute("SELECT id, part_name FROM observations").fetchall()
+        conn.executemany("UPDATE observations SET name_key = ? WHERE id = ?", [(normalize_query(n), i) for i, n in rows])
+        conn.executescript("DROP TRIGGER IF EXISTS obs_ai; DROP TRIGGER IF EXISTS obs_ad; DROP TABLE IF EXISTS parts_fts;")
+    conn.executescript(_SCHEMA)
+    if has_table and version < 2:
+        conn.execute("INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def fts_query(query: str) -> str:
+    """'Fren balatası  egea' → '"fren"* "balatasi"* "egea"*'  (kanonik anahtarın tüm kelimeleri, önek eşleşmesi)."""
+    return " ".join(f'"{tok}"*' for tok in _TOKEN.findall(normalize_query(query)))
+
+# ─────────────────────────── SQLite Fiyat İndeksi ────────────────────
+class PriceIndex:
+    """Kazınan her başarılı sonucu SQLite'a (WAL + FTS5) yazan kalıcı fiyat indeksi.
+
+    Yazmalar istek yolunu bekletmez: record() kuyruğa atar, tek bir yazıcı thread toplu
+    transaction'larla işler. Okumalar thread başına ayrı bağlantıyla yapılır (WAL sayesinde
+    yazıcıyı beklemez); event loop'tan asyncio.to_thread ile çağrılmalı.
+    """
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path    = path
+        self._local  = threading.local()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.written = self.dropped = 0
+        conn = self._connect()
+        _migrate(conn)   # FTS5 yoksa burada OperationalError fırlar, çağıran devre dışı bırakır
+        self._writer = threading.Thread(target=self._write_loop, name="pp-price-index", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── Yazma ──
+    def record(self, site: str, query: str, results: list):
+        """Başarılı sonuçları yazma kuyruğuna atar (bloklamaz)."""
+        now = time.time()
+        rows = [
+            (site, query, r.part_name, normalize_query(r.part_name), r.price_numeric, r.price_str, r.url, r.affiliate_url, r.image_url, r.engine, now)
+            for r in results if r.success and r.part_name
+        ]
+        if rows:
+            self._queue.put(rows)
+
+    def _write_loop(self):
+        conn = self._connect()
+        last_prune = 0.0
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            rows = list(batch)
+            # Kuyrukta biriken diğer yazmaları da aynı transaction'a al
+            stop = False
+            while True:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                    break
+                rows.extend(more)
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO observations (site, query, part_name, name_key, price_numeric, price_str, url, affiliate_url, image_url, engine, seen_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    if time.time() - last_prune > 3600:
+                        conn.execute("DELETE FROM observations WHERE seen_at < ?", (time.time() - INDEX_RETENTION_S,))
+                        last_prune = time.time()
+                self.written += len(rows)
+            except sqlite3.Error as e:
+                self.dropped += len(rows)
+                print(f"[INDEX] UYARI: Yazma hatası: {e}")
+            if stop:
+                return
+
+    # ── Okuma ──
+    def lookup(self, site: str, query: str, max_age_s: float = INDEX_FRESH_S) -> list[dict]:
+        """Sorgunun tüm kelimelerini içeren, yakın zamanda görülmüş ürünler (URL başına en güncel kayıt)."""
+        match = fts_query(query)
+        if not match:
+            return []
+        rows = self._connect().execute(
+            """
+            SELECT o.part_name, o.price_numeric, o.price_str, o.url, o.affiliate_url, o.image_url, MAX(o.seen_at) AS seen_at
+            FROM parts_fts JOIN observations o ON o.id = parts_fts.rowid
+            WHERE parts_fts MATCH ? AND o.site = ? AND o.seen_at >= ?
+            GROUP BY o.url, o.part_name
+            ORDER BY seen_at DESC
+            LIMIT ?
+            """,
+            (match, site, time.time() - max_age_s, INDEX_PER_SITE),
+        ).fetchall()
+        keys = ("part_name", "price_numeric", "price_str", "url", "affiliate_url", "image_url", "seen_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def history(self, url: str, limit: int = 500) -> list[dict]:
+        """Ürün URL'sinin fiyat geçmişi (eskiden yeniye). Art arda aynı fiyatlar tek noktaya indirilir."""
+        rows = self._connect().execute(
+            "SELECT seen_at, price_numeric, price_str, site FROM observations WHERE url = ? ORDER BY seen_at DESC LIMIT ?",
+            (url, limit),
+        ).fetchall()
+        points: list[dict] = []
+        for seen_at, price, price_str, site in reversed(rows):
+            if points and points[-1]["price_numeric"] == price:
+                points[-1]["last_seen"] = seen_at
+                continue
+            points.append({"first_seen": seen_at, "last_seen": seen_at, "price_numeric": price, "price_str": price_str, "site": site})
+        return points
+
+    def close(self):
+        """Kuyruktaki yazmaları bitirip yazıcıyı durdurur."""
+        self._queue.put(None)
+        self._writer.join(timeout=5.0)
+
+    def stats(self) -> dict:
+        return {
+            "path"   : self.path,
+            "pending": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+def open_index() -> Optional[PriceIndex]:
+    """Ayar kapalıysa ya da SQLite'ta FTS5 yoksa None (motor indekssiz çalışır)."""
+    if not INDEX_ENABLED:
+        return None
+    try:
+        return PriceIndex()
+    except sqlite3.Error as e:
+        print(f"[SYSTEM] UYARI: Fiyat indeksi açılamadı ({e}). Kalıcı indeks devre dışı.")
+        return None
@@ -1,8 +1,11 @@
 const CACHE_NAME = 'parcapusula-v1';
+const API_CACHE = 'parcapusula-api-v1';   // Son arama yanıtları + ETag (yeniden doğrulama için)
+const API_CACHE_MAX = 50;
 const STATIC_ASSETS = [
     '/',
     '/index.html',
     '/manifest.json',
+    '/placeholder.svg',
     // Eğer offline olduğumuzda gösterilecek bir sayfa yaparsak buraya eklenir
 ];
 
@@ -22,7 +25,7 @@ self.addEventListener('activate', event => {
     event.waitUntil(
         caches.keys().then(cacheNames => {
             return Promise.all(
-                cacheNames.filter(name => name !== CACHE_NAME).map(name => {
+                cacheNames.filter(name => name !== CACHE_NAME && name !== API_CACHE).map(name => {
                     console.log('[SW] Deleting Old Cache:', name);
                     return caches.delete(name);
                 })
@@ -32,22 +35,69 @@ self.addEventListener('activate', event => {
     self.clients.claim();
 });
 
-// Fetch Event (KRİTİK: /api/ aramalarını asla önbellekleme)
+function offlineResponse() {
+    // Offline durumunda API bir JSON hatası yollamalı
+    return new Response(
+        JSON.stringify({
+            status: 'error',
+            message: 'İnternet bağlantınız koptu. Lütfen bağlanıp tekrar deneyin.'
+        }),
+        { headers: { 'Content-Type': 'application/json' } }
+    );
+}
+
+async function trimApiCache(cache) {
+    // En eski sorgular atılır (cache.keys() ekleme sırasını korur)
+    const keys = await cache.keys();
+    for (const key of keys.slice(0, Math.max(0, keys.length - API_CACHE_MAX))) {
+        await cache.delete(key);
+    }
+}
+
+// /api/search: her zaman ağa sor, ama elimizdeki ETag ile. Sonuçlar değişmediyse sunucu
+// gövdesiz 304 döner ve önbellekteki yanıt kullanılır (bayat sonuç asla doğrulanmadan gösterilmez).
+async function revalidateSearch(request) {
+    const cache = await caches.open(API_CACHE);
+    const cached = await cache.match(request);
+    const headers = new Headers(request.headers);
+    const etag = cached && cached.headers.get('ETag');
+    if (etag) headers.set('If-None-Match', etag);
+
+    let response;
+    try {
+        response = await fetch(request.url, { headers, credentials: request.credentials, cache: 'no-store' });
+    } catch (error) {
+        console.error('[SW] API isteği başarısız (Offline olabilir):', error);
+        return offlineResponse();
+    }
+    if (response.status === 304 && cached) {
+        return cached;
+    }
+    // Sunucu aşırı yükte (503 + Retry-After): elde önceki sonuç varsa onu göster
+    if (response.status === 503 && cached) {
+        return cached;
+    }
+    if (response.status === 200 && response.headers.get('ETag')) {
+        await cache.put(request, response.clone());
+        trimApiCache(cache);
+    }
+    return response;
+}
+
+// Fetch Event (KRİTİK: /api/ yanıtlarını doğrulamadan asla önbellekten verme)
 self.addEventListener('fetch', event => {
-    // API isteklerinde her zaman ağdan (network) çek, cache kullanma!
-    if (event.request.url.includes('/api/')) {
+    const url = new URL(event.request.url);
+    if (url.pathname === '/api/search' && event.request.method === 'GET') {
+        event.respondWith(revalidateSearch(event.request));
+        return;
+    }
+
+    // Diğer API isteklerinde (akış, batch, sağlık...) her zaman ağdan (network) çek, cache kullanma!
+    if (url.pathname.startsWith('/api/')) {
         event.respondWith(
             fetch(event.request).catch(error => {
                 console.error('[SW] API isteği başarısız (Offline olabilir):', error);
-
-                // Offline durumunda API bir JSON hatası yollamalı
-                return new Response(
-                    JSON.stringify({
-                        status: 'error',
-                        message: 'İnternet bağlantınız koptu. Lütfen bağlanıp tekrar deneyin.'
-                    }),
-                    { headers: { 'Content-Type': 'application/json' } }
-                );
+                return offlineResponse();
             })
         );
         return; // Api isteği bitti, statik kısımlara inme.
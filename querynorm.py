@@ -0,0 +1,82 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# ─────────────────────────── Türkçe Harf Katlama ─────────────────────
+# str.lower() Türkçe'yi bilmez: "I".lower() == "i" (ı olmalı), "İ".lower() == "i̇" (fazladan nokta)
+_TR_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+# Kullanıcılar Türkçe karakterleri sıkça ASCII yazar ("balatasi"); anahtarda hepsi ASCII'ye katlanır
+_TR_FOLD = str.maketrans({"ı": "i", "ş": "s", "ğ": "g", "ü": "u", "ö": "o", "ç": "c", "â": "a", "î": "i", "û": "u"})
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+def fold_turkish(text: str) -> str:
+    """Türkçe'ye uygun küçük harf + aksan katlama: 'FREN BALATASI' / 'Fren Balatası' → 'fren balatasi'."""
+    text = text.translate(_TR_UPPER).lower().translate(_TR_FOLD)
+    if text.isascii():
+        return text
+    # Kalan aksanlar (é, ñ...) için genel Unicode ayrıştırma
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+# ─────────────────────────── Parça Numaraları ────────────────────────
+# "1K0 698 151", "04465-02220", "0 986 494 524", "A 000 420 17 20", "5Q0.615.301"
+_INNER_SEP  = re.compile(r"[\-./]")
+_PART_GROUP = re.compile(r"[a-z0-9]{1,6}")
+_MAX_GROUPS = 6
+
+def _is_start(token: str) -> bool:
+    """Parça numarasını başlatabilecek kelime: rakam içeren kısa grup ya da 'A' gibi 1-2 harflik ön ek."""
+    groups = _INNER_SEP.split(token)
+    if not all(_PART_GROUP.fullmatch(g) for g in groups):
+        return False
+    if len(groups) > 1:
+        # Tire/nokta/eğik çizgi güçlü işaret ("58101-1ha00"), ama her grup rakam içermeli ("fren-balata" değil)
+        return all(any(c.isdigit() for c in g) for g in groups)
+    return any(c.isdigit() for c in token) or (token.isalpha() and len(token) <= 2)
+
+def _accept(joined: str) -> bool:
+    digits = sum(c.isdigit() for c in joined)
+    if joined.isdigit():
+        # Sadece rakamsa en az 9 hane: "2012 2016" (yıl aralığı) gibi değerler birleşmesin
+        return digits >= 9
+    return len(joined) >= 7 and digits >= 5
+
+def canonicalize_part_numbers(text: str) -> str:
+    """Boşluk/tire/nokta ile bölünmüş parça numaralarını tek parça yazar: '1k0-698 151' → '1k0698151'.
+
+    Boşlukla devam eden gruplar tamamen rakam olmalı; "e90 320d", "w204 c180" gibi model adları birleşmez.
+    """
+    tokens = text.split(" ")
+    out: list[str] = []
+    i = 0
+    while i < len(tokens):
+        if _is_start(tokens[i]):
+            # Baştaki gruba eklenebilecek rakam gruplarını topla, en uzun geçerli birleşimi al
+            j = i + 1
+            while j < len(tokens) and j - i < _MAX_GROUPS and tokens[j].isdigit() and 2 <= len(tokens[j]) <= 6:
+                j += 1
+            for end in range(j, i, -1):
+                joined = _INNER_SEP.sub("", "".join(tokens[i:end]))
+                if (end - i > 1 or joined != tokens[i]) and _accept(joined):
+                    out.append(joined)
+                    i = end
+                    break
+            else:
+                out.append(tokens[i])
+                i += 1
+        else:
+            out.append(tokens[i])
+            i += 1
+    return " ".join(out)
+
+@lru_cache(maxsize=8192)
+def normalize_query(query: str) -> str:
+    """Önbellek, singleflight, batch ve indeks için kanonik anahtar. Sitelere giden sorgu değişmez.
+
+    'FREN  BALATASI' / 'Fren Balatası' / 'fren balatasi' → 'fren balatasi'
+    '1K0 698 151' / '1k0-698-151' / '1K0698151'        → '1k0698151'
+    """
+    text = fold_turkish(" ".join(query.split()))
+    text = canonicalize_part_numbers(text)
+    return " ".join(_NON_WORD.sub(" ", text).split())
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import random
+import time
+from typing import Optional
+
+# ─────────────────────────── Hız Sınırı Ayarları ─────────────────────
+RL_RATE_PER_S  = float(os.environ.get("PP_RL_RATE_PER_S", "4.0"))    # Domain başına kalıcı istek hızı
+RL_BURST       = float(os.environ.get("PP_RL_BURST", "8"))           # Boş domain'e beklemeden atılabilecek istek
+RL_HOT_FRACTION = float(os.environ.get("PP_RL_HOT_FRACTION", "0.5")) # Kova bu oranın altına inince domain "sıcak"
+RL_JITTER_MAX_S = float(os.environ.get("PP_RL_JITTER_MAX_S", "1.0")) # Sıcak domain'de eklenecek en fazla jitter
+
+# ─────────────────────────── Token Bucket ────────────────────────────
+class TokenBucket:
+    """Rezervasyonlu token bucket: token yoksa eksiye düşer ve istek sırası gelene kadar bekler (FIFO adil)."""
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate    = rate
+        self.burst   = burst
+        self.tokens  = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> tuple[float, float]:
+        """Bir token ayırır; (beklenecek süre, ayırmadan önceki doluluk oranı) döner."""
+        now = time.monotonic()
+        self._refill(now)
+        fill = max(0.0, self.tokens) / self.burst
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return wait, fill
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+# ─────────────────────────── Domain Hız Sınırlayıcı ──────────────────
+class DomainRateLimiter:
+    """Tüm eşzamanlı aramalar arasında paylaşılan domain başına token bucket.
+
+    Uzun süredir dokunulmamış (kovası dolu) domain'e istek hemen çıkar. Kova boşaldıkça
+    (domain sıcak) anti-bot için rastgele jitter eklenir; token bitince istekler kovanın
+    dolum hızıyla sıraya girer.
+    """
+
+    def __init__(self, rate: float = RL_RATE_PER_S, burst: float = RL_BURST):
+        self.rate  = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+        self._overrides: dict[str, tuple[float, float]] = {}
+        self.immediate = 0     # Hiç beklemeden çıkan istek
+        self.delayed   = 0     # Jitter ya da sıra bekleyen istek
+        self.waited_s  = 0.0
+
+    def configure(self, domain: str, rate: Optional[float] = None, burst: Optional[float] = None):
+        """Site bazlı hız/burst (SiteConfig.rate_per_s / burst)."""
+        self._overrides[domain] = (rate or self.rate, burst or self.burst)
+        self._buckets.pop(domain, None)
+
+    def _bucket(self, domain: str) -> TokenBucket:
+        b = self._buckets.get(domain)
+        if b is None:
+            rate, burst = self._overrides.get(domain, (self.rate, self.burst))
+            b = self._buckets[domain] = TokenBucket(rate, burst)
+        return b
+
+    async def acquire(self, domain: str) -> float:
+        """Domain'e istek atma hakkı alır, beklenen süreyi (sn) döner. İptal edilirse token iade edilir."""
+        bucket = self._bucket(domain)
+        wait, fill = bucket.reserve()
+        if fill < RL_HOT_FRACTION:
+            # Domain sıcak: ne kadar doluysa o kadar az jitter
+            wait += random.uniform(0.0, RL_JITTER_MAX_S) * (1.0 - fill / RL_HOT_FRACTION)
+        if wait <= 0:
+            self.immediate += 1
+            return 0.0
+
+        self.delayed += 1
+        self.waited_s += wait
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            bucket.refund()
+            raise
+        return wait
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        levels = {}
+        for domain, b in self._buckets.items():
+            tokens = min(b.burst, b.tokens + (now - b.updated) * b.rate)
+            levels[domain] = round(tokens, 2)
+        return {
+            "immediate": self.immediate,
+            "delayed"  : self.delayed,
+            "waited_s" : round(self.waited_s, 2),
+            "tokens"   : levels,
+        }
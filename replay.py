@@ -0,0 +1,204 @@
+"""Kayıtlı ham yanıtları (PP_CAPTURE=1) ağa çıkmadan, _scrape_one'ın çıkarım adımıyla yeniden ayrıştırır.
+
+Seçici (SITES) ya da strateji değişikliğini canlı sitelere gitmeden binlerce gerçek sayfada denemek için:
+sayfalar işçi süreçlere dağıtılır, site bazında sonuç/strateji dağılımı ve throughput raporlanır.
+
+    python replay.py                              # PP_CAPTURE_DIR'deki tüm kayıtlar, tüm çekirdekler
+    python replay.py --site n11 --limit 500
+    python replay.py --save once.json             # değişiklikten önce sonuç imzalarını kaydet
+    python replay.py --compare once.json          # sonra: kaybolan/değişen/yeni bulunan sonuçlar (kayıp varsa çıkış kodu 1)
+    python replay.py --order cards,regex_fallback # sitenin strateji sırası yerine bunu dene
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from capture import CAPTURE_DIR, CaptureStore, load_body
+
+# Çıkarımın engel sayfalarında _scrape_one ile aynı cevabı vermesi için
+_BLOCKED_STATUSES = (403, 429, 503)
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# ─────────────────────────── İşçi ────────────────────────────────────
+_sites: dict = {}
+
+def _init_worker(quiet: bool):
+    if quiet:
+        # Stratejilerin terminal uyarıları binlerce sayfada raporu boğmasın
+        sys.stdout = open(os.devnull, "w")
+    import scraper
+
+    _sites.update((c.name, c) for c in scraper.SITES)
+
+def replay_one(job: tuple) -> dict:
+    """Tek kayıt: gövdeyi açar, _scrape_one'ın durum kodu kontrolü + _extract_job adımını çalıştırır.
+    Süre (`ms`) gövdenin açılmasını da içerir."""
+    import scraper
+    from sessions import base_domain
+
+    root, cap, order = job
+    if not _sites:
+        _sites.update((c.name, c) for c in scraper.SITES)
+    out = {"id": cap["id"], "site": cap["site"], "status": cap["status"], "bytes": cap["raw_size"],
+           "ok": False, "items": [], "winner": None, "missed": [], "error": "", "ms": 0.0}
+    cfg = _sites.get(cap["site"])
+    if cfg is None:
+        out["error"] = "Tanımsız site"
+        return out
+    started = time.perf_counter()
+    if cap["status"] >= 400:
+        out["error"] = "Erişim Engellendi (Koruma)" if cap["status"] in _BLOCKED_STATUSES else "Site Koruma Altında"
+        return out
+    body = load_body(root, cap["digest"], cap["codec"])
+    extract_job = (cfg.name, cap["url"], base_domain(cfg.base_search_url), cap["headers"].get("content-type", ""),
+                   body, cap["charset"], list(order or cfg.extractors))
+    try:
+        found, winner, missed, _laps = scraper._extract_job(extract_job)
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+        return out
+    out["ms"] = (time.perf_counter() - started) * 1000
+    out["winner"], out["missed"] = winner, missed
+    out["ok"] = any(r.success for r in found)
+    if out["ok"]:
+        out["items"] = [[r.part_name, r.price_numeric, r.url] for r in found if r.success]
+    else:
+        out["error"] = found[0].error_msg if found else ""
+    return out
+
+# ─────────────────────────── Çalıştırma ──────────────────────────────
+def run(store: CaptureStore, sites: Optional[list[str]], limit: int, workers: int, order: Optional[list[str]],
+        quiet: bool = True) -> tuple[list[dict], float]:
+    """Süre işçilerin açılışını (spawn + scraper importu) içermez: sadece ayrıştırma throughput'u."""
+    jobs = [(store.root, cap, order) for cap in store.iter_captures(sites=sites, limit=limit)]
+    if workers <= 1:
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            import scraper  # noqa: F401  (import süresi ölçüme girmesin)
+
+            started = time.perf_counter()
+            results = [replay_one(job) for job in jobs]
+        return results, time.perf_counter() - started
+    # spawn: ana süreçteki yazıcı thread'ler işçiye kopyalanmasın (ParsePool ile aynı)
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(quiet,)) as pool:
+        # Her işçiyi meşgul eden kısa bir iş: hepsi açılıp import'u bitirsin
+        for future in [pool.submit(time.sleep, 0.2) for _ in range(workers)]:
+            future.result()
+        started = time.perf_counter()
+        results = list(pool.map(replay_one, jobs, chunksize=max(1, min(32, len(jobs) // (workers * 4) or 1))))
+        return results, time.perf_counter() - started
+
+def summarize(results: list[dict], elapsed: float) -> dict:
+    by_site: dict[str, dict] = {}
+    for r in results:
+        s = by_site.setdefault(r["site"], {"pages": 0, "ok": 0, "blocked": 0, "items": 0, "bytes": 0, "ms": [], "winners": {}})
+        s["pages"] += 1
+        s["ok"] += r["ok"]
+        s["blocked"] += r["status"] >= 400
+        s["items"] += len(r["items"])
+        s["bytes"] += r["bytes"]
+        if r["status"] < 400:
+            s["ms"].append(r["ms"])
+        if r["winner"]:
+            s["winners"][r["winner"]] = s["winners"].get(r["winner"], 0) + 1
+    total_bytes = sum(r["bytes"] for r in results)
+    return {
+        "pages"     : len(results),
+        "elapsed_s" : round(elapsed, 3),
+        "pages_per_s": round(len(results) / elapsed, 1) if elapsed else None,
+        "mb_per_s"  : round(total_bytes / 1024 / 1024 / elapsed, 2) if elapsed else None,
+        "sites"     : {
+            site: {
+                "pages"  : s["pages"],
+                "ok_pct" : round(100 * s["ok"] / s["pages"], 1),
+                "blocked": s["blocked"],
+                "items"  : s["items"],
+                "p50_ms" : round(_percentile(s["ms"], 0.50), 2),
+                "p95_ms" : round(_percentile(s["ms"], 0.95), 2),
+                "winners": s["winners"],
+            }
+            for site, s in sorted(by_site.items())
+        },
+    }
+
+def compare(results: list[dict], baseline: dict) -> dict:
+    """Kayıt bazında önceki çalıştırmayla fark: kaybolan (önce sonuç vardı, şimdi yok), yeni bulunan, değişen."""
+    diff = {"same": 0, "lost": [], "found": [], "changed": [], "unknown": 0}
+    for r in results:
+        before = baseline.get(str(r["id"]))
+        if before is None:
+            diff["unknown"] += 1
+        elif before == r["items"]:
+            diff["same"] += 1
+        elif before and not r["items"]:
+            diff["lost"].append(r)
+        elif r["items"] and not before:
+            diff["found"].append(r)
+        else:
+            diff["changed"].append(r)
+    return diff
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ParçaPusula kayıtlı yanıtları çevrimdışı yeniden ayrıştırma")
+    ap.add_argument("--dir", default=CAPTURE_DIR, help="Kayıt deposu (PP_CAPTURE_DIR)")
+    ap.add_argument("--site", action="append", help="Sadece bu site(ler); birden fazla kez verilebilir")
+    ap.add_argument("--limit", type=int, default=0, help="En yeni N kayıt (0: hepsi)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--order", type=lambda s: s.split(","), help="Strateji sırası (virgülle); verilmezse SiteConfig.extractors")
+    ap.add_argument("--save", help="Kayıt bazında sonuç imzalarını bu JSON'a yaz")
+    ap.add_argument("--compare", help="--save ile yazılmış önceki çalıştırmayla karşılaştır")
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--verbose", action="store_true", help="Strateji uyarılarını gizleme")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.dir, "captures.db")):
+        print(f"[REPLAY] Kayıt deposu yok: {args.dir} (PP_CAPTURE=1 ile tarama yapın)")
+        return 2
+    store = CaptureStore(root=args.dir)
+    try:
+        results, elapsed = run(store, args.site, args.limit, args.workers, args.order, quiet=not args.verbose)
+        codec_info = store.stats()
+    finally:
+        store.close()
+    report = summarize(results, elapsed)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({str(r["id"]): r["items"] for r in results}, f, ensure_ascii=False)
+
+    diff = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            diff = compare(results, json.load(f))
+        report["compare"] = {k: (len(v) if isinstance(v, list) else v) for k, v in diff.items()}
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"{report['pages']} sayfa, {args.workers} işçi, {report['elapsed_s']}s → {report['pages_per_s']} sayfa/s, "
+              f"{report['mb_per_s']} MB/s (depo: {codec_info['codec']}, {codec_info['stored_mb']} MB, x{codec_info['ratio']})")
+        print(f"{'site':<18} {'sayfa':>6} {'sonuç%':>7} {'engel':>6} {'ürün':>7} {'p50 ms':>7} {'p95 ms':>7}  kazanan stratejiler")
+        for site, s in report["sites"].items():
+            winners = ", ".join(f"{k}:{v}" for k, v in sorted(s["winners"].items(), key=lambda kv: -kv[1]))
+            print(f"{site:<18} {s['pages']:>6} {s['ok_pct']:>7} {s['blocked']:>6} {s['items']:>7} {s['p50_ms']:>7} {s['p95_ms']:>7}  {winners}")
+        if diff is not None:
+            c = report["compare"]
+            print(f"karşılaştırma: aynı {c['same']}, kaybolan {c['lost']}, yeni bulunan {c['found']}, değişen {c['changed']}, önceki çalıştırmada olmayan {c['unknown']}")
+            for r in diff["lost"][:10]:
+                print(f"  - kayboldu #{r['id']} [{r['site']}] {r['error'] or '-'}")
+    return 1 if diff is not None and diff["lost"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import gzip
+import hashlib
+import json
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# ── Hızlı JSON: orjson varsa onu, yoksa standart json (aynı çıktı biçimi) ──
+try:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    JSON_BACKEND = "orjson"
+except ImportError:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    JSON_BACKEND = "json"
+
+# ── Brotli isteğe bağlı (brotli ya da brotlicffi); yoksa sadece gzip ──
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# ─────────────────────────── Yanıt Ayarları ──────────────────────────
+COMPRESS_MIN_BYTES = 512     # Bunun altındaki gövdeler sıkıştırılmaz (başlık maliyeti kazancı yer)
+GZIP_LEVEL         = 6
+BROTLI_QUALITY     = 5       # 11 çok yavaş; 4-6 arası JSON için iyi hız/oran dengesi
+
+def etag_of(body: bytes) -> str:
+    """İçerik özeti. Zayıf (W/): gzip/br/ham gösterimler aynı ETag'i paylaşır."""
+    return 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Zayıf karşılaştırma: W/ önekleri yok sayılır
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+def _accepted_encodings(header: str) -> set[str]:
+    """'gzip, br;q=0.8, identity;q=0' → {'gzip', 'br'}  (q=0 olanlar reddedilmiş sayılır)."""
+    accepted = set()
+    for part in header.split(","):
+        name, *params = part.strip().split(";")
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+def json_response(request: Request, payload: Any, headers: Optional[dict] = None, status_code: int = 200) -> Response:
+    """JSON'u hızlı kodlar, içerik özetli ETag ekler, If-None-Match tutarsa 304, değilse br/gzip ile sıkıştırır."""
+    body = dumps(payload)
+    etag = etag_of(body)
+    out_headers = {
+        "ETag"         : etag,
+        "Cache-Control": "no-cache",          # Tarayıcı/SW her seferinde ETag ile yeniden doğrulasın
+        "Vary"         : "Accept-Encoding",
+        **(headers or {}),
+    }
+    if status_code == 200 and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=out_headers)
+
+    if len(body) >= COMPRESS_MIN_BYTES:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+            out_headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+            out_headers["Content-Encoding"] = "gzip"
+    return Response(body, status_code=status_code, media_type="application/json", headers=out_headers)
@@ -0,0 +1,129 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+from health import HealthTracker
+
+# ─────────────────────────── Zamanlayıcı Ayarları ────────────────────
+HEDGE_PERCENTILE = float(os.environ.get("PP_HEDGE_PERCENTILE", "0.9"))
+HEDGE_DEFAULT_S  = float(os.environ.get("PP_HEDGE_DEFAULT_S", "3.0"))   # Yeterli örnek yokken hedge eşiği
+HEDGE_MIN_S      = float(os.environ.get("PP_HEDGE_MIN_S", "0.5"))
+LATENCY_MIN_SAMPLES = 5
+
+# Katman: (motor adı, kalan süreyi alıp sonucu dönen fabrika)
+Layer = tuple[str, Callable[[float], Awaitable[Any]]]
+
+# ─────────────────────────── Hedge'li Zamanlayıcı ────────────────────
+class HedgedScheduler:
+    """Tek bir arama deadline'ı içinde motor katmanlarını (curl_cffi → httpx → ScraperAPI) yürütür.
+
+    İlk katman, kendi geçmiş gecikmesinin yüzdelik dilimini aşarsa bir sonraki katman paralel
+    (hedge) başlatılır; ilk kullanılabilir cevabı veren kazanır, diğerleri iptal edilir.
+    Katman hata dönerse hedge beklenmeden hemen sıradakine geçilir.
+    """
+
+    def __init__(self, health: Optional[HealthTracker] = None, percentile: float = HEDGE_PERCENTILE):
+        self.percentile = percentile
+        # Gecikme geçmişi ve devre kesiciler tek yerde: site sağlık takipçisi
+        self.health = health or HealthTracker()
+        self._hedge_keys: set = set()
+        self.hedges   = 0                 # Başlatılan hedge istek sayısı
+        self.timeouts = 0                 # Deadline'a takılan site araması
+        self.wins: dict[str, int] = {}    # Katman adı -> kazanma sayısı
+
+    def hedge_after(self, site: str, layer: str) -> float:
+        self._hedge_keys.add((site, layer))
+        samples = self.health.latencies(site, layer)
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return HEDGE_DEFAULT_S
+        ordered = sorted(samples)
+        idx = min(len(ordered) - 1, int(len(ordered) * self.percentile))
+        return max(HEDGE_MIN_S, ordered[idx])
+
+    async def run(self, site: str, layers: list[Layer], deadline: float,
+                  is_final: Callable[[Any], bool],
+                  is_local: Optional[Callable[[Any], bool]] = None) -> tuple[Optional[Any], Optional[str], float]:
+        """(sonuç, kazanan katman, kalan bütçe sn) döner. Hiçbir katman cevap vermezse sonuç None olur.
+
+        `layers` zaten sağlık takipçisinin `plan()` sırasına göre dizilmiş olmalı; her tamamlanan
+        deneme (kazanan ya da kaybeden) takipçiye kaydedilir. `is_local` doğru dönen sonuç (kendi
+        tarafımızdaki aşırı yük) kazanç sayılmaz ve katmanın sağlığına yazılmaz.
+        """
+        loop = asyncio.get_running_loop()
+        pending: dict[asyncio.Future, tuple[str, float]] = {}   # görev -> (katman, başlangıç)
+        recorded: set[str] = set()
+        next_idx = 0
+        last_result, last_layer = None, None
+
+        def launch():
+            nonlocal next_idx
+            name, factory = layers[next_idx]
+            next_idx += 1
+            remaining = max(0.0, deadline - loop.time())
+            pending[asyncio.ensure_future(factory(remaining))] = (name, loop.time())
+
+        try:
+            launch()
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    # Deadline'ı yiyen katmanlar da başarısız sayılır (devre kesici için)
+                    for name, started in pending.values():
+                        recorded.add(name)
+                        self.health.record(site, name, False, loop.time() - started)
+                    break
+
+                wait_for = remaining
+                if next_idx < len(layers):
+                    # Kalan bütçeyi kalan katmanlara böl; en yeni katman p-yüzdeliği aşarsa hedge at
+                    newest, newest_start = max(pending.values(), key=lambda v: v[1])
+                    layers_left = len(layers) - next_idx + 1
+                    hedge_delay = min(self.hedge_after(site, newest), remaining / layers_left)
+                    wait_for = max(0.0, newest_start + hedge_delay - loop.time())
+
+                done, _ = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if next_idx < len(layers):
+                        self.hedges += 1
+                        launch()
+                    continue
+
+                for task in done:
+                    name, started = pending.pop(task)
+                    elapsed = loop.time() - started
+                    recorded.add(name)
+                    if task.cancelled() or task.exception() is not None:
+                        self.health.record(site, name, False, elapsed)
+                        continue
+                    result = task.result()
+                    last_result, last_layer = result, name
+                    if is_local is not None and is_local(result):
+                        self.health.release(site, name)
+                        continue
+                    final = is_final(result)
+                    self.health.record(site, name, final, elapsed)
+                    if final:
+                        self.wins[name] = self.wins.get(name, 0) + 1
+                        return result, name, max(0.0, deadline - loop.time())
+
+                # Çalışan katman kalmadıysa hedge eşiğini beklemeden sıradakine geç
+                if not pending and next_idx < len(layers):
+                    launch()
+
+            return last_result, last_layer, max(0.0, deadline - loop.time())
+        finally:
+            for task in pending:
+                task.cancel()
+            # Başlatılmayan ya da iptal edilen katmanların yoklama (half-open) hakkını geri ver
+            for name, _ in layers:
+                if name not in recorded:
+                    self.health.release(site, name)
+
+    def stats(self) -> dict:
+        return {
+            "hedges"  : self.hedges,
+            "timeouts": self.timeouts,
+            "wins"    : dict(self.wins),
+            "hedge_after_s": {f"{s}/{l}": round(self.hedge_after(s, l), 3) for (s, l) in list(self._hedge_keys)},
+        }
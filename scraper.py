@@ -1,25 +1,41 @@
 import asyncio
-import httpx
+import bisect
+import json
+import os
 import re
 import random
+import sys
+import time
 import urllib.parse
-from bs4 import BeautifulSoup
-from dataclasses import dataclass
-from typing import Optional
-
-# ── Katman 1 (curl_cffi) İçin Savunma Hattı ──
-try:
-    from curl_cffi.requests import AsyncSession
-    CURL_CFFI_AVAILABLE = True
-except ImportError:
-    print("[SYSTEM] UYARI: curl_cffi yüklenemedi. Katman 1 devre dışı, HTTPX/ScraperAPI fallbacks aktif.")
-    CURL_CFFI_AVAILABLE = False
-except Exception as e:
-    print(f"[SYSTEM] UYARI: curl_cffi başlatma hatası: {e}")
-    CURL_CFFI_AVAILABLE = False
+from dataclasses import dataclass, field, fields
+from typing import Awaitable, Callable, Optional, Union
+
+from cache import ResultCache, CACHE_FRESH, CACHE_MISS, CACHE_STALE
+from singleflight import SingleFlight
+from sessions import SessionPool, base_domain, curl_cffi_available, preload_layers
+from scheduler import HedgedScheduler
+from health import HealthTracker
+from strategies import StrategyPlanner
+from priceindex import INDEX_FRESH_S, PriceIndex, open_index
+from sharedcache import NS_RESULTS, SharedCache, open_shared_cache
+from querynorm import normalize_query
+from parsing import CompiledSelector, compile_selector, parse_html
+from metrics import StageLaps, StageTimer, observe_stage
+from parsepool import ParseBacklogError, ParsePool
+from admission import AdmissionController, AdmissionRejected
+from capture import CaptureStore, open_capture_store
+from imgproxy import PLACEHOLDER_IMAGE, proxy_url
+from aggregate import FALLBACK_TITLE, register_search_url
+from streaming import STREAM_ENABLED, StreamedResponse, charset_of, compile_tag_matchers, header_charset, read_limited
 
 # ─────────────────────────── Veri Modelleri ──────────────────────────
-@dataclass
+# Yer tutucu artık yerel statik dosya (public/placeholder.svg); eskisi indeksteki eski kayıtlarda kalmış olabilir
+_LEGACY_PLACEHOLDER = "https://via.placeholder.com/150/1E1E1E/FFB300?text=Gorsel+Yok"
+
+# Python 3.10+ dataclass'a __slots__ ekler: sonuç başına __dict__ yok, daha az bellek ve hızlı erişim
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class SearchResult:
     site_name    : str
     success      : bool
@@ -30,7 +46,32 @@ class SearchResult:
     error_msg    : str         = ""
     affiliate_url: str         = ""
     engine       : str         = "Stealth"
-    image_url    : str         = "https://via.placeholder.com/150/1E1E1E/FFB300?text=Gorsel+Yok"
+    image_url    : str         = PLACEHOLDER_IMAGE
+    budget_left_ms: Optional[int] = None   # Kazanan katman döndüğünde arama deadline'ından kalan süre
+
+    def to_dict(self) -> dict:
+        """API gösterimi. Ön yüzün zorunlu alanları hep var; varsayılan/türetilebilir alanlar atlanır:
+        yer tutucu görsel, url'den üretilen affiliate_url, boş hata mesajı, None bütçe.
+        Görsel, küçültülmüş kopyayı servis eden /api/img vekili üzerinden verilir.
+        """
+        d = {
+            "site_name"    : self.site_name,
+            "success"      : self.success,
+            "part_name"    : self.part_name,
+            "price_str"    : self.price_str,
+            "price_numeric": self.price_numeric,
+            "url"          : self.url,
+            "engine"       : self.engine,
+        }
+        if self.error_msg:
+            d["error_msg"] = self.error_msg
+        if self.affiliate_url and self.affiliate_url != generate_affiliate_url(self.url):
+            d["affiliate_url"] = self.affiliate_url
+        if self.image_url and self.image_url not in (PLACEHOLDER_IMAGE, _LEGACY_PLACEHOLDER):
+            d["image_url"] = proxy_url(self.image_url)
+        if self.budget_left_ms is not None:
+            d["budget_left_ms"] = self.budget_left_ms
+        return d
 
 @dataclass
 class SiteConfig:
@@ -41,6 +82,31 @@ class SiteConfig:
     price_sel      : str
     image_sel      : str       = ""
     timeout_ms     : int = 15_000
+    cache_ttl_s    : int = 600    # Sonuçlar bu süre taze sayılır (site bazlı)
+    max_bytes      : int = 3_000_000   # Gövde bu bayt bütçesini aşarsa okuma kesilir
+    stream_items   : int = 0      # >0 ise ilk kart seçicisinden bu kadar dolu kart kapanınca indirme erken kesilir (0: kapalı)
+    rate_per_s     : float = 0.0  # Domain başına istek hızı (0: PP_RL_RATE_PER_S)
+    burst          : int = 0      # Boş domain'e beklemeden atılabilecek istek (0: PP_RL_BURST)
+    # Sırayla denenen çıkarım stratejileri (EXTRACTORS adları); engine son kazananı öne alır
+    extractors     : tuple = ("ldjson", "cards", "regex_fallback")
+
+    # Seçiciler import anında bir kez derlenir (her istekte split/parse yok)
+    result_item_css: CompiledSelector = field(init=False, repr=False, compare=False)
+    title_css      : CompiledSelector = field(init=False, repr=False, compare=False)
+    price_css      : CompiledSelector = field(init=False, repr=False, compare=False)
+    image_css      : CompiledSelector = field(init=False, repr=False, compare=False)
+    item_matchers  : list             = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.compile_selectors()
+
+    def compile_selectors(self):
+        """Seçici string'leri değiştirildiyse tekrar çağrılmalı."""
+        self.result_item_css = compile_selector(self.result_item_sel)
+        self.title_css       = compile_selector(self.title_sel)
+        self.price_css       = compile_selector(self.price_sel)
+        self.image_css       = compile_selector(self.image_sel)
+        self.item_matchers   = compile_tag_matchers(self.result_item_css)
 
 # ─────────────────────────── Site Tanımları ──────────────────────────
 SITES: list[SiteConfig] = [
@@ -51,7 +117,9 @@ SITES: list[SiteConfig] = [
         title_sel       = "div.showcase-title a, div.productName a, div.product-title a, h3.name, a.title, div.product-name a, h3.product-name a",
         price_sel       = "div.showcase-price span, div.discountPrice span, div.product-price span, span.price, div.price, div.current-price, span.current-price",
         image_sel       = "img.object-fit-contain, img.product-image, img.lazy",
-        timeout_ms      = 8000
+        timeout_ms      = 8000,
+        stream_items    = 5,      # 3 kart + elenebilecekler için pay
+        extractors      = ("cards", "ldjson", "regex_fallback")
     ),
     SiteConfig(
         name="AlloYedekParca",
@@ -60,7 +128,9 @@ SITES: list[SiteConfig] = [
         title_sel="a.product-name, h3.product-title a",
         price_sel=".product-price, .price",
         image_sel="img.product-image, img.lazyload",
-        timeout_ms=8000
+        timeout_ms=8000,
+        stream_items=5,
+        extractors=("cards", "ldjson", "regex_fallback")
     ),
     SiteConfig(
         name="ParcaDeposu",
@@ -69,7 +139,9 @@ SITES: list[SiteConfig] = [
         title_sel=".showcase-title a",
         price_sel=".showcase-price-new",
         image_sel=".showcase-image img.lazy, .showcase-image img, img.lazyload",
-        timeout_ms=8000
+        timeout_ms=8000,
+        stream_items=5,
+        extractors=("cards", "ldjson", "regex_fallback")
     ),
     SiteConfig(
         name            = "n11",
@@ -78,7 +150,8 @@ SITES: list[SiteConfig] = [
         title_sel       = "h3.productName, a.proName, h3.name, h3[class*='title'], h3",
         price_sel       = "ins, span.newPrice c, div.priceContainer ins, div.price span, span.new-price",
         image_sel       = "div.imgBox img.lazy, div.imgBox img, div.proDetail img",
-        timeout_ms      = 8000
+        timeout_ms      = 8000,
+        extractors      = ("ldjson", "cards", "regex_fallback")
     ),
     SiteConfig(
         name            = "Hepsiburada",
@@ -87,7 +160,9 @@ SITES: list[SiteConfig] = [
         title_sel       = "h3[data-test-id='product-card-name'], h3, div.product-title",
         price_sel       = "div[data-test-id='price-current-price'], span.price, div.price-value, span.price-current-price",
         image_sel       = "img[data-test-id='product-image'], img",
-        timeout_ms      = 8000
+        timeout_ms      = 8000,
+        max_bytes       = 4_000_000,  # __NEXT_DATA__ sayfanın sonunda, erken kesme yok
+        extractors      = ("ldjson", "next_data", "cards", "regex_fallback")
     ),
     SiteConfig(
         name            = "Sahibinden",
@@ -96,10 +171,17 @@ SITES: list[SiteConfig] = [
         title_sel       = "a.classifiedTitle, h3.title",
         price_sel       = "td.searchResultsPriceValue div, span.price",
         image_sel       = "td.searchResultsLargeThumbnail img",
-        timeout_ms      = 8000
+        timeout_ms      = 8000,
+        cache_ttl_s     = 300,    # İlanlar hızlı değişiyor, daha kısa tut
+        rate_per_s      = 2.0,    # En agresif bot koruması, domain'i daha yavaş besle
+        burst           = 4,
+        extractors      = ("json_api", "cards", "regex_fallback")   # Mobil JSON API; HTML gelirse kartlara düşer
     ),
 ]
 
+for _cfg in SITES:
+    register_search_url(_cfg.base_search_url)   # Arama sayfası URL'li sonuçlar URL ile tekilleştirilmesin
+
 # ─────────────────────────── Yardımcı Fonksiyonlar ───────────────────
 _PRICE_PATTERN = re.compile(r"[\d.,]+")
 
@@ -124,39 +206,407 @@ def generate_affiliate_url(original_url: str) -> str:
         return f"{original_url}&ref=onurcan"
     return f"{original_url}?ref=onurcan"
 
-def safe_select(element: BeautifulSoup, selectors: str) -> Optional[BeautifulSoup]:
-    for sel in selectors.split(","):
-        sel = sel.strip()
-        found = element.select_one(sel)
-        if found:
-            return found
-    return None
-
-def safe_select_all(element: BeautifulSoup, selectors: str) -> list:
-    for sel in selectors.split(","):
-        sel = sel.strip()
-        founds = element.select(sel)
-        if founds:
-            return list(founds)
+def safe_select(element, selectors: Union[str, CompiledSelector]):
+    """Virgüllü fallback seçicilerden ilk eşleşeni döner (parsing düğümü üzerinde)."""
+    if isinstance(selectors, str):
+        selectors = compile_selector(selectors)
+    return element.select_first(selectors)
+
+def safe_select_all(element, selectors: Union[str, CompiledSelector]) -> list:
+    if isinstance(selectors, str):
+        selectors = compile_selector(selectors)
+    return element.select_all(selectors)
+
+# ─────────────────────────── Regex Fallback ──────────────────────────
+# Desenler bir kez derlenir. İleri (1.250 TL) ve geri (₺1.250) biçimler tek alternation'da: sayfa bir kez taranır
+_FB_PRICE  = re.compile(r'\b([1-9][\d\.,]*)\s*(?:₺|TL|tl)\b|\b(?:₺|TL|tl)\s*([1-9][\d\.,]*)\b', re.IGNORECASE)
+_FB_SELLER = re.compile(r'(?:seller|store|magaza)[^>]*>([^<]+)<', re.IGNORECASE)
+_FB_IMG    = re.compile(r'<img[^>]+(?:data-src|data-original|src)=["\']([^"\']+)["\']', re.IGNORECASE)
+_FB_SRCSET = re.compile(r'<img[^>]+srcset=["\']([^"\',]+)', re.IGNORECASE)
+_FB_SELLER_LOOKBACK = 200    # Fiyattan geriye satıcı adı arama penceresi
+_FB_IMG_RADIUS      = 2500   # Fiyatın ± bu kadar karakter çevresindeki görseller aday
+_FB_MAX_RESULTS     = 3
+
+def _is_product_image(src: str) -> bool:
+    low = src.lower()
+    return ".svg" not in low and "icon" not in low and "logo" not in low and "base64" not in low and len(src) > 10
+
+class _ImageIndex:
+    """Sayfadaki <img> (src/data-src/srcset) konumlarının sıralı dizini; en yakın görsel ikili arama ile bulunur."""
+
+    def __init__(self, text: str):
+        found = [(m.start(), m.group(1)) for m in _FB_IMG.finditer(text)]
+        found += [(m.start(), m.group(1).split(' ')[0]) for m in _FB_SRCSET.finditer(text)]
+        found = sorted((pos, src) for pos, src in found if _is_product_image(src))
+        self.offsets = [pos for pos, _ in found]
+        self.srcs    = [src for _, src in found]
+
+    def nearest(self, start: int, end: int, radius: int = _FB_IMG_RADIUS) -> str:
+        i = bisect.bisect_left(self.offsets, start)
+        best, best_dist = "", radius + 1
+        # Fiyattan önceki en yakın görsel (i-1) ve fiyattan sonraki ilk görsel (i)
+        for j in (i - 1, i):
+            if 0 <= j < len(self.offsets):
+                pos = self.offsets[j]
+                dist = start - pos if pos < start else max(0, pos - end)
+                if dist < best_dist:
+                    best, best_dist = self.srcs[j], dist
+        if best.startswith('//'):
+            best = "https:" + best
+        return best
+
+def _regex_fallback(cfg: SiteConfig, text: str, url: str) -> list[SearchResult]:
+    """Selector/JSON boşa düştüğünde sayfadaki ₺/TL fiyatlarını tek geçişte toplar (en fazla 3).
+
+    İleri biçim (1.250 TL) bulunduğu sürece geri biçim (₺1.250) eşleşmeleri yedekte bekler ve
+    sadece sayfada hiç ileri biçim yoksa kullanılır. Görsel dizini ilk kabul edilen fiyatta kurulur.
+    """
+    forward: list[SearchResult] = []
+    reverse: list[SearchResult] = []
+    images: Optional[_ImageIndex] = None
+
+    for match in _FB_PRICE.finditer(text):
+        is_forward = match.group(1) is not None
+        bucket = forward if is_forward else reverse
+        if not is_forward and forward:
+            continue
+        if len(bucket) >= _FB_MAX_RESULTS:
+            if is_forward:
+                break           # 3 ileri biçim fiyat yeterli, sayfanın kalanını tarama
+            continue            # Geri biçim yedekte dolu; ileri biçim çıkar mı diye taramaya devam
+
+        clean_raw = (match.group(1) or match.group(2)).strip() + " ₺"
+        p_num = parse_price(clean_raw)
+        if not p_num or p_num <= 50:
+            continue
+
+        # Satıcı tahmini (Fiyatın geçtiği yerden geriye doğru 200 karakterde satıcı/dükkan adı ara)
+        seller_name = ""
+        seller_match = _FB_SELLER.search(text, max(0, match.start() - _FB_SELLER_LOOKBACK), match.start())
+        if seller_match:
+            seller_name = f" ({seller_match.group(1).strip()})"
+
+        # Resim tahmini: Fiyatın ±2500 karakter civarındaki en yakın <img>
+        if images is None:
+            images = _ImageIndex(text)
+        best_img = images.nearest(match.start(), match.end()) or PLACEHOLDER_IMAGE
+
+        part_title = f"{FALLBACK_TITLE}{seller_name}"
+        bucket.append(SearchResult(cfg.name, True, part_name=part_title, price_str=clean_raw, price_numeric=p_num, url=url, affiliate_url=generate_affiliate_url(url), image_url=best_img))
+
+    return forward or reverse
+
+# ─────────────────────────── Çıkarım Stratejileri ────────────────────
+class ExtractContext:
+    """Bir yanıt üzerinde çalışan stratejilerin ortak girdisi. HTML sadece ihtiyaç duyan ilk stratejide parse edilir."""
+    __slots__ = ("cfg", "response", "url", "domain", "timer", "_doc")
+
+    def __init__(self, cfg: SiteConfig, response: StreamedResponse, url: str, domain: str, timer: StageLaps):
+        self.cfg      = cfg
+        self.response = response
+        self.url      = url
+        self.domain   = domain
+        self.timer    = timer
+        self._doc     = None
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            stage = self.timer.current
+            self.timer.stage("parse")
+            self._doc = parse_html(self.response.text)
+            self.timer.stage(stage)
+        return self._doc
+
+# strateji adı -> fn(ctx) -> list[SearchResult]  (boş liste: bu sayfada sonuç çıkmadı, sıradakine geç)
+EXTRACTORS: dict[str, Callable[[ExtractContext], list[SearchResult]]] = {}
+
+def register_extractor(name: str):
+    """Yeni bir çıkarım stratejisi kaydeder; SiteConfig.extractors içinde bu adla kullanılır."""
+    def deco(fn):
+        EXTRACTORS[name] = fn
+        return fn
+    return deco
+
+@register_extractor("ldjson")
+def _extract_ldjson(ctx: ExtractContext) -> list[SearchResult]:
+    # ── JSON LD+JSON Schema Extract (Çoklu ürün listesi için N11/HB Taraması) ──
+    cfg, url = ctx.cfg, ctx.url
+    schema_results = []
+    for script_text in ctx.doc.scripts('application/ld+json'):
+        if script_text:
+            try:
+                data = json.loads(script_text)
+                # N11 itemListElement array
+                if isinstance(data, dict) and data.get('@type') == 'ItemList' and 'itemListElement' in data:
+                    for idx, el in enumerate(data['itemListElement']):
+                        if isinstance(el, dict) and 'url' in el:
+                            item = el.get('item', {}) if 'item' in el else el
+                            name = item.get('name', 'Ürün İsimsiz')
+                            price = None
+                            image_url = ""
+                            offers = item.get('offers', {})
+                            if isinstance(offers, dict): price = offers.get('price')
+                            elif isinstance(offers, list) and offers: price = offers[0].get('price')
+                            
+                            img_data = item.get('image', '')
+                            if isinstance(img_data, str) and img_data: image_url = img_data
+                            elif isinstance(img_data, list) and img_data:
+                                image_url = img_data[0] if isinstance(img_data[0], str) else img_data[0].get('url', '')
+                            elif isinstance(img_data, dict): image_url = img_data.get('url', '')
+
+                            if not image_url:
+                                image_url = PLACEHOLDER_IMAGE
+
+                            if price:
+                                s_price_str = f"{price} ₺"
+                                schema_results.append(SearchResult(cfg.name, True, part_name=name, price_str=s_price_str, price_numeric=parse_price(s_price_str), url=item.get('url', url), affiliate_url=generate_affiliate_url(item.get('url', url)), image_url=image_url))
+                        if len(schema_results) >= 3: break
+            except Exception: pass
+    if schema_results:
+        # Price Sanity Check (> 50 TL)
+        valid_results = [r for r in schema_results if r.part_name and r.part_name != "Ürün İsimsiz" and r.price_numeric and r.price_numeric > 50]
+        if valid_results:
+            return valid_results
+        print(f"[{cfg.name}] UYARI: Hiçbir schema ürünü 50 TL barajını geçemedi veya isimsiz.")
     return []
 
+_NEXT_DATA_PATTERN = re.compile(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', re.DOTALL)
+
+@register_extractor("next_data")
+def _extract_next_data(ctx: ExtractContext) -> list[SearchResult]:
+    # ── Hepsiburada __NEXT_DATA__ Extract (HTML parse etmeden, düz metin üzerinde) ──
+    cfg, url = ctx.cfg, ctx.url
+    next_data_m = _NEXT_DATA_PATTERN.search(ctx.response.text)
+    if not next_data_m:
+        return []
+    try:
+        next_data = json.loads(next_data_m.group(1))
+        # Try to find product list in various possible NEXT_DATA paths
+        products_src = next_data.get('props', {}).get('pageProps', {}).get('productModel', {}).get('productList', []) or \
+                       next_data.get('props', {}).get('pageProps', {}).get('listing', {}).get('data', {}).get('products', [])
+        
+        hb_results = []
+        for p in products_src[:5]:
+            name = p.get('name') or p.get('title')
+            price_data = p.get('price', {})
+            price_val = price_data.get('value') if isinstance(price_data, dict) else (p.get('currentPrice') or price_data)
+            
+            if name and price_val:
+                try:
+                    p_num = float(str(price_val).replace(',', '.'))
+                    if p_num > 50:
+                        p_str = f"{p_num} ₺"
+                        p_url = p.get('url', '')
+                        if p_url and not p_url.startswith('http'):
+                            p_url = "https://www.hepsiburada.com" + p_url
+                        
+                        img_url = ""
+                        img_list = p.get('imageUrls') or p.get('images', [])
+                        if img_list and isinstance(img_list, list):
+                            img_url = img_list[0].get('url', '') if isinstance(img_list[0], dict) else img_list[0]
+                        elif p.get('image'): 
+                            img_url = str(p.get('image'))
+                            
+                        if not img_url:
+                            img_url = PLACEHOLDER_IMAGE
+
+                        hb_results.append(SearchResult(cfg.name, True, part_name=name, price_str=p_str, price_numeric=p_num, url=p_url or url, affiliate_url=generate_affiliate_url(p_url or url), image_url=img_url))
+                except: continue
+        return hb_results[:3]
+    except Exception as e:
+        print(f"[{cfg.name}] NEXT_DATA Parse Hatası: {e}")
+        return []
+
+@register_extractor("json_api")
+def _extract_json_api(ctx: ExtractContext) -> list[SearchResult]:
+    # ── Sahibinden Mobile JSON Parse ──
+    cfg, response = ctx.cfg, ctx.response
+    if 'application/json' not in response.headers.get('content-type', ''):
+        return []
+    try:
+        data = response.json()
+        classifieds = data.get('classifieds', [])
+        shb_results = []
+        for cl in classifieds[:5]:
+            title = cl.get('title')
+            price_str = cl.get('price') # Örn: "1.200 TL"
+            price_num = parse_price(price_str)
+            if title and price_num and price_num > 50:
+                cl_url = f"https://www.sahibinden.com{cl.get('url')}"
+                img_url = cl.get('thumbnailUrl', '') or cl.get('thumbnailUrl1', '')
+                if not img_url:
+                    img_url = PLACEHOLDER_IMAGE
+                shb_results.append(SearchResult(cfg.name, True, part_name=title, price_str=price_str, price_numeric=price_num, url=cl_url, affiliate_url=generate_affiliate_url(cl_url), image_url=img_url))
+        return shb_results[:3]
+    except: return []
+
+@register_extractor("cards")
+def _extract_cards(ctx: ExtractContext) -> list[SearchResult]:
+    cfg, url, domain = ctx.cfg, ctx.url, ctx.domain
+    items = safe_select_all(ctx.doc, cfg.result_item_css)
+    if not items:
+        print(f"[{cfg.name}] UYARI: Ürün kartı (item) bulunamadı. Denediğim selectorlar: '{cfg.result_item_sel}'")
+        return []
+
+    results_list = []
+    for item in items[:3]: # En fazla 3 ürün gösterelim
+        title_el = safe_select(item, cfg.title_css)
+        price_el = safe_select(item, cfg.price_css)
+
+        if not title_el or not price_el:
+            continue
+
+        part_name_raw = title_el.text()
+        price_raw = price_el.text()
+        price_num = parse_price(price_raw)
+        
+        # URL'yi çıkar (HREF)
+        relative_url = title_el.attr("href") if title_el.tag == "a" else ""
+        parent_el = title_el.parent
+        if not relative_url and parent_el and parent_el.tag == "a":
+            relative_url = parent_el.attr("href")
+            
+        full_url = relative_url
+        if relative_url.startswith("/"):
+            full_url = f"{domain}{relative_url}"
+            full_url = url
+
+        image_url = ""
+        if cfg.image_sel:
+            img_el = safe_select(item, cfg.image_css)
+            if img_el:
+                image_url = img_el.attr('data-original') or img_el.attr('data-src') or img_el.attr('data-image') or img_el.attr('src') or ""
+                
+                if not image_url and img_el.attr('srcset'):
+                    image_url = img_el.attr('srcset').split(',')[0].strip().split(' ')[0]
+                    
+                if image_url and image_url.startswith('//'):
+                    image_url = "https:" + image_url
+        
+        # Eğer ürün görseli yerine icon/SVG gibi arayüz ögeleri gelirse bunları engelle
+        if image_url and (image_url.lower().endswith('.svg') or "icon" in image_url.lower()):
+            image_url = ""
+
+        if not image_url:
+            image_url = PLACEHOLDER_IMAGE
+
+        results_list.append(SearchResult(
+            site_name     = cfg.name,
+            success       = True,
+            part_name     = part_name_raw,
+            price_str     = price_raw,
+            price_numeric = price_num,
+            url           = full_url,
+            affiliate_url = generate_affiliate_url(full_url),
+            image_url     = image_url
+        ))
+
+    # Filter out junk results (Price sanity check > 50 TL and named items)
+    results_list = [r for r in results_list if r.price_numeric and r.price_numeric > 50 and r.part_name and r.part_name != "Ürün İsimsiz"]
+    if not results_list:
+        hatali_selector = cfg.title_sel + " / " + cfg.price_sel
+        print(f"[{cfg.name}] HATA: Kartlar bulundu ancak içlerinde element eşleşmedi veya kriter uymadı. Selector: '{hatali_selector}'")
+    return results_list
+
+@register_extractor("regex_fallback")
+def _extract_regex(ctx: ExtractContext) -> list[SearchResult]:
+    # Kapsamlı (Çoklu) Regex Fallback (₺ ve TL Taraması + Satıcı Tahmini)
+    found_res = _regex_fallback(ctx.cfg, ctx.response.text, ctx.url)
+    if found_res:
+        print(f"[{ctx.cfg.name}] UYARI: Diğer stratejiler boşa düştü ama Regex Fallback çalıştı!")
+    return found_res
+
+_SITES_BY_NAME: dict[str, SiteConfig] = {}
+
+def _extract_job(job: tuple) -> tuple[list[SearchResult], Optional[str], list[str], dict[str, float]]:
+    """Ayrıştırma işçisinde çalışır: ham gövdeden stratejileri verilen sırayla sonuç çıkana kadar dener.
+
+    Girdi/çıktı pickle edilebilir (process havuzu): (site, url, domain, content-type, gövde, charset, sıra)
+    → (sonuçlar, kazanan strateji, boş dönenler, aşama süreleri).
+    """
+    site, url, domain, content_type, body, charset, order = job
+    if not _SITES_BY_NAME:
+        _SITES_BY_NAME.update((c.name, c) for c in SITES)
+    cfg = _SITES_BY_NAME[site]
+    laps = StageLaps()
+    response = StreamedResponse(200, {"content-type": content_type}, body, charset, False, len(body))
+    ctx = ExtractContext(cfg, response, url, domain, laps)
+    missed = []
+    for name in order:
+        laps.stage(name)
+        found = EXTRACTORS[name](ctx)
+        if found:
+            return found, name, missed, laps.close()
+        missed.append(name)
+    return [SearchResult(cfg.name, False, error_msg="Fiyat Ayıklanamadı")], None, missed, laps.close()
+
+async def _extract(cfg: SiteConfig, response: StreamedResponse, url: str, domain: str, timer: StageTimer,
+                   planner: Optional[StrategyPlanner], parse_pool: Optional[ParsePool]) -> list[SearchResult]:
+    """Sitenin stratejilerini (öğrenilmiş sırayla) ayrıştırma havuzunda dener; öğrenme ana süreçte kalır."""
+    order = planner.order(cfg.name, cfg.extractors) if planner else list(cfg.extractors)
+    job = (cfg.name, url, domain, response.headers.get("content-type", "") or "", response.body, response.charset, order)
+    timer.close()
+    started = time.perf_counter()
+    if parse_pool is None:
+        found, winner, missed, laps = _extract_job(job)
+    else:
+        found, winner, missed, laps = await parse_pool.run(_extract_job, job)
+    if parse_pool is not None and parse_pool.mode != "inline":
+        # İşçide geçmeyen süre: kuyrukta bekleme + gidiş/dönüş
+        timer.add("parse_queue", max(0.0, time.perf_counter() - started - sum(laps.values())))
+    for stage, seconds in laps.items():
+        timer.add(stage, seconds)
+    if planner:
+        planner.record(cfg.name, winner, missed)
+    return found
+
 # ─────────────────────────── Proxy Listesi ───────────────────────────
+# Katman 3 uç noktası (benchmark'ta yerel taklit sunucuya yönlendirilir)
+SCRAPERAPI_URL = os.environ.get("PP_SCRAPERAPI_URL", "http://api.scraperapi.com")
+SCRAPERAPI_KEY = os.environ.get("SCRAPERAPI_KEY", "b33dummy123")   # Örnek / Env'den gelir
+
 PROXIES = [
     # "http://username:password@ip:port",
     # "http://username:password@ip:port",
 ]
 
 # ─────────────────────────── Scraper Motoru ──────────────────────────
-async def _scrape_one(cfg: SiteConfig, query: str, dyn_headers: dict, use_httpx: bool = False, use_scraperapi: bool = False) -> list[SearchResult]:
-    import random
-    import httpx
-    
+async def _fetch(client, url: str, cfg: SiteConfig, headers: Optional[dict], timeout: float, curl: bool = False, error_body: bool = False):
+    """GET isteği; gövde parça parça okunur ve yeterli ürün kartı / bayt bütçesi dolunca bağlantı kapatılır.
+
+    Hata durumlarında (>= 400) gövde okunmaz; `error_body` verilirse (yanıt kaydı açık) engel sayfası
+    `cfg.max_bytes`'a kadar okunur.
+    """
+    if not STREAM_ENABLED:
+        resp = await client.get(url, headers=headers, timeout=timeout)
+        # Başlıkta ve <meta>'da charset yoksa istemcinin tahmini (curl_cffi içerikten tespit eder)
+        charset = charset_of(resp.headers, resp.content, getattr(resp, "encoding", None))
+        return StreamedResponse(resp.status_code, resp.headers, resp.content, charset, False, len(resp.content))
+
+    async with client.stream("GET", url, headers=headers, timeout=timeout) as resp:
+        chunks = resp.aiter_content() if curl else resp.aiter_bytes()
+        if resp.status_code >= 400:
+            if not error_body:
+                return StreamedResponse(resp.status_code, resp.headers, b"", "utf-8", False, 0)
+            body, truncated, read = await read_limited(chunks, header_charset(resp.headers), cfg.max_bytes, [], 0)
+            return StreamedResponse(resp.status_code, resp.headers, body, charset_of(resp.headers, body), truncated, read)
+        body, truncated, read = await read_limited(chunks, header_charset(resp.headers), cfg.max_bytes, cfg.item_matchers, cfg.stream_items)
+        # Context'ten çıkınca okunmamış gövde atılır ve bağlantı kapanır
+        return StreamedResponse(resp.status_code, resp.headers, body, charset_of(resp.headers, body), truncated, read)
+
+async def _scrape_one(cfg: SiteConfig, query: str, dyn_headers: dict, pool: SessionPool, use_httpx: bool = False, use_scraperapi: bool = False, timeout: float = 8.0, planner: Optional[StrategyPlanner] = None, parse_pool: Optional[ParsePool] = None, capture: Optional[CaptureStore] = None) -> list[SearchResult]:
     safe_query = urllib.parse.quote(query.strip())
     url = cfg.base_search_url.replace("{query}", safe_query)
+    domain = base_domain(cfg.base_search_url)
+    layer = "scraperapi" if use_scraperapi else "httpx" if use_httpx else "curl_cffi"
+    timer = StageTimer(cfg.name, layer)
     try:
-        # Anti-Bot: Rastgele gecikme (Jitter) ekleyelim (0.2s - 1.5s arası)
-        jitter = random.uniform(0.2, 1.5)
-        await asyncio.sleep(jitter)
+        if not use_scraperapi:
+            # Anti-Bot: sabit jitter yerine domain başına token bucket; boştaki domain'e istek hemen çıkar,
+            # jitter sadece domain sıcakken eklenir (ScraperAPI kendi proxy'leriyle gider, bütçeyi yemesin)
+            timer.stage("rate_limit")
+            await pool.limiter.acquire(domain)
         
         # ── JSON Gizli API (Internal API) Fallback (n11 ve HB) ──
         if cfg.name in ["n11", "Hepsiburada"]:
@@ -168,32 +618,27 @@ async def _scrape_one(cfg: SiteConfig, query: str, dyn_headers: dict, use_httpx:
             dyn_headers["Accept"] = "application/json"
             dyn_headers["X-Requested-With"] = "XMLHttpRequest"
            
+        # Bağlantılar engine'in havuzundan gelir (keep-alive + HTTP/2), her aramada TLS el sıkışması yok
+        timer.stage("fetch")
         if use_scraperapi:
-            import os
-            scraper_key = os.environ.get("SCRAPERAPI_KEY", "b33dummy123") # Örnek / Env'den gelir
-            api_url = f"http://api.scraperapi.com?api_key={scraper_key}&url={urllib.parse.quote(url)}&country_code=tr"
-            async with httpx.AsyncClient(timeout=8.0) as client:
-                response = await client.get(api_url)
+            api_url = f"{SCRAPERAPI_URL}?api_key={SCRAPERAPI_KEY}&url={urllib.parse.quote(url)}&country_code=tr"
+            response = await _fetch(pool.scraperapi_client(), api_url, cfg, None, timeout, error_body=capture is not None)
         elif use_httpx:
-            async with httpx.AsyncClient(http2=True, verify=False, timeout=8.0) as client:
-                response = await client.get(url, headers=dyn_headers)
+            await pool.load_cookies(domain)
+            response = await _fetch(pool.httpx_client(domain), url, cfg, dyn_headers, timeout, error_body=capture is not None)
         else:
-            from curl_cffi.requests import AsyncSession
-            # Chrome impersonation for stealth
-            async with AsyncSession(impersonate="chrome120", headers=dyn_headers, verify=False) as client:
-                # ── Session & Cookie Persistence (Pre-flight) ──
-                # Arama yapmadan önce sitenin ana sayfasına bir ön istek atarak cf_clearance ve session_id gibi çerezleri topla
-                from urllib.parse import urlparse
-                base_domain = f"{urlparse(cfg.base_search_url).scheme}://{urlparse(cfg.base_search_url).netloc}"
-                
-                try:
-                    await client.get(base_domain, timeout=8)
-                    await asyncio.sleep(0.5) # Çerezleri sindirmesi için kısa bir bekleme (Vercel zamanıyla uyumlu)
-                except Exception as e:
-                    pass
-                
-                # Çerezlerle birlikte asıl arama isteğini at
-                response = await client.get(url, timeout=8)
+            # ── Session & Cookie Persistence (Pre-flight) ──
+            # cf_clearance ve session_id gibi çerezler domain bazında saklanır; sadece süreleri dolunca ana sayfaya ön istek atılır
+            timer.stage("preflight")
+            await pool.ensure_preflight(domain, dyn_headers, timeout)
+            
+            # Çerezlerle birlikte asıl arama isteğini at
+            timer.stage("fetch")
+            response = await _fetch(pool.curl_session(domain), url, cfg, dyn_headers, timeout, curl=True, error_body=capture is not None)
+
+        if capture is not None:
+            # Ham yanıt (engel sayfaları dahil) çevrimdışı yeniden ayrıştırma için kayda; yazma arka planda
+            capture.record(cfg.name, query, normalize_query(query), url, layer, response)
         
         if response.status_code >= 400:
             if response.status_code in [403, 429, 503]:
@@ -201,260 +646,11 @@ async def _scrape_one(cfg: SiteConfig, query: str, dyn_headers: dict, use_httpx:
                 return [SearchResult(cfg.name, False, error_msg="Erişim Engellendi (Koruma)")]
             return [SearchResult(cfg.name, False, error_msg="Site Koruma Altında")]
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        items = safe_select_all(soup, cfg.result_item_sel)
-        
-        # ── JSON LD+JSON Schema Extract (Çoklu ürün listesi için N11/HB Taraması) ──
-        schema_results = []
-        import json
-        for script in soup.find_all('script', type='application/ld+json'):
-            if script.string:
-                try:
-                    data = json.loads(script.string)
-                    # N11 itemListElement array
-                    if isinstance(data, dict) and data.get('@type') == 'ItemList' and 'itemListElement' in data:
-                        for idx, el in enumerate(data['itemListElement']):
-                            if isinstance(el, dict) and 'url' in el:
-                                item = el.get('item', {}) if 'item' in el else el
-                                name = item.get('name', 'Ürün İsimsiz')
-                                price = None
-                                image_url = ""
-                                offers = item.get('offers', {})
-                                if isinstance(offers, dict): price = offers.get('price')
-                                elif isinstance(offers, list) and offers: price = offers[0].get('price')
-                                
-                                img_data = item.get('image', '')
-                                if isinstance(img_data, str) and img_data: image_url = img_data
-                                elif isinstance(img_data, list) and img_data:
-                                    image_url = img_data[0] if isinstance(img_data[0], str) else img_data[0].get('url', '')
-                                elif isinstance(img_data, dict): image_url = img_data.get('url', '')
-
-                                if not image_url:
-                                    image_url = "https://via.placeholder.com/150/1E1E1E/FFB300?text=Gorsel+Yok"
-
-                                if price:
-                                    s_price_str = f"{price} ₺"
-                                    schema_results.append(SearchResult(cfg.name, True, part_name=name, price_str=s_price_str, price_numeric=parse_price(s_price_str), url=item.get('url', url), affiliate_url=generate_affiliate_url(item.get('url', url)), image_url=image_url))
-                            if len(schema_results) >= 3: break
-                except Exception: pass
-        if schema_results:
-            # Price Sanity Check (> 50 TL)
-            valid_results = [r for r in schema_results if r.part_name and r.part_name != "Ürün İsimsiz" and r.price_numeric and r.price_numeric > 50]
-            if valid_results:
-                return valid_results
-            else:
-                print(f"[{cfg.name}] UYARI: Hiçbir schema ürünü 50 TL barajını geçemedi veya isimsiz.")
-
-        # ── Hepsiburada __NEXT_DATA__ Extract ──
-        if cfg.name == "Hepsiburada":
-            next_data_m = re.search(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', response.text, re.DOTALL)
-            if next_data_m:
-                try:
-                    next_data = json.loads(next_data_m.group(1))
-                    # Try to find product list in various possible NEXT_DATA paths
-                    products_src = next_data.get('props', {}).get('pageProps', {}).get('productModel', {}).get('productList', []) or \
-                                   next_data.get('props', {}).get('pageProps', {}).get('listing', {}).get('data', {}).get('products', [])
-                    
-                    hb_results = []
-                    for p in products_src[:5]:
-                        name = p.get('name') or p.get('title')
-                        price_data = p.get('price', {})
-                        price_val = price_data.get('value') if isinstance(price_data, dict) else (p.get('currentPrice') or price_data)
-                        
-                        if name and price_val:
-                            try:
-                                p_num = float(str(price_val).replace(',', '.'))
-                                if p_num > 50:
-                                    p_str = f"{p_num} ₺"
-                                    p_url = p.get('url', '')
-                                    if p_url and not p_url.startswith('http'):
-                                        p_url = "https://www.hepsiburada.com" + p_url
-                                    
-                                    img_url = ""
-                                    img_list = p.get('imageUrls') or p.get('images', [])
-                                    if img_list and isinstance(img_list, list):
-                                        img_url = img_list[0].get('url', '') if isinstance(img_list[0], dict) else img_list[0]
-                                    elif p.get('image'): 
-                                        img_url = str(p.get('image'))
-                                        
-                                    if not img_url:
-                                        img_url = "https://via.placeholder.com/150/1E1E1E/FFB300?text=Gorsel+Yok"
-
-                                    hb_results.append(SearchResult(cfg.name, True, part_name=name, price_str=p_str, price_numeric=p_num, url=p_url or url, affiliate_url=generate_affiliate_url(p_url or url), image_url=img_url))
-                            except: continue
-                    if hb_results:
-                        return hb_results[:3]
-                except Exception as e:
-                    print(f"[{cfg.name}] NEXT_DATA Parse Hatası: {e}")
-
-        # ── Sahibinden Mobile JSON Parse ──
-        if cfg.name == "Sahibinden" and 'application/json' in response.headers.get('content-type', ''):
-            try:
-                data = response.json()
-                classifieds = data.get('classifieds', [])
-                shb_results = []
-                for cl in classifieds[:5]:
-                    title = cl.get('title')
-                    price_str = cl.get('price') # Örn: "1.200 TL"
-                    price_num = parse_price(price_str)
-                    if title and price_num and price_num > 50:
-                        cl_url = f"https://www.sahibinden.com{cl.get('url')}"
-                        img_url = cl.get('thumbnailUrl', '') or cl.get('thumbnailUrl1', '')
-                        if not img_url:
-                            img_url = "https://via.placeholder.com/150/1E1E1E/FFB300?text=Gorsel+Yok"
-                        shb_results.append(SearchResult(cfg.name, True, part_name=title, price_str=price_str, price_numeric=price_num, url=cl_url, affiliate_url=generate_affiliate_url(cl_url), image_url=img_url))
-                if shb_results:
-                    return shb_results[:3]
-            except: pass
-
-        if not items:
-            print(f"[{cfg.name}] UYARI: Ürün kartı (item) bulunamadı. Denediğim selectorlar: '{cfg.result_item_sel}'")
-            
-            # Kapsamlı (Çoklu) Regex Fallback (₺ ve TL Taraması + Satıcı Tahmini)
-            import re
-            m = re.finditer(r'\b([1-9][\d\.,]*)\s*(?:₺|TL|tl)\b', response.text, re.IGNORECASE)
-            matches = list(m)
-            if not matches:
-                m = re.finditer(r'\b(?:₺|TL|tl)\s*([1-9][\d\.,]*)\b', response.text, re.IGNORECASE)
-                matches = list(m)
-            
-            if matches:
-                print(f"[{cfg.name}] UYARI: Tüm Selector/JSON boşa düştü ama Regex Fallback çalıştı!")
-                found_res = []
-                for match in matches:
-                    price_raw = match.group(1)
-                    clean_raw = str(price_raw).strip() + " ₺"
-                    p_num = parse_price(clean_raw)
-                    if p_num and p_num > 50:
-                        # Satıcı tahmini (Fiyatın geçtiği yerden geriye doğru 200 karakterde satıcı/dükkan adı ara)
-                        start_idx = max(0, match.start() - 200)
-                        context = response.text[start_idx:match.start()]
-                        seller_name = ""
-                        # Basit bir satıcı class/title varsayımı
-                        seller_match = re.search(r'(?:seller|store|magaza)[^>]*>([^<]+)<', context, re.IGNORECASE)
-                        if seller_match:
-                            seller_name = f" ({seller_match.group(1).strip()})"
-                        
-                        part_title = f"Hassas Fiyat Yakalama{seller_name}"
-                        found_res.append(SearchResult(cfg.name, True, part_name=part_title, price_str=clean_raw, price_numeric=p_num, url=url, affiliate_url=generate_affiliate_url(url)))
-                    if len(found_res) >= 3: break
-                if found_res: return found_res
-            return [SearchResult(cfg.name, False, error_msg="Fiyat Ayıklanamadı")]
-
-        results_list = []
-        for item in items[:3]: # En fazla 3 ürün gösterelim
-            title_el = safe_select(item, cfg.title_sel)
-            price_el = safe_select(item, cfg.price_sel)
-
-            if not title_el or not price_el:
-                continue
-
-            part_name_raw = title_el.get_text(strip=True)
-            price_raw = price_el.get_text(strip=True)
-            price_num = parse_price(price_raw)
-            
-            # URL'yi çıkar (HREF)
-            relative_url = title_el.get("href", "") if title_el.name == "a" else ""
-            if not relative_url and title_el.parent and title_el.parent.name == "a":
-                relative_url = title_el.parent.get("href", "")
-                
-            full_url = relative_url
-            if relative_url.startswith("/"):
-                from urllib.parse import urlparse
-                parsed_base = urlparse(cfg.base_search_url)
-                full_url = f"{parsed_base.scheme}://{parsed_base.netloc}{relative_url}"
-                full_url = url
-
-            image_url = ""
-            if cfg.image_sel:
-                img_el = safe_select(item, cfg.image_sel)
-                if img_el:
-                    image_url = img_el.get('data-original') or img_el.get('data-src') or img_el.get('data-image') or img_el.get('src') or ""
-                    
-                    if not image_url and img_el.get('srcset'):
-                        image_url = img_el.get('srcset').split(',')[0].strip().split(' ')[0]
-                        
-                    if image_url and image_url.startswith('//'):
-                        image_url = "https:" + image_url
-            
-            # Eğer ürün görseli yerine icon/SVG gibi arayüz ögeleri gelirse bunları engelle
-            if image_url and (image_url.lower().endswith('.svg') or "icon" in image_url.lower()):
-                image_url = ""
-
-            if not image_url:
-                image_url = "https://via.placeholder.com/150/1E1E1E/FFB300?text=Gorsel+Yok"
-
-            results_list.append(SearchResult(
-                site_name     = cfg.name,
-                success       = True,
-                part_name     = part_name_raw,
-                price_str     = price_raw,
-                price_numeric = price_num,
-                url           = full_url,
-                affiliate_url = generate_affiliate_url(full_url),
-                image_url     = image_url
-            ))
-
-        # Filter out junk results (Price sanity check > 50 TL and named items)
-        results_list = [r for r in results_list if r.price_numeric and r.price_numeric > 50 and r.part_name and r.part_name != "Ürün İsimsiz"]
-
-        if not results_list:
-            hatali_selector = cfg.title_sel + " / " + cfg.price_sel
-            print(f"[{cfg.name}] HATA: Kartlar bulundu ancak içlerinde element eşleşmedi veya kriter uymadı. Selector: '{hatali_selector}'")
-            
-            # Kapsamlı (Çoklu) Regex Fallback (₺ ve TL Taraması + Satıcı Tahmini)
-            import re
-            m = re.finditer(r'\b([1-9][\d\.,]*)\s*(?:₺|TL|tl)\b', response.text, re.IGNORECASE)
-            matches = list(m)
-            if not matches:
-                m = re.finditer(r'\b(?:₺|TL|tl)\s*([1-9][\d\.,]*)\b', response.text, re.IGNORECASE)
-                matches = list(m)
-            
-            if matches:
-                print(f"[{cfg.name}] UYARI: Kart Parse boşa düştü ama Regex Fallback çalıştı!")
-                found_res = []
-                for match in matches:
-                    price_raw = match.group(1)
-                    clean_raw = str(price_raw).strip() + " ₺"
-                    p_num = parse_price(clean_raw)
-                    if p_num and p_num > 50:
-                        # Satıcı tahmini (Fiyatın geçtiği yerden geriye doğru 200 karakterde satıcı/dükkan adı ara)
-                        start_idx = max(0, match.start() - 200)
-                        context = response.text[start_idx:match.start()]
-                        seller_name = ""
-                        # Basit bir satıcı class/title varsayımı
-                        seller_match = re.search(r'(?:seller|store|magaza)[^>]*>([^<]+)<', context, re.IGNORECASE)
-                        if seller_match:
-                            seller_name = f" ({seller_match.group(1).strip()})"
-                            
-                        # Resim tahmini: Fiyatın ±2500 karakter civarındaki <img> etiketlerini kontrol et
-                        img_start = max(0, match.start() - 2500)
-                        img_end = min(len(response.text), match.end() + 2500)
-                        img_context = response.text[img_start:img_end]
-                        img_matches = re.findall(r'<img[^>]+(?:data-src|data-original|src)=["\']([^"\']+)["\']', img_context, re.I)
-                        
-                        # Ayrıca srcset içinde arama (örneğin N11 src kullanmayabiliyor)
-                        srcset_matches = re.findall(r'<img[^>]+srcset=["\']([^"\',]+)', img_context, re.I)
-                        img_matches.extend([s.split(' ')[0] for s in srcset_matches])
-                        
-                        best_img = ""
-                        for im in img_matches:
-                            if ".svg" not in im.lower() and "icon" not in im.lower() and "logo" not in im.lower() and "base64" not in im.lower() and len(im) > 10:
-                                best_img = im
-                                if best_img.startswith('//'): best_img = "https:" + best_img
-                                break
-                        if not best_img:
-                            best_img = "https://via.placeholder.com/150/1E1E1E/FFB300?text=Gorsel+Yok"
-                        
-                        part_title = f"Hassas Fiyat Yakalama{seller_name}"
-                        found_res.append(SearchResult(cfg.name, True, part_name=part_title, price_str=clean_raw, price_numeric=p_num, url=url, affiliate_url=generate_affiliate_url(url), image_url=best_img))
-                    if len(found_res) >= 3: break
-                if found_res: return found_res
-            return [SearchResult(cfg.name, False, error_msg="Fiyat Ayıklanamadı")]
-
-        return results_list
+        # CPU ağırlıklı çıkarım event loop dışında: ham gövde işçiye gider, kompakt sonuç döner
+        return await _extract(cfg, response, url, domain, timer, planner, parse_pool)
 
+    except ParseBacklogError:
+        return [SearchResult(cfg.name, False, error_msg=PARSE_BACKLOG_ERROR)]
     except asyncio.TimeoutError:
         return [SearchResult(cfg.name, False, error_msg="Zaman aşımı (Vercel 10s Tavanı)")]
     except Exception as exc:
@@ -462,63 +658,168 @@ async def _scrape_one(cfg: SiteConfig, query: str, dyn_headers: dict, use_httpx:
         if "timeout" in err_msg.lower():
             return [SearchResult(cfg.name, False, error_msg="Zaman aşımı (Vercel 10s Tavanı)")]
         return [SearchResult(cfg.name, False, error_msg="Fiyat Alınamadı veya Engellendi")]
+    finally:
+        timer.close()
 
-async def _scrape_one_with_limit(cfg: SiteConfig, query: str, dyn_headers: dict) -> list[SearchResult]:
-    import random
-    import asyncio
-    
-    # Target (Site) Spesifik Bekleme Süreleri Optimization (Kısaltıldı)
-    delay = random.uniform(0.2, 0.5)
-    await asyncio.sleep(delay)
-    
-    # Her bir görevin (task) kendi izole headers'ı olması lazım, yarış durumu (race condition) olmasın
-    isolated_headers = dyn_headers.copy()
-    
-    # Sadece 1 kez Katman 1'i dene, Vercel'de çok fazla denemeye vaktimiz yok!
-    if CURL_CFFI_AVAILABLE:
-        try:
-            res = await _scrape_one(cfg, query, isolated_headers, use_httpx=False)
-            for r in res: r.engine = "Stealth (curl_cffi)"
+# Aşırı yükte ayrıştırma kuyruğuna giremeyen tarama: başka katman da aynı kuyruğa düşer, önbelleğe de yazılmaz
+PARSE_BACKLOG_ERROR = "Sunucu Yoğun (Ayrıştırma Kuyruğu Dolu)"
+# Kabul kontrolünün canlı taramaya almadığı ve önbellekte/indekste de karşılığı olmayan site
+OVERLOAD_ERROR = "Sunucu Yoğun (Tekrar Deneyin)"
+
+# Bu hatalar katmana özgüdür (engel/zaman aşımı); başka bir katman deneyince düzelebilir
+_RETRYABLE_ERRORS = {
+    "Erişim Engellendi (Koruma)",
+    "Site Koruma Altında",
+    "Zaman aşımı (Vercel 10s Tavanı)",
+    "Fiyat Alınamadı veya Engellendi",
+    PARSE_BACKLOG_ERROR,   # Kuyruk sonraki katman dönene kadar boşalabilir; sonuç değil, katman kazancı da değil
+}
+
+def _is_final(results: list[SearchResult]) -> bool:
+    """Sonuç kullanılabilir mi (başarılı ya da sayfa geldi ama fiyat yok gibi katmandan bağımsız bir hata)?"""
+    return any(r.success or r.error_msg not in _RETRYABLE_ERRORS for r in results)
+
+def _is_local_overload(results: list[SearchResult]) -> bool:
+    """Katman sayfayı getirdi ama ayrıştırma kuyruğu doluydu: site/katman sağlığına yazılmaz."""
+    return bool(results) and all(r.error_msg == PARSE_BACKLOG_ERROR for r in results)
+
+# Tüm site aramasının sığması gereken toplam bütçe (Vercel 10s tavanının altında)
+SEARCH_BUDGET_S = float(os.environ.get("PP_SEARCH_BUDGET_S", "9.0"))
+
+async def _scrape_one_with_limit(cfg: SiteConfig, query: str, dyn_headers: dict, pool: SessionPool, sched: HedgedScheduler, deadline: Optional[float] = None, planner: Optional[StrategyPlanner] = None, parse_pool: Optional[ParsePool] = None, capture: Optional[CaptureStore] = None) -> list[SearchResult]:
+    loop = asyncio.get_running_loop()
+    if deadline is None:
+        deadline = loop.time() + SEARCH_BUDGET_S
+
+    site_started = time.perf_counter()
+    # Domain başına bekleme artık _scrape_one içindeki hız sınırlayıcıda (pool.limiter)
+
+    def _layer(engine_name: str, **flags):
+        async def run(remaining: float) -> list[SearchResult]:
+            # Her katmanın kendi izole headers'ı olması lazım, hedge'li paralel isteklerde yarış durumu (race condition) olmasın
+            timeout = max(0.5, min(remaining, cfg.timeout_ms / 1000))
+            res = await _scrape_one(cfg, query, dyn_headers.copy(), pool, timeout=timeout, planner=planner, parse_pool=parse_pool, capture=capture, **flags)
+            for r in res: r.engine = engine_name
             return res
-        except Exception as e:
-            pass # Katman 2'ye atla
+        return (engine_name, run)
 
-    # Hızlı Katman 2 (HTTPX HTTP/2 Fallback)
-    try:
-        res2 = await _scrape_one(cfg, query, isolated_headers, use_httpx=True)
-        for r in res2: r.engine = "Stealth (httpx)"
-        return res2
-    except Exception as fallback_err:
-        pass
-        
-    # Sona kalan Katman 3 (ScraperAPI Kriz Motoru)
-    try:
-        res3 = await _scrape_one(cfg, query, isolated_headers, use_scraperapi=True)
-        for r in res3: r.engine = "ScraperAPI"
-        return res3
-    except Exception as api_err:
-        return [SearchResult(cfg.name, False, error_msg="Sürekli Engel (Bot Koruması)", engine="Failed")]
+    # Katman 1 (curl_cffi) → Katman 2 (HTTPX HTTP/2) → Katman 3 (ScraperAPI Kriz Motoru)
+    # Sırayla değil deadline'a göre: yavaş kalan katmanın yanına bir sonraki hedge olarak eklenir
+    layers = {}
+    if curl_cffi_available():
+        layers["Stealth (curl_cffi)"] = _layer("Stealth (curl_cffi)")
+    layers["Stealth (httpx)"] = _layer("Stealth (httpx)", use_httpx=True)
+    layers["ScraperAPI"] = _layer("ScraperAPI", use_scraperapi=True)
+
+    # Sağlık takibi: devresi açık katmanları ele, kalanları beklenen başarı süresine göre sırala
+    # (diğer işçilerin açtığı devreler thread'de okunur; plan() sadece belleğe bakar)
+    await sched.health.refresh_remote()
+    plan = sched.health.plan(cfg.name, list(layers), costly=("ScraperAPI",))
+    if not plan:
+        return [SearchResult(cfg.name, False, error_msg="Site Geçici Olarak Devre Dışı", engine="Failed")]
+
+    res, _winner, budget_left = await sched.run(cfg.name, [layers[name] for name in plan], deadline, _is_final, _is_local_overload)
+    observe_stage(cfg.name, "-", "site_total", time.perf_counter() - site_started)
+    if res is None:
+        if budget_left <= 0:
+            return [SearchResult(cfg.name, False, error_msg="Zaman aşımı (Vercel 10s Tavanı)", engine="Failed", budget_left_ms=0)]
+        return [SearchResult(cfg.name, False, error_msg="Sürekli Engel (Bot Koruması)", engine="Failed", budget_left_ms=int(budget_left * 1000))]
+
+    for r in res: r.budget_left_ms = int(budget_left * 1000)
+    return res
+
+# ─────────────────────────── Önbellek Ayarları ───────────────────────
+CACHE_MAX_ENTRIES = int(os.environ.get("PP_CACHE_MAX_ENTRIES", "2048"))
+CACHE_STALE_S     = float(os.environ.get("PP_CACHE_STALE_S", "900"))
+CACHE_FAIL_TTL_S  = float(os.environ.get("PP_CACHE_FAIL_TTL_S", "30"))  # Başarısız siteleri kısa süre tekrar dövme
+# Aşırı yükte (sadece önbellek modu) indeksteki bu kadar eski fiyatlar da "hiç yok"tan iyidir
+DEGRADED_MAX_AGE_S = float(os.environ.get("PP_DEGRADED_MAX_AGE_S", str(7 * 86400)))
+
+# ─────────────────────────── Toplu Arama Ayarları ────────────────────
+BATCH_MAX_QUERIES = int(os.environ.get("PP_BATCH_MAX_QUERIES", "50"))
+BATCH_CONCURRENCY = int(os.environ.get("PP_BATCH_CONCURRENCY", "12"))     # Batch içinde aynı anda en fazla (sorgu × site) taraması
+BATCH_PER_HOST    = int(os.environ.get("PP_BATCH_PER_HOST", "3"))         # Aynı siteye aynı anda en fazla tarama
+BATCH_BUDGET_S    = float(os.environ.get("PP_BATCH_BUDGET_S", str(SEARCH_BUDGET_S)))
+
+class _BatchSlots:
+    """Bir batch'in (sorgu × site) taramalarını global ve site bazlı eşzamanlılık sınırıyla sıraya sokar."""
+
+    def __init__(self, deadline: float, total: int = BATCH_CONCURRENCY, per_host: int = BATCH_PER_HOST):
+        self.deadline  = deadline
+        self._total    = asyncio.Semaphore(total)
+        self._per_host = per_host
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    async def run(self, site: str, fn: Callable[[], Awaitable[list]]) -> list:
+        host = self._hosts.setdefault(site, asyncio.Semaphore(self._per_host))
+        # Önce site kuyruğu: sıcak bir site global slotları boşuna tutmasın
+        async with host:
+            async with self._total:
+                if asyncio.get_running_loop().time() >= self.deadline:
+                    # Sırası bütçe bittikten sonra geldi: siteye hiç gitme, zaman aşımını önbelleğe de yazma
+                    return [SearchResult(site, False, error_msg="Zaman aşımı (Vercel 10s Tavanı)", engine="Failed", budget_left_ms=0)]
+                return await fn()
+
+_REFERERS = (
+    "https://www.google.com.tr/",
+    "https://yandex.com.tr/",
+    "https://www.bing.com/",
+    "https://duckduckgo.com/",
+    "https://www.yahoo.com/",
+)
+
+# Soğuk başlangıç modu: katman kütüphaneleri (curl_cffi, httpx) ilk kullanımda yüklenir, hiç
+# kullanılmayan katman import edilmez. Uzun ömürlü sunucuda (0) hepsi ilk istekten önce yüklenir.
+COLD_START = os.environ.get("PP_COLD_START", "1" if os.environ.get("VERCEL") else "0") == "1"
+
+# Paylaşımlı katmana yazılan alanlar (tam gösterim; to_dict'in attığı türetilebilir alanlar dahil)
+_RESULT_FIELDS = tuple(f.name for f in fields(SearchResult))
+
+def _shared_key(key: tuple) -> str:
+    return f"{key[0]}\t{key[1]}"
 
 class ScraperEngine:
     def __init__(self):
-        pass
+        # (site, normalize sorgu) -> list[SearchResult]
+        self.cache = ResultCache(max_entries=CACHE_MAX_ENTRIES, stale_s=CACHE_STALE_S)
+        # İşçiler arası L2 (PP_SHARED_CACHE): sonuçlar, pre-flight çerezleri ve açık devre kesiciler
+        self.shared: Optional[SharedCache] = open_shared_cache()
+        self._refreshing: set = set()
+        self._bg_tasks: set = set()
+        # Aynı (site, sorgu) için eşzamanlı taramaları tek uçuşta birleştir
+        self._flight = SingleFlight()
+        # Domain başına kalıcı bağlantı havuzu + pre-flight çerez kavanozu
+        self.pool = SessionPool(shared=self.shared)
+        for cfg in SITES:
+            if cfg.rate_per_s or cfg.burst:
+                self.pool.limiter.configure(base_domain(cfg.base_search_url), cfg.rate_per_s, cfg.burst)
+            unknown = [name for name in cfg.extractors if name not in EXTRACTORS]
+            if unknown:
+                raise ValueError(f"[{cfg.name}] Tanımsız çıkarım stratejisi: {unknown}")
+        # Site bazında hangi çıkarım stratejisinin sonuç verdiği (kazanan önce denenir)
+        self.strategies = StrategyPlanner()
+        # HTML parse / çıkarım işçileri (PP_PARSE_POOL); event loop ayrıştırma sırasında diğer aramalara hizmet eder
+        self.parse_pool = ParsePool()
+        # (site, katman) başarı/gecikme istatistikleri + devre kesiciler
+        self.health = HealthTracker(shared=self.shared)
+        # Deadline'a göre katman yürütücü (hedge'li istekler)
+        self.sched = HedgedScheduler(self.health)
+        # Kalıcı fiyat indeksi (SQLite WAL + FTS5); önbellek ıskalarında canlı taramadan önce bakılır
+        self.index: Optional[PriceIndex] = open_index()
+        # Canlı site taramaları için global + site bazlı slotlar ve sınırlı bekleme kuyruğu (aşırı yükte hızlı ret)
+        self.admission = AdmissionController()
+        self.degraded = 0   # Aşırı yük yüzünden sadece önbellek/indeksle cevaplanan site araması
+        # PP_CAPTURE=1 ise ham site yanıtları sıkıştırılmış depoya (replay.py ile çevrimdışı yeniden ayrıştırma)
+        self.capture: Optional[CaptureStore] = open_capture_store()
         
     def _headers_factory(self):
-        import random
-        referers = [
-            "https://www.google.com.tr/",
-            "https://yandex.com.tr/",
-            "https://www.bing.com/",
-            "https://duckduckgo.com/",
-            "https://www.yahoo.com/"
-        ]
         # Güncel Chrome Windows masaüstü kimliği (User-Agent ve Sec-* başlıkları eklendi)
         return {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
             "Accept-Encoding": "gzip, deflate, br",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-            "Referer": random.choice(referers),
+            "Referer": random.choice(_REFERERS),
             "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
             "Sec-Ch-Ua-Mobile": "?0",
             "Sec-Ch-Ua-Platform": '"Windows"',
@@ -529,13 +830,19 @@ class ScraperEngine:
             "Upgrade-Insecure-Requests": "1"
         }
 
-    async def search_all(self, query: str) -> list[SearchResult]:
+    async def search_all(self, query: str, refresh_within_s: float = 0.0, cached_only: bool = False) -> list[SearchResult]:
+        """refresh_within_s > 0 ise tazeliği bu süreden az kalan siteler önbellek/indeks yerine canlı taranır (ön ısıtma).
+
+        cached_only: aşırı yükte hiçbir siteye gidilmez; önbellek, paylaşımlı katman ve indekste olan döner.
+        """
         # Motor siteleri sırayla DEĞİL, asyncio.gather() ile aynı anda (concurrent) aratıyor
         print(f"[*] Eşzamanlı (Concurrent) Arama Başladı: {query} ...")
         
         dyn_headers = self._headers_factory()
+        # Tek bir arama deadline'ı: tüm siteler ve katmanlar bu bütçeyi paylaşır
+        deadline = asyncio.get_running_loop().time() + SEARCH_BUDGET_S
         
-        tasks = [_scrape_one_with_limit(cfg, query, dyn_headers) for cfg in SITES]
+        tasks = [self._search_site(cfg, query, dyn_headers, deadline, refresh_within_s=refresh_within_s, cached_only=cached_only) for cfg in SITES]
         results_of_lists = await asyncio.gather(*tasks, return_exceptions=False)
         
         final_results = []
@@ -546,6 +853,251 @@ class ScraperEngine:
                   final_results.append(rl)
                   
         return final_results
+
+    async def search_stream(self, query: str, cached_only: bool = False):
+        """Her sitenin sonucunu biter bitmez (site_name, sonuçlar) olarak verir. İlk sonuç en hızlı siteye bağlıdır."""
+        print(f"[*] Akışlı (Streaming) Arama Başladı: {query} ...")
+
+        dyn_headers = self._headers_factory()
+        deadline = asyncio.get_running_loop().time() + SEARCH_BUDGET_S
+
+        async def _tagged(cfg: SiteConfig):
+            return cfg.name, await self._search_site(cfg, query, dyn_headers, deadline, cached_only=cached_only)
+
+        tasks = [asyncio.ensure_future(_tagged(cfg)) for cfg in SITES]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # İstemci koptuysa kalan site görevlerini boşuna çalıştırma
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
             
+    async def search_batch(self, queries: list[str]):
+        """Çok parçalı listeyi tek seferde tarar; her benzersiz sorgu tüm siteleri bitince (sorgu, girdiler, sonuçlar) verir.
+
+        Aynı sorguya normalize edilen girdiler tek taramada birleşir. Tüm (sorgu × site) işleri
+        ortak bir deadline ve _BatchSlots sınırlarıyla, aynı bağlantı havuzu üzerinden koşar.
+        """
+        unique: dict[str, list[str]] = {}
+        for q in queries:
+            if q and q.strip():
+                unique.setdefault(normalize_query(q), []).append(q)
+        print(f"[*] Toplu Arama Başladı: {len(queries)} girdi, {len(unique)} benzersiz sorgu ...")
+
+        dyn_headers = self._headers_factory()
+        deadline = asyncio.get_running_loop().time() + BATCH_BUDGET_S
+        slots = _BatchSlots(deadline)
+
+        async def _one(inputs: list[str]):
+            # Site görevleri sorgu sırasıyla oluşur; semaforlar FIFO olduğundan ilk sorgular önce biter
+            per_site = await asyncio.gather(*[self._search_site(cfg, inputs[0], dyn_headers, deadline, slots) for cfg in SITES])
+            return inputs, [r for rl in per_site for r in rl]
+
+        tasks = [asyncio.ensure_future(_one(inputs)) for inputs in unique.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                inputs, results = await next_done
+                yield inputs[0], inputs, results
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+    # ── Önbellek (TTL + Stale-While-Revalidate) ──
+    async def _search_site(self, cfg: SiteConfig, query: str, dyn_headers: dict, deadline: Optional[float] = None, slots: Optional[_BatchSlots] = None, refresh_within_s: float = 0.0, cached_only: bool = False) -> list[SearchResult]:
+        key = (cfg.name, normalize_query(query))
+        if refresh_within_s > 0 and self.cache.ttl_left(key) < refresh_within_s:
+            # Başka bir işçi az önce tazelemiş olabilir: önce paylaşımlı katmana bak
+            if self.shared is not None:
+                await self._from_shared(cfg, key)
+            if self.cache.ttl_left(key) < refresh_within_s:
+                # Süresi dolmak üzere: kullanıcı gelmeden canlı tara (başarısızsa eldeki sonuç ezilmez)
+                return list(await self._flight.do(key, lambda: self._refresh_one(cfg, query, key, dyn_headers)))
+
+        cached, state = self.cache.get(key)
+        if state == CACHE_MISS and self.shared is not None:
+            cached, state = await self._from_shared(cfg, key)
+        if state == CACHE_FRESH:
+            return list(cached)
+        if state == CACHE_STALE:
+            # Bayat sonucu anında dön, tazelemeyi arka plana at (aşırı yükte tazeleme de yük, atlanır)
+            if not cached_only:
+                self._schedule_refresh(cfg, query, key, dyn_headers)
+            return list(cached)
+
+        indexed, age_s = await self._from_index(cfg, key[1])
+        if indexed:
+            # Yakın zamanda görülmüş eşleşmeler anında döner
+            if age_s < cfg.cache_ttl_s:
+                self.cache.set(key, indexed, ttl_s=cfg.cache_ttl_s - age_s)
+            elif not cached_only:
+                # Site TTL'inden eski: canlı tarama arkada indeksi ve önbelleği tazeler
+                self._schedule_refresh(cfg, query, key, dyn_headers)
+            return list(indexed)
+
+        if cached_only:
+            return await self._degraded(cfg, key)
+        fetch = lambda: self._fetch_and_store(cfg, query, key, dyn_headers, deadline)
+        if slots is not None:
+            # Sadece gerçek tarama sıraya girer; önbellekten dönenler slot tüketmez
+            fetch = lambda run=fetch: slots.run(cfg.name, run)
+        try:
+            return list(await self._flight.do(key, fetch))
+        except AdmissionRejected:
+            return await self._degraded(cfg, key)
+
+    async def _degraded(self, cfg: SiteConfig, key: tuple) -> list[SearchResult]:
+        """Canlı taramaya alınmayan site: indekste daha eski fiyatlar varsa onlar, yoksa OVERLOAD_ERROR (önbelleğe yazılmaz)."""
+        self.degraded += 1
+        indexed, _ = await self._from_index(cfg, key[1], max_age_s=DEGRADED_MAX_AGE_S)
+        if indexed:
+            return indexed
+        return [SearchResult(cfg.name, False, error_msg=OVERLOAD_ERROR, engine="Failed")]
+
+    async def _from_shared(self, cfg: SiteConfig, key: tuple) -> tuple[Optional[list[SearchResult]], str]:
+        """Başka bir işçinin (ya da bu işçinin önceki ömrünün) sonucu; bulunursa yerel önbelleğe kalan süresiyle alınır."""
+        entry = await asyncio.to_thread(self.shared.get, NS_RESULTS, _shared_key(key))
+        if entry is None:
+            return None, CACHE_MISS
+        try:
+            results = [SearchResult(**{f: v for f, v in r.items() if f in _RESULT_FIELDS}) for r in entry["results"]]
+        except (KeyError, TypeError) as e:
+            print(f"[{cfg.name}] UYARI: Paylaşımlı önbellek kaydı okunamadı: {e}")
+            return None, CACHE_MISS
+        # Paylaşımlı kayıt ttl + stale sonunda düşer; yerelde kalan taze/bayat süreyle devam eder
+        ttl_left = entry["ttl_s"] - (time.time() - entry["stored_at"])
+        self.cache.set(key, results, ttl_s=ttl_left, stale_s=entry["stale_s"])
+        return results, CACHE_FRESH if ttl_left > 0 else CACHE_STALE
+
+    def _to_shared(self, key: tuple, results: list[SearchResult], ttl_s: float, stale_s: float):
+        if self.shared is None:
+            return
+        entry = {
+            "stored_at": time.time(),
+            "ttl_s"    : ttl_s,
+            "stale_s"  : stale_s,
+            "results"  : [{f: getattr(r, f) for f in _RESULT_FIELDS} for r in results],
+        }
+        self.shared.set(NS_RESULTS, _shared_key(key), entry, ttl_s + stale_s)
+
+    async def _from_index(self, cfg: SiteConfig, query: str, max_age_s: float = INDEX_FRESH_S) -> tuple[list[SearchResult], float]:
+        """İndeksteki eşleşmeler ve en güncelinin yaşı (sn)."""
+        if self.index is None:
+            return [], 0.0
+        try:
+            rows = await asyncio.to_thread(self.index.lookup, cfg.name, query, max_age_s)
+        except Exception as e:
+            print(f"[{cfg.name}] UYARI: İndeks okuma hatası: {e}")
+            return [], 0.0
+        if not rows:
+            return [], 0.0
+        age_s = time.time() - max(row["seen_at"] for row in rows)
+        return [
+            SearchResult(cfg.name, True, part_name=row["part_name"], price_str=row["price_str"], price_numeric=row["price_numeric"],
+                         url=row["url"], affiliate_url=row["affiliate_url"], image_url=row["image_url"] or PLACEHOLDER_IMAGE, engine="Index")
+            for row in rows
+        ], age_s
+
+    def due_sites(self, query: str, within_s: float) -> int:
+        """Tazeliği within_s'den az kalan site sayısı (ön ısıtmanın giden istek maliyeti)."""
+        q = normalize_query(query)
+        return sum(1 for cfg in SITES if self.cache.ttl_left((cfg.name, q)) < within_s)
+
+    def price_history(self, url: str) -> list[dict]:
+        return self.index.history(url) if self.index is not None else []
+
+    async def _fetch_and_store(self, cfg: SiteConfig, query: str, key: tuple, dyn_headers: dict, deadline: Optional[float] = None) -> list[SearchResult]:
+        # Slot sitenin tüm taramasını (hedge'ler dahil) kapsar: kuyrukta bekleyen ya da reddedilen iş
+        # zamanlayıcıya ve sağlık takibine hiç girmez, aşırı yük site engeli sanılıp devre açmaz
+        async with self.admission.slot(base_domain(cfg.base_search_url), deadline):
+            results = await _scrape_one_with_limit(cfg, query, dyn_headers, self.pool, self.sched, deadline, self.strategies, self.parse_pool, self.capture)
+        self._store(cfg, key, results)
+        return results
+
+    def _store(self, cfg: SiteConfig, key: tuple, results: list[SearchResult]):
+        if any(r.success for r in results):
+            self.cache.set(key, results, ttl_s=cfg.cache_ttl_s)
+            self._to_shared(key, results, cfg.cache_ttl_s, CACHE_STALE_S)
+            if self.index is not None:
+                self.index.record(cfg.name, key[1], results)
+        elif not any(r.error_msg == PARSE_BACKLOG_ERROR for r in results):
+            # Engel/hata sonuçlarını kısa tut ki site toparlanınca hemen denensin
+            self.cache.set(key, results, ttl_s=CACHE_FAIL_TTL_S, stale_s=0)
+            self._to_shared(key, results, CACHE_FAIL_TTL_S, 0)
+
+    def _schedule_refresh(self, cfg: SiteConfig, query: str, key: tuple, dyn_headers: dict):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def _refresh():
+            try:
+                # Aynı anda gelen canlı bir taramayla birleşebilsin diye singleflight üzerinden
+                await self._flight.do(key, lambda: self._refresh_one(cfg, query, key, dyn_headers))
+            except Exception as e:
+                print(f"[{cfg.name}] UYARI: Arka plan tazeleme hatası: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(_refresh())
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+    async def _refresh_one(self, cfg: SiteConfig, query: str, key: tuple, dyn_headers: dict) -> list[SearchResult]:
+        # Arka plan tazelemesi kullanıcıyı beklettirmez, kendi (tam) bütçesiyle çalışır; slotu yine kullanıcılarla paylaşır
+        try:
+            async with self.admission.slot(base_domain(cfg.base_search_url)):
+                results = await _scrape_one_with_limit(cfg, query, dyn_headers, self.pool, self.sched, planner=self.strategies, parse_pool=self.parse_pool, capture=self.capture)
+        except AdmissionRejected:
+            # Aşırı yükte tazeleme ertelenir; eldeki bayat sonuç kalır
+            return [SearchResult(cfg.name, False, error_msg=OVERLOAD_ERROR, engine="Failed")]
+        # Tazeleme başarısızsa eldeki bayat sonucu ezme
+        if any(r.success for r in results):
+            self._store(cfg, key, results)
+        return results
+
+    def health_stats(self) -> dict:
+        names = (["Stealth (curl_cffi)"] if curl_cffi_available() else []) + ["Stealth (httpx)", "ScraperAPI"]
+        return {
+            "sites": {
+                cfg.name: {
+                    "down"  : self.health.site_down(cfg.name, names),
+                    "layers": self.health.stats().get(cfg.name, {}),
+                }
+                for cfg in SITES
+            },
+        }
+
+    def stats(self) -> dict:
+        return {
+            "cache"       : self.cache.stats(),
+            "singleflight": self._flight.stats(),
+            "pool"        : self.pool.stats(),
+            "rate_limit"  : self.pool.limiter.stats(),
+            "strategies"  : self.strategies.stats(),
+            "parse_pool"  : self.parse_pool.stats(),
+            "admission"   : {**self.admission.stats(), "degraded": self.degraded},
+            "scheduler"   : self.sched.stats(),
+            "index"       : self.index.stats() if self.index is not None else None,
+            "shared"      : self.shared.stats() if self.shared is not None else None,
+            "capture"     : self.capture.stats() if self.capture is not None else None,
+        }
+
+    def warm_up(self):
+        """Katman kütüphanelerini ve ayrıştırma işçilerini şimdi hazırlar (PP_COLD_START=0 iken uygulama açılışında çağrılır)."""
+        preload_layers()
+        self.parse_pool.start()
+
     async def close(self):
-        pass
+        for task in list(self._bg_tasks):
+            task.cancel()
+        await self.pool.close()
+        self.parse_pool.shutdown()
+        if self.index is not None:
+            await asyncio.to_thread(self.index.close)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.close)
+        if self.capture is not None:
+            await asyncio.to_thread(self.capture.close)
@@ -0,0 +1,322 @@
+import asyncio
+import importlib.util
+import os
+import socket
+import time
+from typing import TYPE_CHECKING, Any, Optional
+from urllib.parse import urlparse
+
+from ratelimit import DomainRateLimiter
+from sharedcache import NS_COOKIES, SharedCache
+
+if TYPE_CHECKING:
+    import httpx
+
+# ── Katman kütüphaneleri ilk kullanımda yüklenir ──
+# Soğuk başlangıçta import edilen her modül ilk isteğin süresine eklenir; hiç kullanılmayan
+# katmanın (ör. curl_cffi açıkken httpx) bedeli ödenmesin. Kurulu olup olmadıkları ucuzca bakılır.
+HTTP2_AVAILABLE     = importlib.util.find_spec("h2") is not None    # HTTP/2 için h2 şart; yoksa HTTP/1.1 keep-alive
+CURL_CFFI_INSTALLED = importlib.util.find_spec("curl_cffi") is not None
+if not CURL_CFFI_INSTALLED:
+    print("[SYSTEM] UYARI: curl_cffi yüklenemedi. Katman 1 devre dışı, HTTPX/ScraperAPI fallbacks aktif.")
+
+_curl_requests: Any = None    # None: henüz denenmedi, False: import başarısız
+_httpx: Any = None
+
+def load_curl_cffi():
+    """curl_cffi.requests modülü; kurulu değil ya da native kütüphane bozuksa None."""
+    global _curl_requests
+    if _curl_requests is None:
+        try:
+            from curl_cffi import requests as curl_requests
+            _curl_requests = curl_requests
+        except Exception as e:
+            print(f"[SYSTEM] UYARI: curl_cffi başlatma hatası: {e}")
+            _curl_requests = False
+    return _curl_requests or None
+
+def curl_cffi_available() -> bool:
+    """Katman 1 planlanabilir mi? Import henüz denenmediyse kurulu olması yeterli."""
+    return CURL_CFFI_INSTALLED and _curl_requests is not False
+
+def load_httpx():
+    global _httpx
+    if _httpx is None:
+        import httpx
+        _httpx = httpx
+    return _httpx
+
+def preload_layers():
+    """Uzun ömürlü sunucuda (PP_COLD_START=0) katman kütüphanelerini ilk istekten önce yükler."""
+    if CURL_CFFI_INSTALLED:
+        load_curl_cffi()
+    load_httpx()
+
+# ─────────────────────────── Havuz Ayarları ──────────────────────────
+POOL_MAX_CONNECTIONS = int(os.environ.get("PP_POOL_MAX_CONNECTIONS", "10"))   # Domain başına
+POOL_KEEPALIVE_S     = float(os.environ.get("PP_POOL_KEEPALIVE_S", "60"))
+COOKIE_TTL_S         = float(os.environ.get("PP_COOKIE_TTL_S", "1200"))       # Pre-flight çerezleri en fazla bu kadar geçerli
+SHARED_COOKIE_RECHECK_S = 5.0                                                  # Paylaşımlı katmanda olmayan domain'i tekrar sorma aralığı
+
+def base_domain(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+# ─────────────────────────── Çerez Kavanozu ──────────────────────────
+class CookieJar:
+    """Domain bazlı pre-flight çerezleri. Süresi dolan domain için tekrar pre-flight yapılır.
+
+    Paylaşımlı katman varsa çerezler oraya da yazılır; başka bir işçinin pre-flight'ı bu işçide
+    tekrar ödenmez. Oradan gelen çerezler curl oturumuna bir kez aktarılır (pop_imported).
+    Senkron yollar (get, is_fresh) sadece belleğe bakar; paylaşımlı katman load_shared ile,
+    event loop dışında (asyncio.to_thread) okunur.
+    """
+
+    def __init__(self, ttl_s: float = COOKIE_TTL_S, shared: Optional[SharedCache] = None):
+        self.ttl_s = ttl_s
+        self.shared = shared
+        self._jar: dict[str, tuple[dict, float]] = {}   # domain -> (çerezler, bitiş zamanı [epoch])
+        self._imported: set[str] = set()                 # Paylaşımlı katmandan gelip oturuma henüz aktarılmamış
+        self._shared_miss: dict[str, float] = {}         # domain -> paylaşımlı katmanda son bulunamadığı an
+
+    def get(self, domain: str) -> Optional[dict]:
+        entry = self._jar.get(domain)
+        if entry is not None and time.time() >= entry[1]:
+            del self._jar[domain]
+            entry = None
+        return entry[0] if entry is not None else None
+
+    async def load_shared(self, domain: str):
+        """Yerelde taze çerez yoksa paylaşımlı katmandan okur (thread'de; yavaş Redis/kilitli WAL loop'u durdurmasın).
+
+        Boş dönen domain birkaç saniye tekrar sorulmaz: her tarama isteği öncesi çağrılır.
+        """
+        if self.shared is None or self.get(domain) is not None:
+            return
+        now = time.time()
+        if now - self._shared_miss.get(domain, 0.0) < SHARED_COOKIE_RECHECK_S:
+            return
+        self._shared_miss[domain] = now   # Eşzamanlı taramalar aynı anahtarı tekrar okumasın
+        found = await asyncio.to_thread(self.shared.get, NS_COOKIES, domain)
+        if not found or found["expires_at"] <= time.time() or self.get(domain) is not None:
+            return   # Yoksa, süresi geçmişse ya da beklerken bu işçi kendi pre-flight'ını bitirdiyse
+        self._shared_miss.pop(domain, None)
+        self._jar[domain] = (found["cookies"], found["expires_at"])
+        self._imported.add(domain)
+
+    def set(self, domain: str, cookies: dict, expires_at: Optional[float] = None):
+        cap = time.time() + self.ttl_s
+        expires_at = min(expires_at, cap) if expires_at else cap
+        self._jar[domain] = (dict(cookies), expires_at)
+        self._imported.discard(domain)
+        self._shared_miss.pop(domain, None)
+        if self.shared is not None:
+            self.shared.set(NS_COOKIES, domain, {"cookies": dict(cookies), "expires_at": expires_at}, expires_at - time.time())
+
+    def set_from_cookiejar(self, domain: str, jar: Any):
+        """http.cookiejar nesnesinden çerezleri alır, en erken biten çerezin süresini baz alır."""
+        cookies, expiries = {}, []
+        for c in jar:
+            cookies[c.name] = c.value
+            if c.expires:
+                expiries.append(float(c.expires))
+        self.set(domain, cookies, min(expiries) if expiries else None)
+
+    def pop_imported(self, domain: str) -> Optional[dict]:
+        """Başka işçinin topladığı, bu işçinin oturumuna henüz yüklenmemiş çerezler (bir kez döner)."""
+        if domain not in self._imported:
+            return None
+        self._imported.discard(domain)
+        return self.get(domain)
+
+    def is_fresh(self, domain: str) -> bool:
+        return self.get(domain) is not None
+
+    def invalidate(self, domain: str):
+        self._jar.pop(domain, None)
+        self._imported.discard(domain)
+        if self.shared is not None:
+            self.shared.delete(NS_COOKIES, domain)
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {d: round(exp - now, 1) for d, (_, exp) in self._jar.items() if exp > now}
+
+# ─────────────────────────── Oturum Kapatma ───────────────────────────
+async def _close_async(sessions: list, clients: list):
+    for s in sessions:
+        try:
+            await s.close()
+        except Exception:
+            pass
+    for c in clients:
+        try:
+            await c.aclose()
+        except Exception:
+            pass
+
+def _close_sync(sessions: list, clients: list):
+    """Loop'u kapanmış oturumlar: aclose() artık çalışamaz (taşıyıcılar ölü loop'a bağlı), bağlantılar
+    doğrudan bırakılır. Yoksa soketler GC'ye kadar açık kalır."""
+    for s in sessions:
+        try:
+            _close_curl_sync(s)
+        except Exception:
+            pass
+    for c in clients:
+        try:
+            _close_httpx_sync(c)
+        except Exception:
+            pass
+
+def _close_curl_sync(session: Any):
+    # AsyncSession.close() ile aynı adımlar, loop'a dokunmadan: multi tutamacı bağlantı önbelleğini taşır
+    acurl = session.acurl
+    if getattr(session, "_owns_acurl", True) and acurl._curlm is not None:
+        from curl_cffi import lib
+        for curl in list(acurl._curl2future):
+            lib.curl_multi_remove_handle(acurl._curlm, curl._curl)
+        lib.curl_multi_cleanup(acurl._curlm)
+        acurl._curlm = None
+    while True:
+        try:
+            curl = session.pool.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+        if curl:
+            curl.close()
+
+def _close_httpx_sync(client: "httpx.AsyncClient"):
+    pool = getattr(client._transport, "_pool", None)
+    for conn in list(getattr(pool, "connections", ())):
+        stream = getattr(getattr(conn, "_connection", None), "_network_stream", None)
+        sock = stream.get_extra_info("socket") if stream is not None else None
+        if sock is None:
+            continue
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        # asyncio TransportSocket'in close()'u yok; asıl soket kapatılınca taşıyıcının __del__'i no-op olur
+        getattr(sock, "_sock", sock).close()
+
+# ─────────────────────────── Oturum Havuzu ───────────────────────────
+class SessionPool:
+    """Domain başına uzun ömürlü (keep-alive) curl_cffi ve httpx oturumları.
+
+    Oturumlar ilk kullanımda tembel (lazy) açılır ve açıldıkları event loop'a bağlıdır;
+    loop değişirse (reload, test) eskiler kapatılır ve havuz sıfırdan kurulur.
+    """
+
+    def __init__(self, shared: Optional[SharedCache] = None):
+        self.cookies = CookieJar(shared=shared)
+        # Tüm aramalar arasında paylaşılan domain başına istek hızı (ön istekler de dahil)
+        self.limiter = DomainRateLimiter()
+        self._curl: dict[str, Any] = {}
+        self._httpx: dict[str, "httpx.AsyncClient"] = {}
+        self._scraperapi: Optional["httpx.AsyncClient"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._preflight_locks: dict[str, asyncio.Lock] = {}
+
+    def _check_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Eski loop'a bağlı oturumlar burada kullanılamaz: kapat ve yeniden kur
+            old, detached = self._loop, self._detach()
+            self._preflight_locks.clear()
+            self._loop = loop
+            if old is not None and old.is_running() and not old.is_closed():
+                # Başka bir thread'de hâlâ dönüyor: kapatma o loop'ta yapılsın
+                asyncio.run_coroutine_threadsafe(_close_async(*detached), old)
+            else:
+                _close_sync(*detached)
+
+    def _detach(self) -> tuple[list, list]:
+        """Tüm oturumları havuzdan çıkarır; (curl oturumları, httpx istemcileri)."""
+        sessions = list(self._curl.values())
+        clients = list(self._httpx.values()) + ([self._scraperapi] if self._scraperapi else [])
+        self._curl.clear()
+        self._httpx.clear()
+        self._scraperapi = None
+        return sessions, clients
+
+    def curl_session(self, domain: str):
+        self._check_loop()
+        session = self._curl.get(domain)
+        if session is None:
+            curl_requests = load_curl_cffi()
+            if curl_requests is None:
+                raise RuntimeError("curl_cffi kullanılamıyor")
+            # Chrome impersonation for stealth
+            session = curl_requests.AsyncSession(impersonate="chrome120", verify=False, max_clients=POOL_MAX_CONNECTIONS)
+            self._curl[domain] = session
+        # Başka bir işçinin pre-flight'ında toplanan çerezler (bu işçi o domain'e hiç ön istek atmadı)
+        imported = self.cookies.pop_imported(domain)
+        if imported:
+            session.cookies.update(imported)
+        return session
+
+    def httpx_client(self, domain: str) -> "httpx.AsyncClient":
+        self._check_loop()
+        client = self._httpx.get(domain)
+        if client is None:
+            httpx = load_httpx()
+            client = httpx.AsyncClient(
+                http2   = HTTP2_AVAILABLE,
+                verify  = False,
+                timeout = 8.0,
+                limits  = httpx.Limits(
+                    max_connections           = POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections = POOL_MAX_CONNECTIONS,
+                    keepalive_expiry          = POOL_KEEPALIVE_S,
+                ),
+            )
+            self._httpx[domain] = client
+        # Katman 1'in topladığı pre-flight çerezlerini Katman 2 ile de paylaş
+        jar = self.cookies.get(domain)
+        if jar:
+            client.cookies.update(jar)
+        return client
+
+    def scraperapi_client(self) -> "httpx.AsyncClient":
+        self._check_loop()
+        if self._scraperapi is None:
+            self._scraperapi = load_httpx().AsyncClient(timeout=8.0)
+        return self._scraperapi
+
+    async def load_cookies(self, domain: str):
+        """Başka işçinin topladığı çerezleri (paylaşımlı katman) oturum açılmadan önce belleğe alır."""
+        await self.cookies.load_shared(domain)
+
+    async def ensure_preflight(self, domain: str, headers: dict, timeout: float = 8.0):
+        """Çerezler taze değilse ana sayfaya bir ön istek atıp cf_clearance/session çerezlerini toplar."""
+        await self.cookies.load_shared(domain)
+        if self.cookies.is_fresh(domain):
+            return
+        lock = self._preflight_locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            # Kilidi beklerken başka bir arama pre-flight'ı bitirmiş olabilir
+            if self.cookies.is_fresh(domain):
+                return
+            session = self.curl_session(domain)
+            try:
+                await self.limiter.acquire(domain)
+                await session.get(domain, headers=headers, timeout=timeout)
+                await asyncio.sleep(0.5)  # Çerezleri sindirmesi için kısa bir bekleme (Vercel zamanıyla uyumlu)
+            except Exception:
+                # Başarısız pre-flight'ı her aramada tekrar ödememek için 1 dk bekle
+                self.cookies.set(domain, session.cookies.get_dict(), time.time() + 60)
+                return
+            self.cookies.set_from_cookiejar(domain, session.cookies.jar)
+
+    async def close(self):
+        await _close_async(*self._detach())
+
+    def stats(self) -> dict:
+        return {
+            "curl_sessions" : sorted(self._curl),
+            "httpx_clients" : sorted(self._httpx),
+            "http2"         : HTTP2_AVAILABLE,
+            "layers_loaded" : {"curl_cffi": bool(_curl_requests), "httpx": _httpx is not None},
+            "cookie_ttl_s"  : self.cookies.stats(),
+        }
@@ -0,0 +1,387 @@
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+
+# ── Hızlı kodlama: orjson varsa onu, yoksa standart json ──
+try:
+    import orjson
+
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+# ─────────────────────────── Paylaşımlı Önbellek Ayarları ────────────
+# PP_SHARED_CACHE=sqlite|redis|off
+#   sqlite: aynı makinedeki uvicorn işçileri tek bir WAL dosyasını paylaşır (ek servis yok)
+#   redis : yerel Redis uyumlu sunucu (redis paketi gerekir); boyut sınırı sunucunun maxmemory ayarıdır
+#   off   : her işçi sadece kendi bellek içi önbelleğini kullanır (Vercel'de varsayılan)
+SHARED_BACKEND    = os.environ.get("PP_SHARED_CACHE", "off" if os.environ.get("VERCEL") else "sqlite").lower()
+SHARED_PATH       = os.environ.get("PP_SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "parcapusula_shared.db"))
+SHARED_REDIS_URL  = os.environ.get("PP_SHARED_REDIS_URL", "redis://127.0.0.1:6379/0")
+SHARED_MAX_BYTES  = int(float(os.environ.get("PP_SHARED_CACHE_MAX_MB", "64")) * 1024 * 1024)
+SHARED_QUEUE_MAX  = 10_000    # Yazıcı yetişemezse fazlası düşer (istek yolu hiç beklemez)
+SHARED_FLUSH_S    = 5.0       # İşçi sayaçlarının paylaşımlı tabloya yazılma aralığı
+SHARED_PREFIX     = "pp:"     # Redis anahtar öneki
+
+# Ad alanları
+NS_RESULTS = "results"   # "site\tnormalize sorgu" -> sonuç listesi
+NS_COOKIES = "cookies"   # domain -> pre-flight çerezleri
+NS_HEALTH  = "health"    # "site\tkatman" -> açık devre kesici
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    ns         TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      BLOB NOT NULL,
+    expires_at REAL NOT NULL,             -- epoch; süresi geçmiş kayıt okunmaz, yazıcı temizler
+    size       INTEGER NOT NULL,
+    writer     INTEGER NOT NULL,          -- yazan işçinin pid'i (işçiler arası isabet ölçümü)
+    PRIMARY KEY (ns, key)
+);
+CREATE INDEX IF NOT EXISTS entries_exp ON entries(expires_at);
+CREATE TABLE IF NOT EXISTS workers (
+    pid        INTEGER PRIMARY KEY,
+    hits       INTEGER NOT NULL,
+    cross_hits INTEGER NOT NULL,
+    misses     INTEGER NOT NULL,
+    writes     INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# ─────────────────────────── Ortak Katman ────────────────────────────
+class SharedCache:
+    """Aynı makinedeki işçi süreçleri arasında paylaşılan TTL'li anahtar/değer katmanı.
+
+    Bellek içi ResultCache'in (L1) arkasında L2 olarak durur. Okumalar senkron ve kısa (tek anahtar);
+    event loop'tan sık çağrılan yollarda asyncio.to_thread ile çağrılmalı. Yazmalar ve silmeler
+    kuyruğa atılır, tek bir yazıcı thread toplu işler. Değerler JSON ile kodlanır (pickle yok:
+    paylaşımlı dosyadan okunan veri kod çalıştıramasın).
+
+    Sayaçlar işçi bazlıdır; `cross_hits` başka bir işçinin yazdığı kayıttan gelen isabetlerdir.
+    """
+
+    backend = "?"
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.hits = self.cross_hits = self.misses = 0
+        self.writes = self.dropped = self.errors = self.evictions = 0
+        self._start_writer()
+
+    def _start_writer(self):
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=SHARED_QUEUE_MAX)
+        self._writer = threading.Thread(target=self._write_loop, name="pp-shared-cache", daemon=True)
+        self._writer.start()
+
+    def _check_fork(self):
+        # fork ile çoğaltılan işçide (gunicorn --preload) yazıcı thread ve bağlantılar ebeveynde kaldı
+        if os.getpid() != self.pid:
+            self.pid = os.getpid()
+            self.hits = self.cross_hits = self.misses = 0
+            self.writes = self.dropped = self.errors = self.evictions = 0
+            self._reset_connections()
+            self._start_writer()
+
+    # ── Okuma ──
+    def get(self, ns: str, key: str) -> Optional[Any]:
+        self._check_fork()
+        try:
+            found = self._get(ns, key, time.time())
+        except Exception as e:
+            self.errors += 1
+            print(f"[SHARED] UYARI: Okuma hatası: {e}")
+            return None
+        if found is None:
+            self.misses += 1
+            return None
+        value, writer = found
+        self.hits += 1
+        if writer != self.pid:
+            self.cross_hits += 1
+        return _loads(value)
+
+    def scan(self, ns: str) -> dict[str, Any]:
+        """Ad alanındaki süresi dolmamış tüm kayıtlar (küçük ad alanları için: sağlık durumu). Sayaçları etkilemez."""
+        self._check_fork()
+        try:
+            return {key: _loads(value) for key, value in self._scan(ns, time.time())}
+        except Exception as e:
+            self.errors += 1
+            print(f"[SHARED] UYARI: Okuma hatası: {e}")
+            return {}
+
+    # ── Yazma (bloklamaz) ──
+    def set(self, ns: str, key: str, value: Any, ttl_s: float):
+        if ttl_s <= 0:
+            return
+        self._enqueue(("set", ns, key, _dumps(value), time.time() + ttl_s))
+
+    def delete(self, ns: str, key: str):
+        self._enqueue(("del", ns, key))
+
+    def _enqueue(self, op: tuple):
+        self._check_fork()
+        try:
+            self._queue.put_nowait(op)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        last_flush = 0.0
+        while True:
+            try:
+                op = self._queue.get(timeout=SHARED_FLUSH_S)
+            except queue.Empty:
+                op = ()
+            if op is None:
+                self._safe_flush()
+                return
+            ops = [op] if op else []
+            # Kuyrukta biriken diğer işlemleri de aynı transaction'a al
+            stop = False
+            while True:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                    break
+                ops.append(more)
+            if ops:
+                try:
+                    self._apply(ops, time.time())
+                    self.writes += sum(1 for o in ops if o[0] == "set")
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[SHARED] UYARI: Yazma hatası: {e}")
+            if stop or time.time() - last_flush >= SHARED_FLUSH_S:
+                self._safe_flush()
+                last_flush = time.time()
+            if stop:
+                return
+
+    def _safe_flush(self):
+        try:
+            self._flush_counters()
+        except Exception as e:
+            self.errors += 1
+            print(f"[SHARED] UYARI: Sayaç yazma hatası: {e}")
+
+    def close(self):
+        """Kuyruktaki yazmaları bitirip yazıcıyı durdurur."""
+        if os.getpid() != self.pid:
+            return
+        self._queue.put(None)
+        self._writer.join(timeout=5.0)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        try:
+            workers = self._worker_totals()
+        except Exception:
+            workers = {}
+        return {
+            "backend"   : self.backend,
+            "pid"       : self.pid,
+            "hits"      : self.hits,
+            "cross_hits": self.cross_hits,
+            "misses"    : self.misses,
+            "hit_rate"  : round(self.hits / lookups, 3) if lookups else None,
+            "writes"    : self.writes,
+            "evictions" : self.evictions,
+            "pending"   : self._queue.qsize(),
+            "dropped"   : self.dropped,
+            "errors"    : self.errors,
+            "workers"   : workers,   # Tüm işçilerin son yazılan sayaçları (pid -> sayaçlar)
+        }
+
+    def _counters(self) -> dict:
+        return {"hits": self.hits, "cross_hits": self.cross_hits, "misses": self.misses, "writes": self.writes}
+
+    # ── Arka uçların doldurduğu kısım ──
+    def _get(self, ns: str, key: str, now: float) -> Optional[tuple[bytes, int]]:
+        raise NotImplementedError
+
+    def _scan(self, ns: str, now: float) -> list[tuple[str, bytes]]:
+        raise NotImplementedError
+
+    def _apply(self, ops: list[tuple], now: float):
+        raise NotImplementedError
+
+    def _flush_counters(self):
+        raise NotImplementedError
+
+    def _worker_totals(self) -> dict:
+        raise NotImplementedError
+
+    def _reset_connections(self):
+        pass
+
+# ─────────────────────────── SQLite (WAL) Arka Ucu ───────────────────
+class SQLiteSharedCache(SharedCache):
+    """Tek dosya, WAL modu: okuyucular yazıcıyı beklemez, her işlem tek transaction (atomik).
+
+    TTL: okuma `expires_at > şimdi` koşuluyla yapılır; süresi geçmiş kayıt temizlenmeyi beklerken
+    bile hiçbir işçiye dönmez. Boyut: her yazma turunda süresi geçenler silinir, toplam boyut
+    `max_bytes`'ı aşarsa en erken bitecek kayıtlardan başlanarak %90'ın altına inilir.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = SHARED_PATH, max_bytes: int = SHARED_MAX_BYTES):
+        self.path      = path
+        self.max_bytes = max_bytes
+        self._local    = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.executescript(_SCHEMA)
+        super().__init__()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _reset_connections(self):
+        self._local = threading.local()
+
+    def _get(self, ns, key, now):
+        return self._connect().execute(
+            "SELECT value, writer FROM entries WHERE ns = ? AND key = ? AND expires_at > ?", (ns, key, now),
+        ).fetchone()
+
+    def _scan(self, ns, now):
+        return self._connect().execute(
+            "SELECT key, value FROM entries WHERE ns = ? AND expires_at > ?", (ns, now),
+        ).fetchall()
+
+    def _apply(self, ops, now):
+        conn = self._connect()
+        with conn:
+            # Sıra korunur: aynı turda önce yazılıp sonra silinen anahtar silinmiş kalmalı
+            for op in ops:
+                if op[0] == "set":
+                    _, ns, key, value, expires_at = op
+                    conn.execute("INSERT OR REPLACE INTO entries (ns, key, value, expires_at, size, writer) VALUES (?, ?, ?, ?, ?, ?)",
+                                 (ns, key, value, expires_at, len(value), self.pid))
+                else:
+                    conn.execute("DELETE FROM entries WHERE ns = ? AND key = ?", (op[1], op[2]))
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        freed, victims = 0, []
+        for rowid, size in conn.execute("SELECT rowid, size FROM entries ORDER BY expires_at"):
+            victims.append((rowid,))
+            freed += size
+            if total - freed <= target:
+                break
+        conn.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+        self.evictions += len(victims)
+
+    def _flush_counters(self):
+        c = self._counters()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO workers (pid, hits, cross_hits, misses, writes, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                         (self.pid, c["hits"], c["cross_hits"], c["misses"], c["writes"], time.time()))
+
+    def _worker_totals(self) -> dict:
+        rows = self._connect().execute(
+            "SELECT pid, hits, cross_hits, misses, writes, updated_at FROM workers WHERE updated_at > ?", (time.time() - 3600,),
+        ).fetchall()
+        return {pid: {"hits": h, "cross_hits": x, "misses": m, "writes": w, "age_s": round(time.time() - at, 1)}
+                for pid, h, x, m, w, at in rows}
+
+# ─────────────────────────── Redis Arka Ucu ──────────────────────────
+class RedisSharedCache(SharedCache):
+    """Yerel Redis uyumlu sunucu (Redis, Valkey, KeyDB...). Her anahtar PX ile yazılır: TTL sunucuda atomik.
+
+    Boyut sınırı sunucunun `maxmemory` ayarıdır; tüm anahtarlar TTL'li olduğundan `volatile-ttl`
+    ya da `volatile-lru` politikasıyla taşmaz. Değerin ilk 4 baytı yazan işçinin pid'idir.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = SHARED_REDIS_URL):
+        import redis   # İsteğe bağlı bağımlılık; yoksa open_shared_cache devre dışı bırakır
+
+        self.url = url
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._client.ping()
+        super().__init__()
+
+    def _k(self, ns: str, key: str) -> str:
+        return f"{SHARED_PREFIX}{ns}:{key}"
+
+    def _get(self, ns, key, now):
+        raw = self._client.get(self._k(ns, key))
+        if raw is None:
+            return None
+        return raw[4:], int.from_bytes(raw[:4], "big")
+
+    def _scan(self, ns, now):
+        prefix = self._k(ns, "")
+        keys = list(self._client.scan_iter(match=prefix + "*", count=500))
+        if not keys:
+            return []
+        values = self._client.mget(keys)
+        return [(k.decode()[len(prefix):], v[4:]) for k, v in zip(keys, values) if v is not None]
+
+    def _apply(self, ops, now):
+        pipe = self._client.pipeline(transaction=False)
+        stamp = self.pid.to_bytes(4, "big")
+        for op in ops:
+            if op[0] == "set":
+                _, ns, key, value, expires_at = op
+                ttl_ms = int((expires_at - now) * 1000)
+                if ttl_ms > 0:
+                    pipe.set(self._k(ns, key), stamp + value, px=ttl_ms)
+            else:
+                pipe.delete(self._k(op[1], op[2]))
+        pipe.execute()
+
+    def _flush_counters(self):
+        key = f"{SHARED_PREFIX}workers:{self.pid}"
+        self._client.set(key, _dumps({**self._counters(), "updated_at": time.time()}), ex=3600)
+
+    def _worker_totals(self) -> dict:
+        keys = list(self._client.scan_iter(match=f"{SHARED_PREFIX}workers:*", count=100))
+        out = {}
+        for k, v in zip(keys, self._client.mget(keys) if keys else []):
+            if v is not None:
+                c = _loads(v)
+                c["age_s"] = round(time.time() - c.pop("updated_at"), 1)
+                out[int(k.decode().rsplit(":", 1)[1])] = c
+        return out
+
+def open_shared_cache(backend: str = SHARED_BACKEND) -> Optional[SharedCache]:
+    """Ayar kapalıysa ya da arka uç açılamazsa None (her işçi sadece kendi önbelleğini kullanır)."""
+    if backend in ("", "0", "off", "none"):
+        return None
+    try:
+        if backend == "sqlite":
+            return SQLiteSharedCache()
+        if backend == "redis":
+            return RedisSharedCache()
+    except Exception as e:
+        print(f"[SYSTEM] UYARI: Paylaşımlı önbellek ({backend}) açılamadı ({e}). İşçiler arası önbellek devre dışı.")
+        return None
+    raise ValueError(f"Geçersiz PP_SHARED_CACHE: {backend}")
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+# ─────────────────────────── Singleflight ────────────────────────────
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task    = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Aynı anahtar için eşzamanlı gelen istekleri tek bir uçuşta birleştirir.
+
+    İlk gelen (lider) işi başlatır, sonrakiler aynı görevin sonucunu bekler.
+    Bekleyenlerden biri iptal edilirse sadece o düşer; herkes vazgeçerse iş de iptal edilir.
+    Hata olursa aynı istisna tüm bekleyenlere yayılır.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self.started   = 0   # Gerçekten başlatılan uçuş sayısı
+        self.coalesced = 0   # Mevcut uçuşa eklemlenen (tasarruf edilen) istek sayısı
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _t, k=key, c=call: self._forget(k, c))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # shield: bir bekleyenin iptali ortak görevi öldürmesin
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Kimse beklemiyorsa "exception was never retrieved" uyarısını bastır
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "started"  : self.started,
+            "coalesced": self.coalesced,
+        }
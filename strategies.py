@@ -0,0 +1,88 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# ─────────────────────────── Strateji Ayarları ───────────────────────
+EXTRACT_SKIP_AFTER = int(os.environ.get("PP_EXTRACT_SKIP_AFTER", "5"))     # Başkası kazanırken bu kadar ıska → atla
+EXTRACT_RETRY_S    = float(os.environ.get("PP_EXTRACT_RETRY_S", "300"))    # Atlanan strateji bu süre sonra tekrar denenir
+
+# Son çare stratejiler: her zaman en sonda denenir, asla öne alınmaz. Kazanmaları yapısal stratejilerin
+# ıskası sayılmaz; yoksa sahte "Hassas Fiyat Yakalama" satırları kartların/ld+json'un yerine kilitlenir.
+TERMINAL_STRATEGIES = frozenset({"regex_fallback"})
+
+@dataclass
+class StrategyStats:
+    wins      : int   = 0
+    misses    : int   = 0       # Art arda: başka bir strateji aynı sayfadan sonuç çıkarırken bu boş döndü
+    last_win  : float = 0.0
+    last_try  : float = 0.0
+
+# ─────────────────────────── Strateji Sıralayıcı ─────────────────────
+class StrategyPlanner:
+    """Site bazında hangi çıkarım stratejisinin (ld+json, kartlar, regex...) gerçekten sonuç verdiğini izler.
+
+    Son kazanan yapısal strateji ilk denenir. Aynı sayfadan başka bir yapısal strateji sonuç çıkarırken
+    art arda boş dönen strateji bir süre atlanır; süre dolunca tekrar sıraya girer. Hiçbir strateji sonuç
+    vermediyse (engel sayfası, boş arama) kayıt tutulmaz: sorun sayfada, stratejide değil. Son çare
+    stratejiler (TERMINAL_STRATEGIES) sırada hep en sonda kalır.
+    """
+
+    def __init__(self):
+        self._stats: dict[tuple[str, str], StrategyStats] = {}
+        self._preferred: dict[str, str] = {}
+
+    def _get(self, site: str, name: str) -> StrategyStats:
+        return self._stats.setdefault((site, name), StrategyStats())
+
+    def order(self, site: str, declared: tuple) -> list[str]:
+        """SiteConfig'te tanımlı sırayı öğrenilmiş kazanan öne alınarak ve ıskalayanlar atlanarak döner.
+        Son çare stratejiler atlanmaz, tanımlı sıralarıyla en sona eklenir."""
+        now = time.monotonic()
+        preferred = self._preferred.get(site)
+        ordered = [preferred] if preferred in declared else []
+        for name in declared:
+            if name == preferred or name in TERMINAL_STRATEGIES:
+                continue
+            st = self._stats.get((site, name))
+            if st and st.misses >= EXTRACT_SKIP_AFTER and now - st.last_try < EXTRACT_RETRY_S:
+                continue
+            ordered.append(name)
+        if not ordered:
+            ordered = [name for name in declared if name not in TERMINAL_STRATEGIES]
+        return ordered + [name for name in declared if name in TERMINAL_STRATEGIES]
+
+    def record(self, site: str, winner: Optional[str], missed: list[str]):
+        """winner sonuç çıkaran strateji; missed ondan önce denenip boş dönenler."""
+        if winner is None:
+            return
+        now = time.monotonic()
+        if winner in TERMINAL_STRATEGIES:
+            # Son çare kazandı: sayfada yapısal veri yok ya da seçiciler bozuk. Sıra değişmez,
+            # yapısal stratejiler bir sonraki sayfada yine önce denenir.
+            st = self._get(site, winner)
+            st.wins += 1
+            st.last_win = st.last_try = now
+            return
+        for name in missed:
+            st = self._get(site, name)
+            st.misses += 1
+            st.last_try = now
+        st = self._get(site, winner)
+        st.wins += 1
+        st.misses = 0
+        st.last_win = st.last_try = now
+        self._preferred[site] = winner
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        out: dict[str, dict] = {}
+        for (site, name), st in self._stats.items():
+            out.setdefault(site, {})[name] = {
+                "wins"   : st.wins,
+                "misses" : st.misses,
+                "skipped": st.misses >= EXTRACT_SKIP_AFTER and now - st.last_try < EXTRACT_RETRY_S,
+            }
+        for site, name in self._preferred.items():
+            out.setdefault(site, {})["preferred"] = name
+        return out
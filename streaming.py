@@ -0,0 +1,222 @@
+import codecs
+import json
+import os
+import re
+from html.parser import HTMLParser
+from typing import AsyncIterator, Optional
+
+from parsing import CompiledSelector
+
+# ─────────────────────────── Akış Ayarları ───────────────────────────
+STREAM_ENABLED   = os.environ.get("PP_STREAM", "1") != "0"
+STREAM_CHUNK_MIN = 16 * 1024    # Sayaç bu kadar yeni veri birikince beslenir (her küçük paket için değil)
+
+# <br>, <img> gibi kapanışı olmayan etiketler derinlik yığınına girmez
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+})
+
+# Tek bir başlangıç etiketinden karar verilebilen seçiciler: tag, .class, [attr], [attr='v'] (kombinatorsuz)
+_SIMPLE_SEL = re.compile(r"^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+|\[[\w-]+(?:[*^$]?=['\"]?[^'\"\]]*['\"]?)?\])*)$")
+_SEL_PART   = re.compile(r"\.([\w-]+)|\[([\w-]+)(?:([*^$]?=)['\"]?([^'\"\]]*)['\"]?)?\]")
+
+# ─────────────────────────── Başlangıç Etiketi Eşleyici ──────────────
+class _TagMatcher:
+    __slots__ = ("tag", "classes", "attrs")
+
+    def __init__(self, tag: Optional[str], classes: frozenset, attrs: tuple):
+        self.tag     = tag
+        self.classes = classes
+        self.attrs   = attrs   # (ad, operatör, değer)
+
+    def matches(self, tag: str, attrs: dict) -> bool:
+        if self.tag and tag != self.tag:
+            return False
+        if self.classes and not self.classes.issubset((attrs.get("class") or "").split()):
+            return False
+        for name, op, val in self.attrs:
+            have = attrs.get(name)
+            if have is None:
+                return False
+            if op == "=" and have != val:
+                return False
+            if op == "*=" and val not in have:
+                return False
+            if op == "^=" and not have.startswith(val):
+                return False
+            if op == "$=" and not have.endswith(val):
+                return False
+        return True
+
+def compile_tag_matchers(sel: CompiledSelector) -> list:
+    """Seçici zincirinin İLK parçasını başlangıç etiketi eşleyicisine çevirir.
+
+    Sayaç sadece bu parçayı sayar: safe_select_all zincirde sayfada eşleşen ilk parçayı kullandığı için
+    ilk parçadan N kart görüldüyse çıkarım da o kartları kullanır. Sonraki (genel) parçalar sayılmaz;
+    listeden önce gelen `div.card` gibi bir öneri widget'ı indirmeyi erken kesemez. İlk parça basit
+    değilse (torun seçicisi `ul.list li` gibi) boş liste döner ve o site için erken kesme devre dışı kalır.
+    """
+    if not sel.parts:
+        return []
+    m = _SIMPLE_SEL.match(sel.parts[0])
+    if not m:
+        return []
+    classes, attrs = set(), []
+    for cls, name, op, val in _SEL_PART.findall(m.group(2) or ""):
+        if cls:
+            classes.add(cls)
+        else:
+            attrs.append((name, op or None, val))
+    return [_TagMatcher(m.group(1).lower() if m.group(1) else None, frozenset(classes), tuple(attrs))]
+
+# ─────────────────────────── Artımlı Ürün Kartı Sayacı ───────────────
+class ItemCounter(HTMLParser):
+    """Gövde parça parça beslenirken tamamen kapanmış ürün kartlarını sayar.
+
+    Tam DOM kurmaz; sadece etiket yığını tutar. Kart kapandığında içinde fiyat benzeri
+    bir metin (rakam + TL/₺) görüldüyse geçerli sayılır.
+    """
+
+    _PRICE_HINT = re.compile(r"\d\s*(?:₺|TL)|₺\s*\d", re.IGNORECASE)   # "1.250 TL" ya da "₺1.250"
+
+    def __init__(self, matchers: list):
+        super().__init__(convert_charrefs=False)
+        self.matchers   = matchers
+        self.stack: list[str] = []
+        self.item_depth = -1          # Açık kartın yığındaki derinliği (-1: kart dışında)
+        self.item_has_price = False
+        self.completed  = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        if self.item_depth < 0:
+            attr_map = {k: (v or "") for k, v in attrs}
+            if any(m.matches(tag, attr_map) for m in self.matchers):
+                self.item_depth = len(self.stack)
+                self.item_has_price = False
+        self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            return   # Eşi olmayan kapanış etiketi: yoksay
+        while self.stack:
+            popped = self.stack.pop()
+            if self.item_depth >= 0 and len(self.stack) == self.item_depth:
+                if self.item_has_price:
+                    self.completed += 1
+                self.item_depth = -1
+            if popped == tag:
+                break
+
+    def handle_data(self, data):
+        if self.item_depth >= 0 and not self.item_has_price and self._PRICE_HINT.search(data):
+            self.item_has_price = True
+
+    def handle_entityref(self, name):
+        pass
+
+    def handle_charref(self, name):
+        pass
+
+# ─────────────────────────── Kısmi Yanıt ─────────────────────────────
+class StreamedResponse:
+    """Parça parça okunmuş (gerekirse erken kesilmiş) yanıt; _scrape_one'ın kullandığı alanları taklit eder.
+
+    Gövde ham bayt olarak tutulur; metne çevirme ilk .text erişiminde (ayrıştırma işçisinde) yapılır.
+    """
+    __slots__ = ("status_code", "headers", "body", "charset", "truncated", "bytes_read", "_text")
+
+    def __init__(self, status_code: int, headers, body: bytes, charset: str, truncated: bool, bytes_read: int):
+        self.status_code = status_code
+        self.headers     = headers
+        self.body        = body
+        self.charset     = charset
+        self.truncated   = truncated
+        self.bytes_read  = bytes_read
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.body.decode(self.charset, errors="replace")
+        return self._text
+
+    def json(self):
+        return json.loads(self.text)
+
+_CHARSET      = re.compile(r"charset=([\w-]+)", re.IGNORECASE)
+# <meta charset="..."> ve <meta http-equiv="Content-Type" content="text/html; charset=..."> ikisini de yakalar
+_META_CHARSET = re.compile(rb"<meta\b[^>]*?charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+SNIFF_BYTES   = 4096    # Tarayıcılar gibi: <meta> sadece gövdenin başında aranır
+# Tarayıcıların (WHATWG) etiket eşlemesi: "iso-8859-9" diyen Türkçe sayfalar aslında windows-1254 gönderir
+_CHARSET_ALIASES = {
+    "iso-8859-9": "windows-1254", "iso8859-9": "windows-1254", "latin5": "windows-1254",
+    "iso-8859-1": "windows-1252", "iso8859-1": "windows-1252", "latin1": "windows-1252", "us-ascii": "windows-1252",
+}
+
+def _valid_charset(label) -> Optional[str]:
+    if not label:
+        return None
+    if isinstance(label, bytes):
+        label = label.decode("ascii", "ignore")
+    label = _CHARSET_ALIASES.get(label.lower(), label)
+    try:
+        codecs.lookup(label)
+        return label
+    except LookupError:
+        return None
+
+def meta_charset(head: bytes) -> Optional[str]:
+    """Gövdenin ilk SNIFF_BYTES baytındaki <meta> charset bildirimi (yoksa ya da tanınmıyorsa None)."""
+    m = _META_CHARSET.search(head[:SNIFF_BYTES])
+    return _valid_charset(m.group(1)) if m else None
+
+def header_charset(headers) -> Optional[str]:
+    m = _CHARSET.search(headers.get("content-type", "") or "")
+    return _valid_charset(m.group(1)) if m else None
+
+def charset_of(headers, head: bytes = b"", fallback: Optional[str] = None) -> str:
+    """Content-Type'taki charset; yoksa gövde başındaki <meta>; o da yoksa `fallback` ya da utf-8."""
+    return header_charset(headers) or meta_charset(head) or _valid_charset(fallback) or "utf-8"
+
+async def read_limited(chunks: AsyncIterator[bytes], charset: Optional[str], max_bytes: int,
+                       matchers: list, want_items: int) -> tuple[bytes, bool, int]:
+    """Gövdeyi okur; bayt bütçesi dolunca ya da `want_items` geçerli kart kapanınca durur.
+
+    (ham gövde, kesildi mi, okunan bayt) döner. Kesme kararı çağıranın bağlantıyı kapatmasıyla tamamlanır.
+    Metne çevirme sadece kart sayacı için (erken kesme açıksa) burada yapılır. `charset` None ise (başlıkta
+    yok) ilk SNIFF_BYTES bayt gelince <meta>'dan belirlenir; çağıran aynısını charset_of(başlıklar, gövde) ile bulur.
+    """
+    counter = ItemCounter(matchers) if (matchers and want_items > 0) else None
+    decoder = None
+    parts: list[bytes] = []
+    pending = ""
+    read = 0
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        read += len(chunk)
+        parts.append(chunk)
+
+        if read >= max_bytes:
+            return b"".join(parts), True, read
+
+        if counter is not None:
+            if decoder is None:
+                if read < SNIFF_BYTES:
+                    continue
+                head = b"".join(parts)
+                decoder = codecs.getincrementaldecoder(charset or meta_charset(head) or "utf-8")(errors="replace")
+                pending += decoder.decode(head)
+            else:
+                pending += decoder.decode(chunk)
+            if len(pending) >= STREAM_CHUNK_MIN:
+                counter.feed(pending)
+                pending = ""
+                if counter.completed >= want_items:
+                    return b"".join(parts), True, read
+
+    return b"".join(parts), False, read
@@ -0,0 +1,16 @@
+import os
+import sys
+
+# Testler depo kökündeki modülleri (scraper, strategies...) doğrudan import eder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Diske dokunmayan motor: paylaşımlı katman, fiyat indeksi ve yanıt kaydı kapalı."""
+    import scraper
+    monkeypatch.setattr(scraper, "open_shared_cache", lambda: None)
+    monkeypatch.setattr(scraper, "open_index", lambda: None)
+    monkeypatch.setattr(scraper, "open_capture_store", lambda: None)
+    return scraper.ScraperEngine()
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.index as app_module
+from admission import REJECT_QUEUE_FULL, REJECT_QUEUE_TIMEOUT, AdmissionController, AdmissionRejected
+
+client = TestClient(app_module.app)
+
+def test_full_queue_is_rejected_immediately():
+    ctl = AdmissionController(max_active=1, per_host=1, max_queue=1, queue_wait_s=5.0)
+
+    async def hold(release: asyncio.Event):
+        async with ctl.slot("example.com"):
+            await release.wait()
+
+    async def run():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(release))
+        queued = asyncio.ensure_future(hold(release))
+        await asyncio.sleep(0)
+        assert ctl.active == 1 and ctl.waiting == 1 and ctl.saturated()
+        # Kuyruk dolu: beklemeden ret
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with ctl.slot("example.com"):
+                pass
+        release.set()
+        await asyncio.gather(holder, queued)
+        return rejected.value
+
+    rejected = asyncio.run(run())
+    assert rejected.reason == REJECT_QUEUE_FULL
+    assert rejected.retry_after_s >= 1
+    assert ctl.stats()["admitted"] == 2 and ctl.stats()["rejected"][REJECT_QUEUE_FULL] == 1
+
+def test_queued_scan_gives_up_at_the_search_deadline():
+    ctl = AdmissionController(max_active=1, per_host=1, max_queue=4, queue_wait_s=5.0)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold():
+            async with ctl.slot("example.com"):
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        deadline = asyncio.get_running_loop().time() + 0.05
+        try:
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with ctl.slot("example.com", deadline):
+                    pass
+        finally:
+            release.set()
+            await holder
+        return rejected.value
+
+    assert asyncio.run(run()).reason == REJECT_QUEUE_TIMEOUT
+    assert ctl.waiting == 0
+
+def test_search_answers_503_with_retry_after_when_queue_is_full(monkeypatch):
+    # Kuyruk dolu ve önbellekte/indekste hiçbir şey yok: canlı taramaya girmeden hızlı 503
+    monkeypatch.setattr(app_module.engine.admission, "saturated", lambda: True)
+    r = client.get("/api/search", params={"q": "yoğunluk testi zq9x7"})
+    assert r.status_code == 503
+    assert int(r.headers["Retry-After"]) >= 1
+    assert r.headers["Cache-Control"] == "no-store"
+    assert r.json()["status"] == "busy"
@@ -0,0 +1,39 @@
+from aggregate import Aggregator, aggregate
+from scraper import SITES, SearchResult
+
+N11 = next(c for c in SITES if c.name == "n11")
+HB = next(c for c in SITES if c.name == "Hepsiburada")
+
+def _search_url(cfg, query: str = "fren+balatasi") -> str:
+    return cfg.base_search_url.replace("{query}", query)
+
+def _fallback(cfg, price: float, seller: str = "") -> SearchResult:
+    url = _search_url(cfg)
+    return SearchResult(cfg.name, True, part_name=f"Hassas Fiyat Yakalama{seller}", price_str=f"{price} ₺", price_numeric=price, url=url)
+
+def test_fallback_rows_are_not_grouped_or_deduplicated():
+    results = [_fallback(N11, 310.0), _fallback(N11, 450.0), _fallback(N11, 980.0), _fallback(HB, 320.0)]
+    groups = aggregate(results)
+    # Her yer tutucu satır kendi grubunda, hiçbiri düşmedi
+    assert len(groups) == 4
+    assert sorted(i for g in groups for i in g["offers"]) == [0, 1, 2, 3]
+    assert all(g["offer_count"] == 1 for g in groups)
+
+def test_search_url_offers_dedup_by_site_name_and_price():
+    # Kart stratejisi göreli href çözemeyince URL arama sayfası kalır: farklı fiyatlar ayrı teklif
+    url = _search_url(N11)
+    a = SearchResult("n11", True, part_name="Bosch 0986494524 Fren Balatası", price_numeric=500.0, url=url)
+    b = SearchResult("n11", True, part_name="Bosch 0986494524 Fren Balatası", price_numeric=620.0, url=url)
+    agg = Aggregator()
+    agg.add([a, b, a])   # a ikinci kez (önbellek + canlı) geldi
+    (group,) = agg.to_list()
+    assert group["offer_count"] == 2
+    assert group["offers"] == [0, 1]
+
+def test_product_url_offers_still_dedup_by_url():
+    url = "https://www.n11.com/urun/bosch-balata-123"
+    a = SearchResult("n11", True, part_name="Bosch 0986494524 Fren Balatası", price_numeric=500.0, url=url)
+    b = SearchResult("n11", True, part_name="BOSCH 0 986 494 524 Ön Balata", price_numeric=480.0, url=url)
+    (group,) = aggregate([a, b])
+    assert group["offer_count"] == 1
+    assert group["price_numeric"] == 480.0
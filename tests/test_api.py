@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+
+import api.index as app_module
+from scraper import BATCH_MAX_QUERIES
+
+client = TestClient(app_module.app)
+
+def test_batch_with_too_many_queries_is_rejected_with_4xx():
+    r = client.post("/api/search/batch", json={"queries": [f"parça {i}" for i in range(BATCH_MAX_QUERIES + 1)]})
+    assert r.status_code == 413
+    assert r.json()["status"] == "error"
+
+def test_batch_with_invalid_body_is_rejected_with_4xx():
+    r = client.post("/api/search/batch", json={"queries": "fren balatası"})
+    assert r.status_code == 422
+
+def test_image_with_bad_signature_redirects_to_placeholder():
+    r = client.get("/api/img", params={"u": "https://cdn.example.com/a.jpg", "s": "0" * 16}, follow_redirects=False)
+    assert r.status_code == 302
+    assert r.headers["location"] == app_module.PLACEHOLDER_IMAGE
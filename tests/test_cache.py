@@ -0,0 +1,68 @@
+import asyncio
+
+import cache
+import scraper
+from cache import CACHE_FRESH, CACHE_MISS, CACHE_STALE, ResultCache
+from querynorm import normalize_query
+from scraper import SITES, SearchResult
+
+CFG = SITES[0]
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_entry_is_fresh_then_stale_then_dropped(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    c = ResultCache(default_ttl_s=10, stale_s=20)
+    c.set("k", "v")
+    assert c.get("k") == ("v", CACHE_FRESH)
+    clock.now += 15
+    assert c.get("k") == ("v", CACHE_STALE)
+    assert c.ttl_left("k") == 0.0
+    clock.now += 20
+    assert c.get("k") == (None, CACHE_MISS)
+    assert len(c) == 0
+    assert c.stats()["hits"] == 1 and c.stats()["stale_hits"] == 1 and c.stats()["misses"] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    c = ResultCache(max_entries=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")          # "b" artık en eskisi
+    c.set("c", 3)
+    assert c.get("b") == (None, CACHE_MISS)
+    assert c.get("a") == (1, CACHE_FRESH)
+    assert c.stats()["evictions"] == 1
+
+def _result(price: float) -> list[SearchResult]:
+    return [SearchResult(CFG.name, True, part_name="Bosch Fren Balatası", price_str=f"{price:.2f} TL",
+                         price_numeric=price, url="https://example.com/p/1")]
+
+def test_stale_result_is_served_then_refreshed(engine, monkeypatch):
+    calls = []
+
+    async def fake_scrape(cfg, query, *args, **kwargs):
+        calls.append(query)
+        return _result(1100.0)
+    monkeypatch.setattr(scraper, "_scrape_one_with_limit", fake_scrape)
+
+    async def run():
+        key = (CFG.name, normalize_query("fren balatası"))
+        engine.cache.set(key, _result(1000.0), ttl_s=0, stale_s=600)
+        # Bayat sonuç beklemeden döner, tazeleme arkada
+        served = await engine._search_site(CFG, "fren balatası", {})
+        assert served[0].price_numeric == 1000.0
+        await asyncio.gather(*list(engine._bg_tasks))
+        cached, state = engine.cache.get(key)
+        await engine.close()
+        return cached, state
+
+    cached, state = asyncio.run(run())
+    assert calls == ["fren balatası"]
+    assert state == CACHE_FRESH
+    assert cached[0].price_numeric == 1100.0
@@ -0,0 +1,77 @@
+import health
+from health import (BREAKER_CLOSED, BREAKER_COOLDOWN_S, BREAKER_HALF_OPEN, BREAKER_OPEN, BREAKER_THRESHOLD,
+                    HealthTracker)
+
+SITE = "Trendyol"
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def _state(tracker: HealthTracker, layer: str) -> str:
+    return tracker.stats()[SITE][layer]["state"]
+
+def _trip(tracker: HealthTracker, layer: str):
+    for _ in range(BREAKER_THRESHOLD):
+        tracker.record(SITE, layer, False, 1.0)
+
+def test_breaker_opens_half_opens_and_closes(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(health.time, "monotonic", clock)
+    tracker = HealthTracker()
+    _trip(tracker, "curl")
+    assert _state(tracker, "curl") == BREAKER_OPEN
+    assert tracker.plan(SITE, ["curl", "httpx"]) == ["httpx"]
+
+    # Bekleme dolunca tek bir yoklamaya izin verilir
+    clock.now += BREAKER_COOLDOWN_S
+    assert "curl" in tracker.plan(SITE, ["curl", "httpx"])
+    assert _state(tracker, "curl") == BREAKER_HALF_OPEN
+    assert "curl" not in tracker.plan(SITE, ["curl", "httpx"])
+
+    tracker.record(SITE, "curl", True, 0.5)
+    assert _state(tracker, "curl") == BREAKER_CLOSED
+    assert "curl" in tracker.plan(SITE, ["curl", "httpx"])
+
+def test_failed_probe_doubles_the_cooldown(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(health.time, "monotonic", clock)
+    tracker = HealthTracker()
+    _trip(tracker, "curl")
+    clock.now += BREAKER_COOLDOWN_S
+    tracker.plan(SITE, ["curl"])
+    tracker.record(SITE, "curl", False, 1.0)
+    assert _state(tracker, "curl") == BREAKER_OPEN
+    assert tracker.stats()[SITE]["curl"]["retry_in_s"] == 2 * BREAKER_COOLDOWN_S
+    clock.now += BREAKER_COOLDOWN_S
+    assert tracker.plan(SITE, ["curl"]) == []
+
+def test_released_probe_can_be_retried(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(health.time, "monotonic", clock)
+    tracker = HealthTracker()
+    _trip(tracker, "curl")
+    clock.now += BREAKER_COOLDOWN_S
+    assert tracker.plan(SITE, ["curl"]) == ["curl"]
+    # Hedge kaybeden yoklama iptal edildi: hak geri verilir
+    tracker.release(SITE, "curl")
+    assert tracker.plan(SITE, ["curl"]) == ["curl"]
+
+def test_site_is_down_only_when_every_layer_is_open():
+    tracker = HealthTracker()
+    _trip(tracker, "curl")
+    assert not tracker.site_down(SITE, ["curl", "httpx"])
+    _trip(tracker, "httpx")
+    assert tracker.site_down(SITE, ["curl", "httpx"])
+    assert tracker.plan(SITE, ["curl", "httpx"]) == []
+
+def test_faster_layer_is_tried_first_and_costly_layer_last():
+    tracker = HealthTracker()
+    for _ in range(5):
+        tracker.record(SITE, "curl", True, 2.0)
+        tracker.record(SITE, "httpx", True, 0.3)
+        tracker.record(SITE, "scraperapi", True, 0.1)
+    assert tracker.plan(SITE, ["curl", "httpx", "scraperapi"], costly=("scraperapi",)) == ["httpx", "curl", "scraperapi"]
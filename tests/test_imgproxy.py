@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import imgproxy
+from imgproxy import ImageFetchError, ImageProxy, proxy_url, verify
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+
+@pytest.fixture
+def fresh_secret(tmp_path, monkeypatch):
+    monkeypatch.setattr(imgproxy, "IMG_SECRET", "")
+    monkeypatch.setattr(imgproxy, "IMG_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(imgproxy, "_secret", None)
+    return tmp_path
+
+def test_unsigned_urls_are_refused_without_configured_secret(fresh_secret):
+    src = "https://cdn.example.com/a.jpg"
+    assert not verify(src, "")
+    assert not verify(src, "0" * 16)
+    signed = proxy_url(src)
+    assert "&s=" in signed
+    assert verify(src, signed.rsplit("&s=", 1)[1])
+    # Aynı makinedeki diğer işçiler aynı anahtarı okur
+    key = (fresh_secret / "secret").read_text()
+    imgproxy._secret = None
+    assert (fresh_secret / "secret").read_text() == key
+    assert verify(src, signed.rsplit("&s=", 1)[1])
+
+def test_multi_instance_without_secret_serves_raw_urls(fresh_secret, monkeypatch):
+    # Vercel'de örnek başına anahtar başka örnekte 403 olurdu: vekil hiç kullanılmaz
+    monkeypatch.setattr(imgproxy, "IMG_SIGNING", False)
+    src = "https://cdn.example.com/a.jpg"
+    assert proxy_url(src) == src
+    assert not verify(src, "0" * 16)
+    # Örneğe özel anahtar da üretilmez
+    assert not (fresh_secret / "secret").exists()
+
+class _Handler(BaseHTTPRequestHandler):
+    seen_hosts: list = []
+
+    def do_GET(self):
+        _Handler.seen_hosts.append(self.headers["Host"])
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(PNG)))
+        self.end_headers()
+        self.wfile.write(PNG)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def image_server():
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+
+def test_fetch_connects_to_the_checked_address(image_server, monkeypatch):
+    """Ad bir kez çözülür ve denetlenen IP'ye bağlanılır; httpx adı yeniden çözmez (DNS rebinding)."""
+    monkeypatch.setattr(imgproxy, "IMG_ALLOW_PRIVATE", False)
+    resolved = []
+
+    async def fake_getaddrinfo(host, port, type=0):
+        resolved.append(host)
+        if len(resolved) > 1:
+            return [(2, 1, 6, "", ("10.0.0.1", port))]   # İkinci çözümleme iç ağa dönerdi
+        return [(2, 1, 6, "", ("93.184.216.34", port))]
+
+    proxy = ImageProxy()
+
+    async def run():
+        proxy._check_loop()
+        monkeypatch.setattr(proxy._loop, "getaddrinfo", fake_getaddrinfo)
+        # Testte "global" adres yerel sunucuya yönlensin: sadece bağlanılan IP'yi değiştir
+        real_resolve = proxy._resolve
+
+        async def resolve(host, port):
+            assert await real_resolve(host, port) == "93.184.216.34"
+            return "127.0.0.1"
+
+        monkeypatch.setattr(proxy, "_resolve", resolve)
+        try:
+            return await proxy._fetch(f"http://images.invalid:{image_server}/a.png")
+        finally:
+            await proxy.close()
+
+    assert asyncio.run(run()) == PNG
+    assert resolved == ["images.invalid"]
+    assert _Handler.seen_hosts[-1] == f"images.invalid:{image_server}"
+
+def test_private_address_is_refused(monkeypatch):
+    monkeypatch.setattr(imgproxy, "IMG_ALLOW_PRIVATE", False)
+    proxy = ImageProxy()
+
+    async def run():
+        proxy._check_loop()
+        return await proxy._fetch("http://127.0.0.1:9/a.png")
+
+    with pytest.raises(ImageFetchError):
+        asyncio.run(run())
@@ -0,0 +1,16 @@
+import pytest
+
+from bench.parity import available_backends, check_page, extract, iter_pages
+from scraper import SITES
+
+BACKENDS = available_backends()
+PAGES = list(iter_pages())
+
+@pytest.mark.skipif(len(BACKENDS) < 2, reason="en az iki ayrıştırıcı arka ucu gerekli")
+@pytest.mark.parametrize("site,page,body,ctype", PAGES, ids=[p[1] for p in PAGES])
+def test_backends_extract_identical_results(site, page, body, ctype):
+    cfg = next(c for c in SITES if c.name == site)
+    # Eşitlik boş sonuçlarda anlamsız: her kayıtlı sayfa en az bir fiyat vermeli
+    found, winner = extract(BACKENDS[0], site, body, ctype, list(cfg.extractors))
+    assert winner is not None and any(r.success for r in found)
+    assert check_page(site, body, ctype, BACKENDS) == []
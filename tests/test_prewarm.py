@@ -0,0 +1,32 @@
+import asyncio
+
+from prewarm import OutboundBudget, PreWarmer, QueryTracker
+
+class FakeEngine:
+    def __init__(self):
+        self.searched: list[str] = []
+
+    def due_sites(self, query: str, within_s: float) -> int:
+        return 1
+
+    async def search_all(self, query: str, refresh_within_s: float = 0.0, cached_only: bool = False):
+        self.searched.append(query)
+        return []
+
+def test_prewarm_sends_raw_query_not_normalized_key():
+    tracker = QueryTracker()
+    tracker.hit("Bosch 0 986 494 524  Fren Balatası")
+    tracker.hit("BOSCH 0986494524 fren balatasi")   # Aynı anahtar, farklı yazım
+    engine = FakeEngine()
+    warmer = PreWarmer(engine, tracker, budget=OutboundBudget(100), windows="")
+    assert asyncio.run(warmer.run_once()) == 1
+    assert engine.searched == ["Bosch 0 986 494 524 Fren Balatası"]
+
+def test_saved_state_keeps_raw_query(tmp_path):
+    path = str(tmp_path / "queries.json")
+    tracker = QueryTracker()
+    tracker.hit("Fiat Egea Triger Seti")
+    tracker.save(path)
+    loaded = QueryTracker()
+    assert loaded.load(path)
+    assert [q for q, _ in loaded.top(5)] == ["Fiat Egea Triger Seti"]
@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+import priceindex
+from priceindex import PriceIndex, fts_query
+from scraper import SearchResult
+
+URL = "https://example.com/p/bosch-balata"
+
+@pytest.fixture
+def index(tmp_path):
+    try:
+        idx = PriceIndex(str(tmp_path / "prices.db"))
+    except sqlite3.Error as e:
+        pytest.skip(f"SQLite FTS5 yok: {e}")
+    yield idx
+    idx.close()   # Test zaten kapattıysa yazıcı durmuştur, no-op
+
+def _offer(price: float) -> SearchResult:
+    return SearchResult("Trendyol", True, part_name="Bosch Ön Fren Balatası", price_str=f"{price:.0f} TL",
+                        price_numeric=price, url=URL)
+
+def test_fts_query_uses_the_canonical_key():
+    assert fts_query("Fren  BALATASI") == '"fren"* "balatasi"*'
+
+def test_lookup_finds_recorded_offer_by_any_spelling(index):
+    index.record("Trendyol", "fren balatasi", [_offer(1000), SearchResult("Trendyol", False, error_msg="Engel")])
+    index.record("Trendyol", "fren balatasi", [_offer(950)])
+    # close() kuyruktaki yazmaları bitirir; okumalar kendi bağlantısıyla devam eder
+    index.close()
+    rows = index.lookup("Trendyol", "FREN BALATASI")
+    assert [r["price_numeric"] for r in rows] == [950]
+    # Önek eşleşmesi ve başka site filtresi
+    assert index.lookup("Trendyol", "bal")
+    assert index.lookup("n11", "fren balatası") == []
+    assert index.stats()["written"] == 2
+
+def test_history_collapses_repeated_prices(index, monkeypatch):
+    clock = iter([100.0, 200.0, 300.0])
+    monkeypatch.setattr(priceindex.time, "time", lambda: next(clock, 400.0))
+    for price in (1000, 1000, 950):
+        index.record("Trendyol", "fren balatasi", [_offer(price)])
+    index.close()
+    points = index.history(URL)
+    assert [(p["first_seen"], p["last_seen"], p["price_numeric"]) for p in points] == [(100.0, 200.0, 1000), (300.0, 300.0, 950)]
+
+def test_old_observations_are_not_returned(index, monkeypatch):
+    index.record("Trendyol", "fren balatasi", [_offer(1000)])
+    index.close()
+    assert index.lookup("Trendyol", "fren balatasi", max_age_s=3600)
+    monkeypatch.setattr(priceindex.time, "time", lambda: 10 ** 10)
+    assert index.lookup("Trendyol", "fren balatasi", max_age_s=3600) == []
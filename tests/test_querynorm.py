@@ -0,0 +1,28 @@
+import pytest
+
+from querynorm import canonicalize_part_numbers, fold_turkish, normalize_query
+
+def test_turkish_case_and_letters_fold_to_ascii():
+    assert fold_turkish("FREN BALATASI") == "fren balatasi"
+    assert fold_turkish("Fren Balatası") == "fren balatasi"
+    # str.lower() "İ"'ye fazladan nokta ekler, "I"'yı "i" yapar
+    assert fold_turkish("İTALYAN ŞANZIMAN YAĞI") == "italyan sanziman yagi"
+    assert fold_turkish("Çekiç Göğüs Üçgen") == "cekic gogus ucgen"
+
+@pytest.mark.parametrize("query", ["Fren Balatası", "FREN  BALATASI", "fren balatasi", " fren, balatası! "])
+def test_spellings_share_one_key(query):
+    assert normalize_query(query) == "fren balatasi"
+
+@pytest.mark.parametrize("query, key", [
+    ("1K0 698 151", "1k0698151"),
+    ("1k0-698-151", "1k0698151"),
+    ("5Q0.615.301", "5q0615301"),
+    ("Bosch 0 986 494 524 Fren Balatası", "bosch 0986494524 fren balatasi"),
+    ("04465-02220 balata", "0446502220 balata"),
+])
+def test_part_numbers_are_canonicalized(query, key):
+    assert normalize_query(query) == key
+
+@pytest.mark.parametrize("text", ["bmw e90 320d", "mercedes w204 c180", "egea 2012 2016", "fren-balata"])
+def test_model_names_and_years_are_not_joined(text):
+    assert canonicalize_part_numbers(text) == text
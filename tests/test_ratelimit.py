@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+import ratelimit
+from ratelimit import DomainRateLimiter, TokenBucket
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", c)
+    return c
+
+def test_burst_then_queue_then_refill(clock):
+    bucket = TokenBucket(rate=2.0, burst=3)
+    assert [bucket.reserve()[0] for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Kova boş: sıradaki istekler dolum hızıyla bekler (FIFO)
+    assert bucket.reserve()[0] == pytest.approx(0.5)
+    assert bucket.reserve()[0] == pytest.approx(1.0)
+    # Zaman geçince tokenlar geri gelir, burst'ü aşmaz
+    clock.now += 100
+    assert bucket.reserve() == (0.0, 1.0)
+
+def test_idle_domain_goes_out_immediately(clock):
+    limiter = DomainRateLimiter(rate=1.0, burst=4)
+
+    async def run():
+        return [await limiter.acquire("example.com") for _ in range(2)]
+
+    assert asyncio.run(run()) == [0.0, 0.0]
+    assert limiter.stats()["immediate"] == 2
+    assert limiter.stats()["tokens"]["example.com"] == 2.0
+
+def test_cancelled_wait_refunds_its_token(clock, monkeypatch):
+    monkeypatch.setattr(ratelimit, "RL_JITTER_MAX_S", 0.0)
+    limiter = DomainRateLimiter(rate=0.1, burst=1)
+
+    async def run():
+        await limiter.acquire("example.com")
+        waiter = asyncio.ensure_future(limiter.acquire("example.com"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(run())
+    # İptal edilen istek kovadan token yemez
+    assert limiter.stats()["tokens"]["example.com"] == 0.0
+
+def test_site_override_has_its_own_bucket(clock):
+    limiter = DomainRateLimiter(rate=4.0, burst=8)
+    limiter.configure("slow.example.com", rate=0.5, burst=1)
+    assert limiter._bucket("slow.example.com").burst == 1
+    assert limiter._bucket("example.com").burst == 8
@@ -0,0 +1,53 @@
+import asyncio
+
+from scheduler import HedgedScheduler
+from scraper import PARSE_BACKLOG_ERROR, SearchResult, _is_final, _is_local_overload
+
+class RecordingHealth:
+    def __init__(self):
+        self.records: list[tuple[str, bool]] = []
+        self.released: list[str] = []
+
+    def latencies(self, site, layer):
+        return []
+
+    def record(self, site, layer, ok, latency_s):
+        self.records.append((layer, ok))
+
+    def release(self, site, layer):
+        self.released.append(layer)
+
+def _layer(name: str, results: list[SearchResult]):
+    async def run(remaining: float):
+        return results
+    return name, run
+
+def _run(layers):
+    health = RecordingHealth()
+    sched = HedgedScheduler(health)
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        return await sched.run("n11", layers, loop.time() + 5, _is_final, _is_local_overload)
+
+    return sched, health, asyncio.run(go())
+
+def test_parse_backlog_is_not_a_final_result():
+    assert not _is_final([SearchResult("n11", False, error_msg=PARSE_BACKLOG_ERROR)])
+
+def test_parse_backlog_moves_on_without_a_win_or_layer_failure():
+    backlog = [SearchResult("n11", False, error_msg=PARSE_BACKLOG_ERROR)]
+    ok = [SearchResult("n11", True, part_name="Bosch Balata", price_numeric=500.0)]
+    sched, health, (res, winner, _) = _run([_layer("curl", backlog), _layer("httpx", ok)])
+    assert winner == "httpx" and res == ok
+    assert sched.wins == {"httpx": 1}
+    # Kendi kuyruğumuzun dolması katmanın sağlığına başarısızlık olarak yazılmaz
+    assert health.records == [("httpx", True)]
+    assert "curl" in health.released
+
+def test_backlog_on_every_layer_returns_error_without_win():
+    backlog = [SearchResult("n11", False, error_msg=PARSE_BACKLOG_ERROR)]
+    sched, health, (res, _winner, _) = _run([_layer("curl", backlog), _layer("httpx", backlog)])
+    assert res == backlog
+    assert sched.wins == {}
+    assert health.records == []
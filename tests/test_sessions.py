@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sessions import SessionPool, curl_cffi_available
+
+class _KeepAlive(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def keepalive_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAlive)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+def test_sessions_of_a_finished_loop_are_closed(keepalive_url):
+    pool = SessionPool()
+
+    async def first():
+        client = pool.httpx_client("example.com")
+        await client.get(keepalive_url)
+        session = None
+        if curl_cffi_available():
+            session = pool.curl_session("example.com")
+            await session.get(keepalive_url)
+        return client, session
+
+    client, session = asyncio.run(first())
+    stream = client._transport._pool.connections[0]._connection._network_stream
+    sock = stream.get_extra_info("socket")
+    assert sock.fileno() != -1
+
+    async def second():
+        return pool.httpx_client("example.com")
+
+    # Yeni loop: eski istemci bırakılmadan önce bağlantıları kapatılır
+    assert asyncio.run(second()) is not client
+    assert sock.fileno() == -1
+    if session is not None:
+        assert session.acurl._curlm is None
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from health import BREAKER_THRESHOLD, HealthTracker
+from sessions import CookieJar
+from sharedcache import NS_COOKIES, NS_HEALTH, NS_RESULTS, SQLiteSharedCache, _dumps
+
+def _eventually(fn, timeout: float = 3.0):
+    """Yazmalar arka plandaki yazıcı thread'de: sonuç görünene kadar bekle."""
+    deadline = time.monotonic() + timeout
+    while True:
+        value = fn()
+        if value or time.monotonic() > deadline:
+            return value
+        time.sleep(0.01)
+
+@pytest.fixture
+def shared(tmp_path):
+    cache = SQLiteSharedCache(path=str(tmp_path / "shared.db"))
+    yield cache
+    cache.close()
+
+def test_set_get_and_ttl(shared):
+    shared.set(NS_RESULTS, "n11\tfren balatasi", {"results": [1, 2]}, ttl_s=60)
+    shared.set(NS_RESULTS, "kisa", {"x": 1}, ttl_s=0.05)
+    assert _eventually(lambda: shared.get(NS_RESULTS, "n11\tfren balatasi")) == {"results": [1, 2]}
+    time.sleep(0.1)
+    assert shared.get(NS_RESULTS, "kisa") is None
+
+def test_delete_and_scan(shared):
+    shared.set(NS_HEALTH, "n11\thttpx", {"until": time.time() + 30}, 30)
+    shared.set(NS_HEALTH, "HB\tcurl", {"until": time.time() + 30}, 30)
+    assert len(_eventually(lambda: len(shared.scan(NS_HEALTH)) == 2 and shared.scan(NS_HEALTH))) == 2
+    shared.delete(NS_HEALTH, "HB\tcurl")
+    assert _eventually(lambda: list(shared.scan(NS_HEALTH)) == ["n11\thttpx"])
+
+def test_other_worker_sees_writes_as_cross_hits(shared, tmp_path):
+    other = SQLiteSharedCache(path=str(tmp_path / "shared.db"))
+    try:
+        # Yazıcı thread'i atlayıp doğrudan başka bir pid ile yaz (ayrı işçi süreci gibi)
+        other.pid = -1
+        value = {"cookies": {"a": "1"}, "expires_at": time.time() + 60}
+        other._apply([("set", NS_COOKIES, "https://www.n11.com", _dumps(value), time.time() + 60)], time.time())
+        assert shared.get(NS_COOKIES, "https://www.n11.com") == value
+        assert (shared.hits, shared.cross_hits) == (1, 1)
+    finally:
+        other.pid = shared.pid
+        other.close()
+
+# ─── Event loop'ta paylaşımlı okuma yapılmamalı ───
+class ThreadCheckingShared:
+    """Okumaların hangi thread'den geldiğini kaydeden sahte paylaşımlı katman."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.read_threads: list[int] = []
+
+    def get(self, ns, key):
+        self.read_threads.append(threading.get_ident())
+        return self.data.get((ns, key))
+
+    def scan(self, ns):
+        self.read_threads.append(threading.get_ident())
+        return {k: v for (n, k), v in self.data.items() if n == ns}
+
+    def set(self, ns, key, value, ttl_s):
+        self.data[(ns, key)] = value
+
+    def delete(self, ns, key):
+        self.data.pop((ns, key), None)
+
+def test_cookie_jar_reads_shared_layer_off_the_loop():
+    domain = "https://www.n11.com"
+    fake = ThreadCheckingShared({(NS_COOKIES, domain): {"cookies": {"cf_clearance": "x"}, "expires_at": time.time() + 60}})
+    jar = CookieJar(shared=fake)
+    assert jar.get(domain) is None and fake.read_threads == []   # Senkron yol sadece bellek
+
+    async def run():
+        await jar.load_shared(domain)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert fake.read_threads and loop_thread not in fake.read_threads
+    assert jar.get(domain) == {"cf_clearance": "x"}
+    assert jar.pop_imported(domain) == {"cf_clearance": "x"}
+
+def test_health_reads_remote_breakers_off_the_loop():
+    fake = ThreadCheckingShared({(NS_HEALTH, "n11\thttpx"): {"until": time.time() + 30}})
+    health = HealthTracker(shared=fake)
+    assert health.plan("n11", ["curl", "httpx"]) == ["curl", "httpx"]   # Henüz okunmadı, plan okumaz
+    assert fake.read_threads == []
+
+    async def run():
+        await health.refresh_remote()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert fake.read_threads and loop_thread not in fake.read_threads
+    assert health.plan("n11", ["curl", "httpx"]) == ["curl"]
+
+def test_opened_breaker_is_published():
+    fake = ThreadCheckingShared({})
+    health = HealthTracker(shared=fake)
+    for _ in range(BREAKER_THRESHOLD):
+        health.record("n11", "httpx", False, 0.1)
+    assert fake.data[(NS_HEALTH, "n11\thttpx")]["until"] > time.time()
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+import scraper
+from scraper import SITES, SearchResult
+from singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "sonuç"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["sonuç"] * 10
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "started": 1, "coalesced": 9}
+
+def test_error_reaches_every_waiter_and_next_call_retries():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("engellendi")
+
+    async def ok():
+        return "tamam"
+
+    async def run():
+        got = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(e, RuntimeError) for e in got)
+        # Hatalı uçuş unutulur, sonraki çağrı yeniden dener
+        return await flight.do("k", ok)
+
+    assert asyncio.run(run()) == "tamam"
+
+def test_one_waiter_cancelling_does_not_cancel_the_call():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "sonuç"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "sonuç"
+
+def test_engine_fetches_once_for_concurrent_identical_searches(engine, monkeypatch):
+    cfg = SITES[0]
+    calls = 0
+
+    async def fake_scrape(cfg, query, *args, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return [SearchResult(cfg.name, True, part_name="Fren Balatası", price_str="1.000 TL", price_numeric=1000.0)]
+    monkeypatch.setattr(scraper, "_scrape_one_with_limit", fake_scrape)
+
+    async def run():
+        # Farklı yazımlar aynı normalize anahtara düşer
+        queries = ["Fren Balatası", "fren balatasi", "FREN  BALATASI"] * 4
+        got = await asyncio.gather(*(engine._search_site(cfg, q, {}) for q in queries))
+        await engine.close()
+        return got
+
+    got = asyncio.run(run())
+    assert calls == 1
+    assert all(r[0].price_numeric == 1000.0 for r in got)
@@ -0,0 +1,40 @@
+from bench.fixtures import build_page
+from scraper import SITES, _extract_job
+from sessions import base_domain
+from strategies import StrategyPlanner
+
+SITE = "OnlineYedekParca"
+CFG = next(c for c in SITES if c.name == SITE)
+
+def _run(planner: StrategyPlanner, body: bytes, ctype: str):
+    order = planner.order(SITE, CFG.extractors)
+    found, winner, missed, _ = _extract_job((SITE, CFG.base_search_url, base_domain(CFG.base_search_url), ctype, body, "utf-8", order))
+    planner.record(SITE, winner, missed)
+    return order, winner
+
+def test_regex_win_does_not_take_the_lead():
+    planner = StrategyPlanner()
+    # Kart yok, sadece düz fiyat: son çare kazanır
+    plain = "<html><body><p>Fren Balatası 1.250,00 TL</p><p>Fren Diski 2.100,00 TL</p></body></html>".encode()
+    order, winner = _run(planner, plain, "text/html; charset=utf-8")
+    assert winner == "regex_fallback"
+
+    # Sonraki sayfa gerçek kartlar içeriyor: kartlar yine regex'ten önce denenmeli ve kazanmalı
+    body, ctype = build_page(SITE, size_kb=40)
+    order, winner = _run(planner, body, ctype)
+    assert order[-1] == "regex_fallback"
+    assert order.index("cards") < order.index("regex_fallback")
+    assert winner == "cards"
+
+def test_regex_stays_last_and_structured_are_never_skipped_for_it():
+    planner = StrategyPlanner()
+    planner.record(SITE, "cards", ["ldjson"])
+    for _ in range(20):
+        planner.record(SITE, "regex_fallback", ["cards", "ldjson"])
+    assert planner.order(SITE, CFG.extractors) == ["cards", "ldjson", "regex_fallback"]
+    assert planner.stats()[SITE]["preferred"] == "cards"
+
+def test_structured_winner_is_preferred():
+    planner = StrategyPlanner()
+    planner.record(SITE, "ldjson", ["cards"])
+    assert planner.order(SITE, CFG.extractors) == ["ldjson", "cards", "regex_fallback"]
@@ -0,0 +1,82 @@
+import asyncio
+import os
+
+import httpx
+
+from bench.fixtures import build_page
+from bench.parity import PARITY_DIR
+from scraper import SITES, _extract_job, _fetch
+from sessions import base_domain
+from streaming import charset_of, read_limited
+
+CFG = next(c for c in SITES if c.name == "AlloYedekParca")
+
+def _read(body: bytes, chunk: int = 4096):
+    async def chunks():
+        for i in range(0, len(body), chunk):
+            yield body[i:i + chunk]
+    return asyncio.run(read_limited(chunks(), "utf-8", CFG.max_bytes, CFG.item_matchers, CFG.stream_items))
+
+def _extract(body: bytes):
+    url = CFG.base_search_url.replace("{query}", "fren+balatasi")
+    found, _winner, _missed, _ = _extract_job((CFG.name, url, base_domain(CFG.base_search_url), "text/html", body, "utf-8", list(CFG.extractors)))
+    return [(r.part_name, r.price_numeric) for r in found]
+
+def test_widget_before_listing_does_not_cut_early():
+    with open(os.path.join(PARITY_DIR, "AlloYedekParca.widget.html"), "rb") as f:
+        page = f.read()
+    # Widget (.product-card, zincirin ikinci parçası) ile gerçek liste (.product-item) arasına dolgu:
+    # sayaç widget kartlarını görüp beslenebilsin
+    widget_end = page.index(b"</section>") + len(b"</section>")
+    filler = b'<div class="recommendation"><a href="/kampanya">Kampanyalar</a></div>\n' * 600
+    body = page[:widget_end] + filler + page[widget_end:]
+    got, truncated, _ = _read(body)
+    assert not truncated
+    assert _extract(got) == _extract(body)
+    assert _extract(got)[0] == ("Bosch Fren Balatası Ön", 1210.0)
+
+def test_primary_selector_still_cuts_early():
+    body, _ = build_page(CFG.name, size_kb=300)
+    got, truncated, _ = _read(body)
+    assert truncated and len(got) < len(body)
+    assert _extract(got) == _extract(body)
+
+def _fetch_blocked(error_body: bool):
+    async def page():
+        yield b"<html><title>Access denied</title>"
+        for _ in range(2 * CFG.max_bytes // 65536):
+            yield b"x" * 65536
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(403, content=page(), headers={"content-type": "text/html"}))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await _fetch(client, "https://example.com/ara", CFG, None, 5.0, error_body=error_body)
+    return asyncio.run(run())
+
+def test_block_page_body_is_read_only_for_capture():
+    assert _fetch_blocked(False).body == b""
+    # Kayıt açıkken engel sayfası da kaydedilebilsin, bayt bütçesiyle sınırlı
+    resp = _fetch_blocked(True)
+    assert resp.status_code == 403
+    assert resp.body.startswith(b"<html><title>Access denied")
+    assert resp.truncated and len(resp.body) <= CFG.max_bytes + 64 * 1024
+
+def _fetch_page(body: bytes, content_type: str):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body, headers={"content-type": content_type}))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await _fetch(client, "https://example.com/ara", CFG, None, 5.0)
+    return asyncio.run(run())
+
+def test_charset_is_sniffed_from_meta_when_header_has_none():
+    html = '<html><head><meta charset="windows-1254"><title>Fren</title></head><body>Ön Fren Balatası 1.250 TL</body></html>'
+    resp = _fetch_page(html.encode("cp1254"), "text/html")
+    assert resp.charset == "windows-1254"
+    assert "Ön Fren Balatası" in resp.text
+    # http-equiv biçimi; iso-8859-9 tarayıcılar gibi windows-1254 okunur
+    html = '<meta http-equiv="Content-Type" content="text/html; charset=ISO-8859-9"><p>Şanzıman Yağı</p>'
+    assert charset_of({"content-type": "text/html"}, html.encode("cp1254")) == "windows-1254"
+    # Başlıktaki charset <meta>'dan önce gelir
+    assert _fetch_page(html.encode("cp1254"), "text/html; charset=utf-8").charset == "utf-8"